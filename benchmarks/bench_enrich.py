@@ -0,0 +1,84 @@
+"""
+Benchmark of batch enrichment: ``enrich_frame`` against the ``enrich_paper`` loop.
+
+Builds a synthetic batch of papers whose authors draw from a pool of
+affiliations (company, academic and email-only), checks that both paths give
+the same rows, and reports the best of several timings for each. A fresh
+classifier is used per run so the loop's memo does not carry over.
+
+    PYTHONPATH=src python benchmarks/bench_enrich.py --papers 30000
+    PYTHONPATH=src python benchmarks/bench_enrich.py --papers 30000 --distinct 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pubmed_fetcher.parser import AffiliationClassifier, enrich_frame, enrich_paper, set_classifier  # noqa: E402
+
+AFFILIATIONS = [
+    "Department of Oncology, Harvard University, Boston, MA",
+    "XYZ Pharma Inc., Basel, Switzerland. x.smith@xyz.com",
+    "Division of Hematology, Mayo Clinic, Rochester, MN",
+    "Basel, Switzerland",
+    "Acme Biotech Ltd., Cambridge; Oxford University, Oxford",
+    "Translational Medicine, Basel. j.doe@novartis.com",
+    "Institute of Cancer Research, London",
+    "Genentech, South San Francisco, CA",
+]
+
+
+def make_papers(count: int, distinct: int, seed: int = 0) -> list:
+    """Papers with 1-8 authors each; ``distinct`` bounds how many affiliation variants occur."""
+    rnd = random.Random(seed)
+    papers = []
+    for i in range(count):
+        authors = []
+        for j in range(rnd.randint(1, 8)):
+            author = {"name": f"Author {i}-{j}", "affiliation": f"{rnd.choice(AFFILIATIONS)}, {rnd.randrange(distinct)}"}
+            if rnd.random() < 0.1:
+                author["email"] = f"a{j}@pfizer.com"
+            authors.append(author)
+        papers.append(
+            {
+                "uid": str(30000000 + i),
+                "title": f"Paper {i}",
+                "pubdate": "2024 Jan 15",
+                "authors": authors,
+                "affiliations": " ".join(a["affiliation"] for a in authors),
+            }
+        )
+    return papers
+
+
+def best_time(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        set_classifier(AffiliationClassifier())
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized against per-paper enrichment.")
+    parser.add_argument("--papers", type=int, default=30000, help="Papers in the batch.")
+    parser.add_argument("--distinct", type=int, default=1000, help="Variants of each affiliation.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per path; the best is reported.")
+    args = parser.parse_args()
+
+    papers = make_papers(args.papers, args.distinct)
+    # Importing pandas is a one-off cost, kept out of the timings.
+    assert enrich_frame(papers[:100]).to_dict("records") == [enrich_paper(p) for p in papers[:100]]
+
+    loop = best_time(lambda: [enrich_paper(p) for p in papers], args.repeat)
+    frame = best_time(lambda: enrich_frame(papers), args.repeat)
+    print(f"{args.papers} papers  enrich_paper loop {loop:.3f}s  enrich_frame {frame:.3f}s  ({loop / frame:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+End-to-end benchmark of the fetch → enrich → write pipeline.
+
+Runs ``harvest_pubmed_papers`` against the local E-utilities stub from the
+test suite at several corpus sizes, optionally with injected latency and 429
+responses, and reports throughput, per-request latency percentiles and peak
+RSS. Each scenario runs in a fresh process so peak RSS is its own.
+
+    PYTHONPATH=src python benchmarks/bench_pipeline.py --sizes 1000 10000 100000
+    PYTHONPATH=src python benchmarks/bench_pipeline.py --latency 0.05 --throttle-rate 0.05 --json out.json
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eutils_stub import EutilsStub  # noqa: E402
+from pubmed_fetcher.fetcher import HISTORY_BATCH_SIZE, SOURCES, EutilsClient  # noqa: E402
+from pubmed_fetcher.parser import enrich_papers  # noqa: E402
+from pubmed_fetcher.ratelimit import RateLimiter, set_rate_limiter  # noqa: E402
+from pubmed_fetcher.writers import FORMATS, write_rows  # noqa: E402
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile; 0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process (``ru_maxrss`` is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_scenario(url: str, size: int, source: str, format: str, batch_size: int, rate: float) -> dict:
+    """Runs the pipeline once against the stub at ``url`` and returns its measurements."""
+    # Per-retry warnings would swamp the report when 429s are injected.
+    logging.disable(logging.WARNING)
+    set_rate_limiter(RateLimiter(rate=rate, backoff_base=0.01))
+    latencies = []
+    client = EutilsClient(eutils_url=url)
+    client.session.hooks["response"].append(
+        lambda response, *args, **kwargs: latencies.append(response.elapsed.total_seconds())
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"papers.{format}")
+        start = time.perf_counter()
+        papers = client.harvest_pubmed_papers("benchmark", batch_size=batch_size, max_results=size, source=source)
+        count = write_rows(enrich_papers(papers), path, format, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        output_bytes = os.path.getsize(path)
+    client.close()
+
+    return {
+        "size": size,
+        "source": source,
+        "format": format,
+        "records": count,
+        "seconds": round(elapsed, 3),
+        "records_per_second": round(count / elapsed, 1) if elapsed else 0.0,
+        "requests": len(latencies),
+        "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "latency_mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "output_bytes": output_bytes,
+        "peak_rss_mb": round(peak_rss_bytes() / (1024 * 1024), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PubMed fetch pipeline against a local stub.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Corpus sizes (PMIDs).")
+    parser.add_argument("--source", choices=SOURCES, default="esummary", help="Record type to fetch.")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Output format to write.")
+    parser.add_argument("--batch-size", type=int, default=HISTORY_BATCH_SIZE, help="Records per request.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of latency added to every response.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Client request rate limit (requests/second).")
+    parser.add_argument("--json", type=str, help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        stub = EutilsStub(size=size, latency=args.latency, throttle_rate=args.throttle_rate).start()
+        try:
+            # A fresh process per scenario keeps peak RSS from carrying over.
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(
+                    run_scenario, stub.url, size, args.source, args.format, args.batch_size, args.rate
+                ).result()
+        finally:
+            stub.stop()
+        result["throttled"] = stub.throttled
+        results.append(result)
+        print(
+            f"{size:>7} PMIDs  {result['records_per_second']:>9.1f} rec/s  "
+            f"p50 {result['latency_p50_ms']:>7.2f} ms  p99 {result['latency_p99_ms']:>7.2f} ms  "
+            f"{result['requests']:>5} req ({result['throttled']} throttled)  "
+            f"peak RSS {result['peak_rss_mb']:>7.1f} MB"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
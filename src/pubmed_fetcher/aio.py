@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from typing import Iterable, Optional
+
+from pubmed_fetcher.fetcher import (
+    DETAILS_BATCH_SIZE,
+    POOL_SIZE,
+    EutilsClient,
+    get_client,
+)
+
+# The pooled EutilsClient is driven from worker threads, so every call still
+# shares one session and the process-wide rate limiter. Requests in flight are
+# capped at the connection pool size so no call waits on a free socket.
+MAX_CONCURRENCY = POOL_SIZE
+
+
+async def search_pubmed_ids_async(
+    query: str, max_results: Optional[int] = 10, client: Optional[EutilsClient] = None, **filters
+) -> list:
+    """Returns the PMIDs matching the query."""
+    client = client or get_client()
+    return await asyncio.to_thread(client.search_pubmed_ids, query, max_results, **filters)
+
+
+async def fetch_paper_details_async(
+    paper_ids: list,
+    batch_size: int = DETAILS_BATCH_SIZE,
+    source: str = "esummary",
+    client: Optional[EutilsClient] = None,
+    max_concurrency: int = MAX_CONCURRENCY,
+) -> list:
+    """Fetches paper details with up to ``max_concurrency`` chunks in flight."""
+    client = client or get_client()
+    fetch = client.fetch_paper_records if source == "efetch" else client.fetch_paper_details
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_chunk(chunk: list) -> list:
+        async with semaphore:
+            return await asyncio.to_thread(fetch, chunk, batch_size, 1)
+
+    paper_ids = list(paper_ids)
+    chunks = [paper_ids[i:i + batch_size] for i in range(0, len(paper_ids), batch_size)]
+    results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+    return [paper for papers in results for paper in papers]
+
+
+async def fetch_pubmed_papers_async(
+    query: str, max_results: int = 10, client: Optional[EutilsClient] = None
+) -> list:
+    """Fetches research papers from PubMed based on the query."""
+    paper_ids = await search_pubmed_ids_async(query, max_results, client)
+    return await fetch_paper_details_async(paper_ids, client=client) if paper_ids else []
+
+
+async def fetch_many_queries(
+    queries: Iterable[str],
+    max_results: Optional[int] = 10,
+    source: str = "esummary",
+    client: Optional[EutilsClient] = None,
+    max_concurrency: int = MAX_CONCURRENCY,
+) -> list:
+    """
+    Runs many queries concurrently and fetches each matching paper once.
+
+    The searches run side by side, PMIDs found by more than one query are
+    fetched a single time, and every paper gets a ``queries`` list naming the
+    queries that matched it. Papers are ordered by first match.
+    """
+    queries = list(dict.fromkeys(queries))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def search(query: str) -> list:
+        async with semaphore:
+            return await search_pubmed_ids_async(query, max_results, client)
+
+    results = await asyncio.gather(*(search(query) for query in queries))
+
+    matches = {}
+    for query, paper_ids in zip(queries, results):
+        logging.info(f"{len(paper_ids)} papers match {query!r}")
+        for paper_id in paper_ids:
+            matches.setdefault(paper_id, []).append(query)
+
+    papers = await fetch_paper_details_async(
+        list(matches), source=source, client=client, max_concurrency=max_concurrency
+    )
+    for paper in papers:
+        paper.queries = matches.get(paper.uid, [])
+    return papers
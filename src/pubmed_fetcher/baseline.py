@@ -0,0 +1,72 @@
+import glob
+import gzip
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+from pubmed_fetcher.models import Paper
+from pubmed_fetcher.domains import DomainIndex, set_domain_index
+from pubmed_fetcher.parser import AffiliationClassifier, enrich_paper, iter_pubmed_articles, set_classifier
+
+BASELINE_PATTERN = "pubmed*.xml.gz"
+
+
+def find_baseline_files(paths: Iterable[str]) -> list:
+    """Expands directories to the ``pubmed*.xml.gz`` files inside them, in name order."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, BASELINE_PATTERN))))
+        else:
+            files.append(path)
+    return files
+
+
+def read_baseline_file(path: str) -> Iterator[Paper]:
+    """Streams the papers out of one (optionally gzipped) baseline/update file."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        yield from iter_pubmed_articles(f)
+
+
+def ingest_file(path: str) -> list:
+    """Decompresses and parses one baseline/update file into output rows."""
+    rows = [enrich_paper(paper) for paper in read_baseline_file(path)]
+    logging.info(f"{path}: {len(rows)} papers")
+    return rows
+
+
+def ingest_baseline(
+    paths: Iterable[str],
+    max_workers: Optional[int] = None,
+    keywords: Optional[str] = None,
+    domains: Optional[str] = None,
+) -> Iterator[dict]:
+    """
+    Yields output rows for every paper in local PubMed baseline/update files.
+
+    Each file is parsed in its own worker process, so decompression, XML
+    parsing and affiliation matching scale across cores. At most two files
+    per worker are in flight, which keeps finished-but-unwritten rows from
+    piling up when the consumer is slower than the pool. Rows come out in
+    file order. ``keywords`` is a classifier JSON file and ``domains`` an
+    email-domain mapping file, both loaded in each worker.
+    """
+    files = find_baseline_files(paths)
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(keywords, domains)) as pool:
+        pending = []
+        for path in files:
+            pending.append(pool.submit(ingest_file, path))
+            if len(pending) >= 2 * max_workers:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+
+def _init_worker(keywords: Optional[str], domains: Optional[str]) -> None:
+    if keywords:
+        set_classifier(AffiliationClassifier.from_file(keywords))
+    if domains:
+        set_domain_index(DomainIndex.from_file(domains))
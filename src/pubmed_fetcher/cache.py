@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Iterable, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pubmed_fetcher")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Search results change as PubMed indexes new papers, and citation links as
+# new papers cite old ones; per-PMID summaries and records are effectively
+# immutable, so they can be kept much longer.
+DEFAULT_TTLS = {
+    "esearch": 60 * 60,
+    "elink": 24 * 60 * 60,
+    "esummary": 30 * 24 * 60 * 60,
+    "efetch": 30 * 24 * 60 * 60,
+}
+
+# Parameters that do not change the content of a response.
+_IGNORED_PARAMS = {"api_key", "tool", "email"}
+
+
+def request_key(endpoint: str, params: dict) -> str:
+    """Returns a content address for a request, independent of parameter order."""
+    normalized = {k: str(v) for k, v in params.items() if k not in _IGNORED_PARAMS}
+    payload = json.dumps([endpoint, sorted(normalized.items())], separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of decoded E-utilities payloads.
+
+    Entries are zlib-compressed JSON stored under an ``(endpoint, key)`` pair,
+    where the key is either a ``request_key`` or a single PMID. Reads past the
+    endpoint's TTL count as misses, and once the stored size exceeds
+    ``max_bytes`` the least recently read entries are evicted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: Optional[dict] = None,
+    ):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, "responses.sqlite3")
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS entries (
+                    endpoint TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    PRIMARY KEY (endpoint, key)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        return self._conn
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, endpoint: str, key: str):
+        """Returns the cached value, or None if it is missing or expired."""
+        return self.get_many(endpoint, [key]).get(key)
+
+    def get_many(self, endpoint: str, keys: Iterable[str]) -> dict:
+        """Returns ``{key: value}`` for every fresh cached key."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        now = time.time()
+        oldest = now - self.ttls.get(endpoint, 0)
+        found = {}
+        with self._lock:
+            conn = self._connect()
+            # Stay well under SQLite's bound-parameter limit.
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT key, value FROM entries WHERE endpoint = ? AND created >= ? "
+                    f"AND key IN ({','.join('?' * len(chunk))})",
+                    [endpoint, oldest, *chunk],
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = json.loads(zlib.decompress(value))
+            if found:
+                conn.executemany(
+                    "UPDATE entries SET accessed = ? WHERE endpoint = ? AND key = ?",
+                    [(now, endpoint, key) for key in found],
+                )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, endpoint: str, key: str, value) -> None:
+        """Stores one value."""
+        self.set_many(endpoint, {key: value})
+
+    def set_many(self, endpoint: str, items: dict) -> None:
+        """Stores ``{key: value}`` and evicts old entries if the cache is over size."""
+        if not items:
+            return
+
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+            rows.append((endpoint, key, blob, len(blob), now, now))
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", rows)
+            # Replaced rows are not subtracted, so the running size can only
+            # overestimate; the exact size is recomputed before evicting.
+            self._size += sum(row[3] for row in rows)
+            if self._size > self.max_bytes:
+                self._evict(conn)
+            conn.execute("COMMIT")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self._size = total
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        stale = []
+        rows = conn.execute("SELECT endpoint, key, size FROM entries ORDER BY accessed")
+        for endpoint, key, size in rows:
+            stale.append((endpoint, key))
+            freed += size
+            if freed >= excess:
+                break
+        rows.close()
+        conn.executemany("DELETE FROM entries WHERE endpoint = ? AND key = ?", stale)
+        self._size = total - freed
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters."""
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import sqlite3
+from typing import Optional
+
+from pubmed_fetcher.fetcher import DETAILS_BATCH_SIZE, EutilsClient, get_client
+from pubmed_fetcher.parser import enrich_paper
+from pubmed_fetcher.writers import RowWriter
+
+
+class HarvestJournal:
+    """
+    SQLite journal of a checkpointed harvest.
+
+    It records the job (query, source and the PMID list, fixed when the job
+    starts so chunks stay the same on every rerun), each chunk's status and
+    the output file offset reached after the last completed chunk. Chunk
+    completion and the offset are committed together, so after a crash the
+    output can be cut back to exactly the rows of completed chunks.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS job (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                id INTEGER PRIMARY KEY,
+                pmids TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending'
+            );
+            """
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def job(self) -> dict:
+        """Returns the recorded job settings, or {} if no job has started."""
+        return {key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM job")}
+
+    def start(self, query: str, source: str, pmids: list, chunk_size: int) -> None:
+        """Replaces any previous job with a new one over ``pmids``."""
+        with self._conn:
+            self._conn.execute("DELETE FROM job")
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.executemany(
+                "INSERT INTO job VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in {"query": query, "source": source, "offset": 0}.items()],
+            )
+            self._conn.executemany(
+                "INSERT INTO chunks (pmids) VALUES (?)",
+                [(",".join(pmids[i:i + chunk_size]),) for i in range(0, len(pmids), chunk_size)],
+            )
+
+    def unfinished(self) -> list:
+        """Returns ``(chunk_id, pmids)`` for every chunk that is pending or has failed PMIDs."""
+        rows = self._conn.execute("SELECT id, pmids FROM chunks WHERE status != 'done' ORDER BY id")
+        return [(chunk_id, pmids.split(",")) for chunk_id, pmids in rows]
+
+    def offset(self) -> int:
+        return self.job().get("offset", 0)
+
+    def complete(self, chunk_id: int, failed: list, offset: Optional[int]) -> None:
+        """
+        Marks a chunk finished. If some of its PMIDs failed, the chunk is kept
+        with just those so a resumed run retries them.
+        """
+        with self._conn:
+            if failed:
+                self._conn.execute(
+                    "UPDATE chunks SET pmids = ?, status = 'failed' WHERE id = ?", (",".join(failed), chunk_id)
+                )
+            else:
+                self._conn.execute("UPDATE chunks SET status = 'done' WHERE id = ?", (chunk_id,))
+            if offset is not None:
+                self._conn.execute("UPDATE job SET value = ? WHERE key = 'offset'", (json.dumps(offset),))
+
+
+def start_harvest(
+    query: str,
+    journal: HarvestJournal,
+    max_results: Optional[int] = None,
+    source: str = "esummary",
+    chunk_size: int = DETAILS_BATCH_SIZE,
+    client: Optional[EutilsClient] = None,
+) -> None:
+    """
+    Searches the query and records its PMIDs in the journal as a new job.
+
+    A search that fails, or lists only part of what was asked for, raises
+    ``RuntimeError`` and leaves the journal as it was.
+    """
+    pmids = (client or get_client()).search_pubmed_ids(query, max_results)
+    if pmids.count is None:
+        raise RuntimeError(f"Search for {query!r} failed")
+    if not pmids.complete:
+        raise RuntimeError(f"Search for {query!r} listed only {len(pmids)} of {pmids.count} PMIDs")
+    journal.start(query, source, pmids, chunk_size)
+
+
+def harvest_checkpointed(
+    query: str,
+    journal: HarvestJournal,
+    writer: RowWriter,
+    max_results: Optional[int] = None,
+    source: str = "esummary",
+    chunk_size: int = DETAILS_BATCH_SIZE,
+    resume: bool = False,
+    client: Optional[EutilsClient] = None,
+) -> dict:
+    """
+    Fetches, enriches and writes a query's papers one journaled chunk at a time.
+
+    With ``resume`` and a journal for the same query and source, the search
+    is skipped and only chunks that never completed, or that had failed
+    PMIDs, are fetched; the caller must have cut the output back to
+    ``journal.offset()`` and opened ``writer`` in append mode. Failing
+    chunks are split down to single PMIDs (see
+    ``EutilsClient.fetch_chunk_splitting``). Returns counts of papers
+    written and PMIDs still failing. Without a journal to resume, the job is
+    started first (see ``start_harvest``).
+    """
+    client = client or get_client()
+    job = journal.job()
+    if not (resume and job.get("query") == query and job.get("source") == source):
+        start_harvest(query, journal, max_results, source, chunk_size, client)
+
+    written = failed = 0
+    for chunk_id, pmids in journal.unfinished():
+        papers, failed_ids = client.fetch_chunk_splitting(source, pmids)
+        for pmid in pmids:
+            if pmid in papers:
+                writer.write(enrich_paper(papers[pmid]))
+                written += 1
+        journal.complete(chunk_id, failed_ids, writer.checkpoint())
+        failed += len(failed_ids)
+
+    if failed:
+        logging.warning(f"{failed} papers could not be fetched; rerun with --resume to retry them")
+    return {"written": written, "failed": failed}
+
+
+def truncate_output(path: str, offset: int) -> None:
+    """Cuts a partially written output file back to the last checkpointed offset."""
+    if os.path.exists(path) and os.path.getsize(path) > offset:
+        os.truncate(path, offset)
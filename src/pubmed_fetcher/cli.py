@@ -1,58 +1,575 @@
 import argparse
+import itertools
+import sqlite3
 import sys
 import os
 import logging
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from pubmed_fetcher.fetcher import fetch_pubmed_papers
-from pubmed_fetcher.parser import extract_company_authors, extract_corresponding_email
-from pubmed_fetcher.utils import save_to_csv, print_results
+# Only what every run needs is imported here; subcommand and mode-specific
+# modules (asyncio, multiprocessing, the index, ...) are imported where they
+# are used, so short invocations start quickly.
+from pubmed_fetcher.cache import DEFAULT_CACHE_DIR, ResponseCache
+from pubmed_fetcher.domains import DomainIndex, set_domain_index
+from pubmed_fetcher.fetcher import (
+    DETAILS_BATCH_SIZE,
+    HISTORY_BATCH_SIZE,
+    SOURCES,
+    EutilsClient,
+    get_client,
+    harvest_pubmed_papers,
+    set_api_key,
+    set_client,
+)
+from pubmed_fetcher.parser import (
+    AffiliationClassifier,
+    enrich_papers,
+    get_classifier,
+    set_classifier,
+)
+from pubmed_fetcher.ratelimit import get_rate_limiter
+from pubmed_fetcher.stats import STATS_FORMATS, get_stats, profiled
+from pubmed_fetcher.utils import print_results
+from pubmed_fetcher.writers import FORMATS, open_writer, write_rows
+
+DEFAULT_QUEUE = os.path.join(DEFAULT_CACHE_DIR, "shards.sqlite3")
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Fetch research papers from PubMed.")
-    parser.add_argument("query", type=str, help="Search query for PubMed.")
+    subcommands = {
+        "ingest": ingest_main,
+        "index": index_main,
+        "serve": serve_main,
+        "plan": plan_main,
+        "worker": worker_main,
+        "merge": merge_main,
+        "crawl": crawl_main,
+    }
+    if sys.argv[1:2] and sys.argv[1] in subcommands:
+        return subcommands[sys.argv[1]](sys.argv[2:])
+
+    parser = argparse.ArgumentParser(
+        description="Fetch research papers from PubMed.",
+        epilog=(
+            "Run `%(prog)s ingest -h` to process local baseline files offline, "
+            "`%(prog)s index -h` to build and query a local index, "
+            "`%(prog)s serve -h` to answer queries from a long-running local service, "
+            "`%(prog)s plan -h` to split a large harvest into date shards for "
+            "`%(prog)s worker` processes and `%(prog)s merge`, "
+            "or `%(prog)s crawl -h` to follow citations out from a query's papers."
+        ),
+    )
+    parser.add_argument("query", type=str, nargs="?", help="Search query for PubMed.")
+    parser.add_argument(
+        "-q",
+        "--queries-file",
+        type=str,
+        help="File with one query per line; all queries run concurrently and share one rate limit.",
+    )
     parser.add_argument("-d", "--debug", action="store_true", help="Enable debug mode.")
-    parser.add_argument("-f", "--file", type=str, help="Output CSV file name.")
+    parser.add_argument("-f", "--file", type=str, help="Output file name.")
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="csv",
+        help="Output file format; JSONL and Parquet keep author and affiliation lists intact (default: csv).",
+    )
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help="Write --file as a directory of year=/month= partitions by publication date.",
+    )
+    parser.add_argument(
+        "-n", "--max-results", type=int, default=10, help="Maximum number of papers to fetch (default: 10)."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=HISTORY_BATCH_SIZE,
+        help=f"Papers fetched and written per batch (default: {HISTORY_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--source",
+        choices=SOURCES,
+        default="esummary",
+        help="Fetch compact ESummary records, or full EFetch records with author affiliations.",
+    )
+    parser.add_argument(
+        "--api-key", type=str, help="NCBI API key; raises the request rate from 3/s to 10/s."
+    )
+    parser.add_argument(
+        "--cache-dir", type=str, default=DEFAULT_CACHE_DIR, help="Directory for cached E-utilities responses."
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch from PubMed.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Fetch only papers added since the last run of this query and append them to --file.",
+    )
+    parser.add_argument(
+        "--state-db",
+        type=str,
+        help="SQLite file tracking incremental harvests (default: <cache-dir>/state.sqlite3).",
+    )
+    parser.add_argument(
+        "--keywords",
+        type=str,
+        help='JSON file with "company" and "academic" keyword lists for affiliation matching.',
+    )
+    parser.add_argument(
+        "--domains",
+        type=str,
+        help="JSON file mapping email domains to company names, added to the built-in list.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Journal completed chunks next to --file so an interrupted harvest can be resumed.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue a checkpointed harvest, fetching only unfinished or failed chunks.",
+    )
+    parser.add_argument("--journal", type=str, help="Checkpoint journal file (default: <file>.journal).")
+    parser.add_argument(
+        "--stats", action="store_true", help="Print per-stage timings and counters to stderr when done."
+    )
+    parser.add_argument("--stats-file", type=str, help="Write the timings and counters to this file.")
+    parser.add_argument(
+        "--stats-format", choices=STATS_FORMATS, default="json", help="Format of --stats-file (default: json)."
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        help="Run under cProfile and tracemalloc; writes the profile here and a memory report beside it.",
+    )
 
     args = parser.parse_args()
+    if not args.query and not args.queries_file:
+        parser.error("a query or --queries-file is required")
+    if args.incremental and (args.queries_file or not args.query):
+        parser.error("--incremental takes a single query")
+    if args.partitioned and not args.file:
+        parser.error("--partitioned needs a --file directory")
+    if args.incremental and args.format == "parquet" and not args.partitioned:
+        parser.error("--incremental appends to --file, which Parquet does not support")
+    if args.checkpoint or args.resume:
+        if not args.file or args.format == "parquet" or args.partitioned:
+            parser.error("--checkpoint/--resume need a single CSV or JSONL --file")
+        if args.queries_file or args.incremental or not args.query:
+            parser.error("--checkpoint/--resume take a single query")
+
+    _configure_logging(args.debug)
+    logging.debug("Debug mode enabled.")
+
+    stats = get_stats()
+    stats.reset()
+    with profiled(args.profile):
+        _run(args)
+
+    stats.gauges_from("ratelimit", get_rate_limiter().stats())
+    stats.gauges_from("memo", get_classifier().memo_stats())
+    if get_client().cache is not None:
+        stats.gauges_from("cache", get_client().cache.stats())
+    if args.stats:
+        print(stats.report(), file=sys.stderr)
+    if args.stats_file:
+        stats.dump(args.stats_file, args.stats_format)
+
+
+def _run(args: argparse.Namespace) -> None:
+    """Fetches, enriches and writes the papers for parsed command-line arguments."""
+    if not args.no_cache:
+        set_client(EutilsClient(api_key=os.environ.get("NCBI_API_KEY"), cache=ResponseCache(args.cache_dir)))
+    if args.api_key:
+        set_api_key(args.api_key)
+    if args.keywords:
+        set_classifier(AffiliationClassifier.from_file(args.keywords))
+    if args.domains:
+        set_domain_index(DomainIndex.from_file(args.domains))
+
+    memo_path = None if args.no_cache else os.path.join(args.cache_dir, "affiliations.json")
+    if memo_path:
+        get_classifier().load_memo(memo_path)
+
+    if args.checkpoint or args.resume:
+        _run_checkpointed(args)
+        if memo_path:
+            get_classifier().save_memo(memo_path)
+        return
 
-    if args.debug:
-        logging.basicConfig(level=logging.DEBUG)
-        logging.debug("Debug mode enabled.")
+    if args.queries_file:
+        import asyncio
 
-    papers = fetch_pubmed_papers(args.query)
+        from pubmed_fetcher.aio import fetch_many_queries
 
-    if not papers:
+        queries = _read_queries(args.queries_file)
+        if args.query:
+            queries.insert(0, args.query)
+        papers = asyncio.run(fetch_many_queries(queries, max_results=args.max_results, source=args.source))
+    elif args.incremental:
+        from pubmed_fetcher.state import HarvestState, harvest_new_papers
+
+        state = HarvestState(args.state_db or os.path.join(args.cache_dir, "state.sqlite3"))
+        papers = harvest_new_papers(args.query, state, max_results=args.max_results, source=args.source)
+    else:
+        # Papers are fetched, enriched and written one batch at a time, so
+        # memory use does not grow with the size of the result set.
+        papers = harvest_pubmed_papers(
+            args.query, batch_size=args.batch_size, max_results=args.max_results, source=args.source
+        )
+    rows = enrich_papers(papers)
+
+    try:
+        first = next(rows, None)
+    except RuntimeError as e:
+        print(f"⚠️ {e}")
+        sys.exit(1)
+    if first is None:
+        if args.incremental:
+            print("No new papers since the last run.")
+            return
         print("⚠️ No papers found for the given query.")
         sys.exit(1)
+    rows = itertools.chain([first], rows)
 
-    processed_data = []
-    for paper in papers:
-        title = paper.get("title", "N/A")
-        pub_date = paper.get("pubdate", "N/A")
-        authors = paper.get("authors", [])
-        affiliations = paper.get("affiliations", "")
-
-        non_academic_authors = extract_company_authors(authors)
-        email = extract_corresponding_email(affiliations)
-
-        processed_data.append(
-            {
-                "PubmedID": paper.get("uid"),
-                "Title": title,
-                "Publication Date": pub_date,
-                "Non-academic Author(s)": ", ".join(a[0] for a in non_academic_authors),
-                "Company Affiliation(s)": ", ".join(a[1] for a in non_academic_authors),
-                "Corresponding Author Email": email,
-            }
+    if args.file:
+        count = write_rows(
+            rows,
+            args.file,
+            args.format,
+            append=args.incremental,
+            batch_size=args.batch_size,
+            partitioned=args.partitioned,
         )
+        print(f"Data saved to {args.file} ({count} rows)")
+    else:
+        print_results(rows)
+
+    if memo_path:
+        get_classifier().save_memo(memo_path)
+    logging.debug(f"Affiliation memo: {get_classifier().memo_stats()}")
+
+
+def _run_checkpointed(args: argparse.Namespace) -> None:
+    """Runs a journaled harvest, resuming the previous one when asked to."""
+    from pubmed_fetcher.checkpoint import HarvestJournal, harvest_checkpointed, start_harvest, truncate_output
+
+    journal_path = args.journal or args.file + ".journal"
+    journal = HarvestJournal(journal_path)
+    job = journal.job()
+    resuming = args.resume and job.get("query") == args.query and job.get("source") == args.source
+    if args.resume and not resuming:
+        print("No matching checkpoint found; starting a new harvest.")
+    chunk_size = min(args.batch_size, DETAILS_BATCH_SIZE)
+    if resuming:
+        truncate_output(args.file, journal.offset())
+    else:
+        # Search before opening the output, so a failed search leaves both
+        # the previous output and its journal untouched.
+        try:
+            start_harvest(args.query, journal, args.max_results, args.source, chunk_size)
+        except RuntimeError as e:
+            journal.close()
+            print(f"⚠️ {e}")
+            sys.exit(1)
+
+    with open_writer(args.file, args.format, append=resuming) as writer:
+        result = harvest_checkpointed(
+            args.query, journal, writer, source=args.source, chunk_size=chunk_size, resume=True
+        )
+    journal.close()
+
+    print(f"Data saved to {args.file} ({result['written']} rows)")
+    if result["failed"]:
+        print(f"⚠️ {result['failed']} papers failed; rerun with --resume to retry them.")
+    else:
+        os.remove(journal_path)
+
+
+def ingest_main(argv: list) -> None:
+    """Processes local PubMed baseline/update files without touching the network."""
+    parser = argparse.ArgumentParser(
+        prog="get-papers-list ingest", description="Extract company authors from local PubMed XML files."
+    )
+    parser.add_argument("paths", nargs="+", help="pubmed*.xml.gz files, or directories containing them.")
+    parser.add_argument("-f", "--file", type=str, required=True, help="Output file name.")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Output file format (default: csv).")
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help="Write --file as a directory of year=/month= partitions by publication date.",
+    )
+    parser.add_argument("-w", "--workers", type=int, help="Worker processes (default: one per CPU).")
+    parser.add_argument(
+        "--keywords",
+        type=str,
+        help='JSON file with "company" and "academic" keyword lists for affiliation matching.',
+    )
+    parser.add_argument(
+        "--domains",
+        type=str,
+        help="JSON file mapping email domains to company names, added to the built-in list.",
+    )
+    parser.add_argument("-d", "--debug", action="store_true", help="Enable debug mode.")
+    args = parser.parse_args(argv)
+
+    _configure_logging(args.debug)
+    from pubmed_fetcher.baseline import ingest_baseline
+
+    rows = ingest_baseline(args.paths, max_workers=args.workers, keywords=args.keywords, domains=args.domains)
+    count = write_rows(rows, args.file, args.format, partitioned=args.partitioned)
+    print(f"Data saved to {args.file} ({count} rows)")
+
+
+def index_main(argv: list) -> None:
+    """Builds and queries a local full-text index of harvested papers."""
+    parser = argparse.ArgumentParser(
+        prog="get-papers-list index", description="Build and query a local index of PubMed papers."
+    )
+    parser.add_argument(
+        "--db", type=str, default=os.path.join(DEFAULT_CACHE_DIR, "index.sqlite3"), help="Index database file."
+    )
+    actions = parser.add_subparsers(dest="action", required=True)
+
+    add = actions.add_parser("add", help="Fetch papers for a query (or read baseline files) and index them.")
+    add.add_argument("query", type=str, nargs="?", help="Search query for PubMed.")
+    add.add_argument("--baseline", nargs="+", help="Index local pubmed*.xml.gz files instead of querying PubMed.")
+    add.add_argument("-n", "--max-results", type=int, help="Maximum number of papers to fetch (default: all).")
+    add.add_argument("--source", choices=SOURCES, default="efetch", help="E-utilities record type (default: efetch).")
+
+    search = actions.add_parser("search", help="Query the index without touching the network.")
+    search.add_argument("text", type=str, nargs="?", help="FTS5 query, e.g. 'cancer AND (pfizer OR novartis)'.")
+    search.add_argument("--title", type=str, help="Phrase that must appear in the title.")
+    search.add_argument("--author", type=str, help="Phrase that must appear in an author name.")
+    search.add_argument("--company", type=str, help="Phrase that must appear in a company affiliation.")
+    search.add_argument("--since", type=str, help="Earliest publication date, e.g. 2023 or 2023/06.")
+    search.add_argument("--until", type=str, help="Latest publication date (inclusive).")
+    search.add_argument("-n", "--limit", type=int, help="Maximum number of results.")
+    search.add_argument("-f", "--file", type=str, help="Output file name.")
+    search.add_argument("--format", choices=FORMATS, default="csv", help="Output file format (default: csv).")
+    args = parser.parse_args(argv)
+    _configure_logging(False)
+    from pubmed_fetcher.index import PaperIndex
+
+    with PaperIndex(args.db) as index:
+        if args.action == "add":
+            if args.baseline:
+                from pubmed_fetcher.baseline import find_baseline_files, read_baseline_file
 
+                papers = itertools.chain.from_iterable(map(read_baseline_file, find_baseline_files(args.baseline)))
+            elif args.query:
+                papers = harvest_pubmed_papers(args.query, max_results=args.max_results, source=args.source)
+            else:
+                parser.error("index add needs a query or --baseline files")
+            count = index.add_papers(papers)
+            print(f"Indexed {count} papers into {args.db} ({len(index)} total)")
+            return
+
+        try:
+            rows = index.search(
+                args.text,
+                title=args.title,
+                author=args.author,
+                company=args.company,
+                since=args.since,
+                until=args.until,
+                limit=args.limit,
+            )
+        except sqlite3.OperationalError as e:
+            parser.error(f"invalid search: {e}")
+    if args.file:
+        count = write_rows(rows, args.file, args.format)
+        print(f"Data saved to {args.file} ({count} rows)")
+    else:
+        print_results(rows)
+
+
+def serve_main(argv: list) -> None:
+    """Runs a local HTTP service that answers queries with a warm client, cache and classifier."""
+    from pubmed_fetcher.service import DEFAULT_HOST, DEFAULT_PORT, PaperService, make_server
+
+    parser = argparse.ArgumentParser(
+        prog="get-papers-list serve",
+        description="Serve PubMed queries over HTTP: GET /search?query=...&max_results=..., /stats, /health.",
+    )
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help=f"Address to bind (default: {DEFAULT_HOST}).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to bind (default: {DEFAULT_PORT}).")
+    parser.add_argument("--socket", type=str, help="Listen on this Unix socket instead of a TCP port.")
+    parser.add_argument("--api-key", type=str, help="NCBI API key; raises the request rate from 3/s to 10/s.")
+    parser.add_argument(
+        "--cache-dir", type=str, default=DEFAULT_CACHE_DIR, help="Directory for cached E-utilities responses."
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch from PubMed.")
+    parser.add_argument("-d", "--debug", action="store_true", help="Enable debug mode.")
+    args = parser.parse_args(argv)
+
+    _configure_logging(args.debug)
+    if not args.no_cache:
+        set_client(EutilsClient(api_key=os.environ.get("NCBI_API_KEY"), cache=ResponseCache(args.cache_dir)))
+    if args.api_key:
+        set_api_key(args.api_key)
+
+    server = make_server(PaperService(), host=args.host, port=args.port, socket_path=args.socket)
+    address = args.socket or "http://%s:%d" % server.server_address[:2]
+    logging.info(f"Serving on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+def plan_main(argv: list) -> None:
+    """Splits a query into publication-date shards and queues them for workers."""
+    from pubmed_fetcher.sharding import SHARD_TARGET, ShardQueue, plan_shards
+
+    parser = argparse.ArgumentParser(
+        prog="get-papers-list plan",
+        description="Split a large query into date-range shards that `get-papers-list worker` processes harvest.",
+    )
+    parser.add_argument("query", type=str, help="Search query for PubMed.")
+    parser.add_argument("--queue", type=str, default=DEFAULT_QUEUE, help="Shard queue database file.")
+    parser.add_argument("--since", type=str, help="Earliest publication date, e.g. 2015 or 2015/06 (default: all).")
+    parser.add_argument("--until", type=str, help="Latest publication date, inclusive (default: today).")
+    parser.add_argument(
+        "--target", type=int, default=SHARD_TARGET, help=f"Maximum papers per shard (default: {SHARD_TARGET})."
+    )
+    parser.add_argument("--api-key", type=str, help="NCBI API key; raises the request rate from 3/s to 10/s.")
+    parser.add_argument("-d", "--debug", action="store_true", help="Enable debug mode.")
+    args = parser.parse_args(argv)
+
+    _configure_logging(args.debug)
+    if args.api_key:
+        set_api_key(args.api_key)
+    try:
+        shards = plan_shards(args.query, since=args.since, until=args.until, target=args.target)
+    except ValueError as e:
+        parser.error(str(e))
+    with ShardQueue(args.queue) as queue:
+        queue.add(shards)
+    print(f"Queued {len(shards)} shards ({sum(s.count for s in shards)} papers) in {args.queue}")
+
+
+def worker_main(argv: list) -> None:
+    """Harvests shards from a queue until none are left."""
+    from pubmed_fetcher.sharding import LEASE_SECONDS, ShardQueue, run_worker
+
+    parser = argparse.ArgumentParser(
+        prog="get-papers-list worker", description="Claim and harvest shards queued by `get-papers-list plan`."
+    )
+    parser.add_argument("--queue", type=str, default=DEFAULT_QUEUE, help="Shard queue database file.")
+    parser.add_argument("-o", "--output-dir", type=str, required=True, help="Directory for per-shard output files.")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Output file format (default: csv).")
+    parser.add_argument("--source", choices=SOURCES, default="esummary", help="E-utilities record type.")
+    parser.add_argument("--worker-id", type=str, help="Name recorded on claimed shards (default: host-pid).")
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=LEASE_SECONDS,
+        help=f"Seconds a claimed shard stays reserved between renewals (default: {LEASE_SECONDS}).",
+    )
+    parser.add_argument("--max-shards", type=int, help="Stop after this many shards.")
+    parser.add_argument("--api-key", type=str, help="NCBI API key; raises the request rate from 3/s to 10/s.")
+    parser.add_argument("-d", "--debug", action="store_true", help="Enable debug mode.")
+    args = parser.parse_args(argv)
+
+    _configure_logging(args.debug)
+    if args.api_key:
+        set_api_key(args.api_key)
+    with ShardQueue(args.queue) as queue:
+        totals = run_worker(
+            queue,
+            args.output_dir,
+            format=args.format,
+            source=args.source,
+            worker=args.worker_id,
+            lease=args.lease,
+            max_shards=args.max_shards,
+        )
+    print(f"Finished {totals['shards']} shards ({totals['written']} rows); {totals['failed']} failed")
+
+
+def merge_main(argv: list) -> None:
+    """Merges the outputs of finished shards into one deduplicated file."""
+    from pubmed_fetcher.sharding import ShardQueue, merge_outputs
+
+    parser = argparse.ArgumentParser(
+        prog="get-papers-list merge", description="Merge finished shard outputs into one file without duplicates."
+    )
+    parser.add_argument("--queue", type=str, default=DEFAULT_QUEUE, help="Shard queue database file.")
+    parser.add_argument("-f", "--file", type=str, required=True, help="Output file name.")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Output file format (default: csv).")
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help="Write --file as a directory of year=/month= partitions by publication date.",
+    )
+    args = parser.parse_args(argv)
+
+    _configure_logging(False)
+    with ShardQueue(args.queue) as queue:
+        count = merge_outputs(queue, args.file, args.format, partitioned=args.partitioned)
+    print(f"Data saved to {args.file} ({count} rows)")
+
+
+def crawl_main(argv: list) -> None:
+    """Expands a query's papers to the papers citing or cited by them."""
+    from pubmed_fetcher.crawl import DIRECTIONS, crawl_citations
+
+    parser = argparse.ArgumentParser(
+        prog="get-papers-list crawl",
+        description="Fetch a query's papers and those linked to them by citations, breadth first.",
+    )
+    parser.add_argument("query", type=str, help="Search query for the seed papers.")
+    parser.add_argument("-n", "--max-results", type=int, default=100, help="Number of seed papers (default: 100).")
+    parser.add_argument("--depth", type=int, default=1, help="Citation hops to follow from the seeds (default: 1).")
+    parser.add_argument(
+        "--direction",
+        choices=DIRECTIONS,
+        default="both",
+        help="Follow papers citing each paper (citedin), papers it cites (refs) or both (default: both).",
+    )
+    parser.add_argument("--max-papers", type=int, help="Stop after this many papers, seeds included.")
+    parser.add_argument(
+        "--source",
+        choices=SOURCES,
+        default="efetch",
+        help="E-utilities record type (default: efetch, whose affiliations rank the crawl).",
+    )
+    parser.add_argument("-f", "--file", type=str, help="Output file name.")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Output file format (default: csv).")
+    parser.add_argument("--api-key", type=str, help="NCBI API key; raises the request rate from 3/s to 10/s.")
+    parser.add_argument("-d", "--debug", action="store_true", help="Enable debug mode.")
+    args = parser.parse_args(argv)
+
+    _configure_logging(args.debug)
+    if args.api_key:
+        set_api_key(args.api_key)
+    seeds = get_client().search_pubmed_ids(args.query, args.max_results)
+    rows = crawl_citations(
+        seeds, depth=args.depth, direction=args.direction, source=args.source, max_papers=args.max_papers
+    )
     if args.file:
-        save_to_csv(processed_data, args.file)
+        count = write_rows(rows, args.file, args.format)
+        print(f"Data saved to {args.file} ({count} rows)")
     else:
-        print_results(processed_data)
+        print_results(list(rows))
+
+
+def _configure_logging(debug: bool) -> None:
+    logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
+
+
+def _read_queries(path: str) -> list:
+    """Reads one query per line, skipping blank lines and # comments."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
 
 
 if __name__ == "__main__":
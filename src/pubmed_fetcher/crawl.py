@@ -0,0 +1,136 @@
+import heapq
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+import requests
+
+from pubmed_fetcher.fetcher import DETAILS_BATCH_SIZE, DETAILS_MAX_WORKERS, SOURCES, EutilsClient, get_client
+from pubmed_fetcher.parser import enrich_paper
+from pubmed_fetcher.stats import get_stats
+
+# PMIDs per ELink request; each is a separate ``id`` parameter in the URL.
+ELINK_BATCH_SIZE = 100
+
+DIRECTIONS = {
+    "citedin": ("pubmed_pubmed_citedin",),
+    "refs": ("pubmed_pubmed_refs",),
+    "both": ("pubmed_pubmed_citedin", "pubmed_pubmed_refs"),
+}
+
+
+class PmidSet:
+    """
+    Set of PMIDs kept as a bitmap with one bit per possible PMID.
+
+    PMIDs are dense integers (under 50 million today), so the whole of PubMed
+    fits in about 6 MB, where a set of strings would take gigabytes.
+    """
+
+    def __init__(self):
+        self._bits = bytearray()
+        self._len = 0
+
+    def add(self, pmid: str) -> bool:
+        """Adds a PMID and returns True if it was not already present."""
+        number = int(pmid)
+        index, mask = number >> 3, 1 << (number & 7)
+        if index >= len(self._bits):
+            self._bits.extend(bytes(max(index + 1 - len(self._bits), len(self._bits))))
+        if self._bits[index] & mask:
+            return False
+        self._bits[index] |= mask
+        self._len += 1
+        return True
+
+    def __contains__(self, pmid: str) -> bool:
+        number = int(pmid)
+        index = number >> 3
+        return index < len(self._bits) and bool(self._bits[index] & (1 << (number & 7)))
+
+    def __len__(self) -> int:
+        return self._len
+
+
+def crawl_citations(
+    seeds: Iterable[str],
+    depth: int = 1,
+    direction: str = "both",
+    source: str = "efetch",
+    max_papers: Optional[int] = None,
+    max_workers: int = DETAILS_MAX_WORKERS,
+    client: Optional[EutilsClient] = None,
+) -> Iterator[dict]:
+    """
+    Yields output rows for the seed papers and the papers linked to them
+    through citations, up to ``depth`` hops away.
+
+    The crawl is breadth-first: PMIDs wait in a frontier ordered by hop count
+    and, within a hop, by how many company affiliations the paper that led to
+    them had, so with ``max_papers`` the most promising neighbors are fetched
+    first. Each round takes a few detail batches off the frontier and fetches
+    them concurrently. Their rows are yielded, and the links of papers not yet
+    at ``depth`` are looked up with batched ELink calls on ``max_workers``
+    threads. Every PMID is queued at most once. Company affiliations are only
+    known from EFetch records, so with ``source="esummary"`` all neighbors
+    rank equally.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Unknown direction {direction!r}; expected one of {', '.join(DIRECTIONS)}")
+    if source not in SOURCES:
+        raise ValueError(f"Unknown source {source!r}; expected one of {SOURCES}")
+    client = client or get_client()
+    fetch = client.fetch_paper_records if source == "efetch" else client.fetch_paper_details
+    stats = get_stats()
+
+    visited = PmidSet()
+    order = itertools.count()
+    # Entries are (hop, -company hits of the referring paper, arrival order, PMID).
+    frontier = [(0, 0, next(order), pmid) for pmid in seeds if visited.add(pmid)]
+    heapq.heapify(frontier)
+
+    fetched = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while frontier and (max_papers is None or fetched < max_papers):
+            size = DETAILS_BATCH_SIZE * max_workers
+            if max_papers is not None:
+                size = min(size, max_papers - fetched)
+            batch = [heapq.heappop(frontier) for _ in range(min(size, len(frontier)))]
+            papers = {paper.uid: paper for paper in fetch([pmid for *_, pmid in batch], max_workers=max_workers)}
+
+            expand = {}
+            for hop, _, _, pmid in batch:
+                paper = papers.get(pmid)
+                if paper is None:
+                    continue
+                row = enrich_paper(paper)
+                fetched += 1
+                yield row
+                if hop < depth:
+                    expand[pmid] = (hop, len(row["Company Affiliation(s)"]))
+
+            parents = list(expand)
+            lookups = [
+                (parents[i:i + ELINK_BATCH_SIZE], linkname)
+                for linkname in DIRECTIONS[direction]
+                for i in range(0, len(parents), ELINK_BATCH_SIZE)
+            ]
+            for links in pool.map(lambda lookup: _fetch_links(client, *lookup), lookups):
+                for parent, linked in links.items():
+                    if parent not in expand:
+                        continue
+                    hop, hits = expand[parent]
+                    stats.incr("crawl.links", len(linked))
+                    for pmid in linked:
+                        if visited.add(pmid):
+                            heapq.heappush(frontier, (hop + 1, -hits, next(order), pmid))
+            logging.debug(f"Crawled {fetched} papers; {len(frontier)} queued, {len(visited)} seen")
+
+
+def _fetch_links(client: EutilsClient, paper_ids: list, linkname: str) -> dict:
+    try:
+        return client.fetch_links(paper_ids, linkname)
+    except requests.RequestException as e:
+        logging.error(f"Failed to fetch {linkname} links for {len(paper_ids)} papers: {e}")
+        return {}
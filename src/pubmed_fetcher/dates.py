@@ -0,0 +1,61 @@
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# How much of a date was given; "season" dates get the season's first month.
+PRECISIONS = ("day", "month", "season", "year", "unknown")
+
+# Distinct date strings remembered by ``normalize_pubdate``.
+DATE_MEMO_SIZE = 100_000
+
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1
+    )
+}
+_SEASONS = {"spr": 3, "sum": 6, "fal": 9, "aut": 9, "win": 12}
+_DATE = re.compile(r"(\d{4})(?:[\s/-]+(?:([A-Za-z]{3})[A-Za-z]*|(\d{1,2})(?!\d))(?:[\s/-]+(\d{1,2})(?!\d))?)?")
+
+
+@lru_cache(maxsize=DATE_MEMO_SIZE)
+def normalize_pubdate(value: Optional[str]) -> Tuple[int, str]:
+    """
+    Turns a PubMed date such as ``2024 Jan 15``, ``2024/01``, ``2024 Winter``
+    or ``2023 Dec-2024 Jan`` into a sortable ``YYYYMMDD`` integer and its
+    precision (see ``PRECISIONS``).
+
+    Missing parts are 0, and a date range is reduced to its start. Seasons
+    map to their first month: Spring is 03, Summer 06, Fall 09 and Winter 12.
+    Unparseable dates give ``(0, "unknown")``. Results are memoized, since
+    the same few thousand date strings make up most of PubMed.
+    """
+    match = _DATE.search(value or "")
+    if not match:
+        return 0, "unknown"
+    year, name, month_number, day = match.groups()
+    precision = "year"
+    month = int(month_number or 0)
+    if name:
+        name = name.lower()
+        month = _MONTHS.get(name, 0)
+        if not month and name in _SEASONS:
+            month, precision = _SEASONS[name], "season"
+    if month and precision == "year":
+        precision = "day" if day else "month"
+    return int(year) * 10000 + month * 100 + (int(day or 0) if month else 0), precision
+
+
+def date_key(value: Optional[str]) -> int:
+    """Returns just the sortable ``YYYYMMDD`` integer of ``normalize_pubdate``; 0 if unparseable."""
+    return normalize_pubdate(value)[0]
+
+
+def upper_date_key(value: str) -> int:
+    """Like ``date_key`` but rounds a partial date up, so ``2023`` includes all of 2023."""
+    key = date_key(value)
+    if key % 10000 == 0:
+        return key + 1299
+    if key % 100 == 0:
+        return key + 99
+    return key
@@ -0,0 +1,133 @@
+import json
+import os
+from typing import Callable, List, Optional
+
+from pubmed_fetcher.models import Author, Paper
+
+# Fastest first. msgspec decodes straight into the declared schema and skips
+# every other field without building it; orjson and json decode everything
+# and the fields we use are then picked out.
+JSON_BACKENDS = ("msgspec", "orjson", "json")
+
+_backend: Optional[str] = None
+_loads: Optional[Callable] = None
+_summary_decoder = None
+
+
+def available_backends() -> list:
+    """Returns the installed JSON backends, fastest first."""
+    found = []
+    for name in JSON_BACKENDS:
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        found.append(name)
+    return found
+
+
+def set_json_backend(name: Optional[str] = None) -> str:
+    """
+    Selects the JSON library used to decode E-utilities responses.
+
+    With no name, ``PUBMED_FETCHER_JSON`` is used if set, else the fastest
+    installed backend. Returns the backend chosen.
+    """
+    global _backend, _loads, _summary_decoder
+    name = name or os.environ.get("PUBMED_FETCHER_JSON") or available_backends()[0]
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend {name!r}; expected one of {', '.join(JSON_BACKENDS)}")
+
+    if name == "msgspec":
+        import msgspec
+
+        _loads = msgspec.json.decode
+        _summary_decoder = _msgspec_summary_decoder(msgspec)
+    elif name == "orjson":
+        import orjson
+
+        _loads = orjson.loads
+        _summary_decoder = None
+    else:
+        _loads = json.loads
+        _summary_decoder = None
+    _backend = name
+    return name
+
+
+def get_json_backend() -> str:
+    """Returns the name of the JSON backend in use, selecting one on first call."""
+    return _backend or set_json_backend()
+
+
+def loads(body: bytes):
+    """Decodes a JSON document with the selected backend."""
+    if _loads is None:
+        set_json_backend()
+    return _loads(body)
+
+
+def decode_summaries(body: bytes) -> List[Paper]:
+    """
+    Decodes an ESummary JSON response into papers, in the response's ``uids`` order.
+
+    Only the fields a ``Paper`` needs (uid, title, pubdate and author names)
+    are read; with msgspec, the rest of each document (article IDs, history,
+    references, ...) is skipped during parsing instead of being decoded.
+    Documents that are missing or carry an ``error`` are left out.
+    """
+    if _loads is None:
+        set_json_backend()
+
+    if _summary_decoder is not None:
+        result = _summary_decoder.decode(body).result
+        papers = []
+        for uid in result.get("uids", []):
+            summary = result.get(uid)
+            if summary is None or isinstance(summary, list) or summary.error:
+                continue
+            papers.append(
+                Paper(
+                    uid=uid,
+                    title=summary.title,
+                    pubdate=summary.pubdate,
+                    authors=[Author(name=author.name) for author in summary.authors],
+                )
+            )
+        return papers
+
+    result = _loads(body).get("result", {})
+    papers = []
+    for uid in result.get("uids", []):
+        summary = result.get(uid)
+        if summary is None or "error" in summary:
+            continue
+        papers.append(
+            Paper(
+                uid=uid,
+                title=summary.get("title", "N/A"),
+                pubdate=summary.get("pubdate", "N/A"),
+                authors=[Author(name=author.get("name") or "Unknown Author") for author in summary.get("authors", [])],
+            )
+        )
+    return papers
+
+
+def _msgspec_summary_decoder(msgspec):
+    """Builds a msgspec decoder for the subset of ESummary that ``Paper`` uses."""
+    from typing import Dict, Union
+
+    class SummaryAuthor(msgspec.Struct):
+        name: str = "Unknown Author"
+
+    class Summary(msgspec.Struct):
+        title: str = "N/A"
+        pubdate: str = "N/A"
+        authors: List[SummaryAuthor] = []
+        error: str = ""
+
+    class Response(msgspec.Struct):
+        # ``result`` maps "uids" to the PMID list and each PMID to its document.
+        result: Dict[str, Union[List[str], Summary]] = {}
+
+    return msgspec.json.Decoder(Response)
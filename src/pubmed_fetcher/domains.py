@@ -0,0 +1,113 @@
+import json
+from typing import Dict, Iterable, Optional
+
+# Email domains of large pharmaceutical and biotech companies; extend or
+# replace with a JSON file mapping domains to company names.
+COMPANY_DOMAINS = {
+    "abbvie.com": "AbbVie",
+    "amgen.com": "Amgen",
+    "astellas.com": "Astellas",
+    "astrazeneca.com": "AstraZeneca",
+    "bayer.com": "Bayer",
+    "biogen.com": "Biogen",
+    "bms.com": "Bristol Myers Squibb",
+    "boehringer-ingelheim.com": "Boehringer Ingelheim",
+    "daiichisankyo.com": "Daiichi Sankyo",
+    "eisai.com": "Eisai",
+    "gene.com": "Genentech",
+    "gilead.com": "Gilead Sciences",
+    "gsk.com": "GSK",
+    "jnj.com": "Johnson & Johnson",
+    "lilly.com": "Eli Lilly",
+    "merck.com": "Merck",
+    "merckgroup.com": "Merck KGaA",
+    "modernatx.com": "Moderna",
+    "msd.com": "MSD",
+    "novartis.com": "Novartis",
+    "novonordisk.com": "Novo Nordisk",
+    "pfizer.com": "Pfizer",
+    "regeneron.com": "Regeneron",
+    "roche.com": "Roche",
+    "sanofi.com": "Sanofi",
+    "takeda.com": "Takeda",
+    "vrtx.com": "Vertex Pharmaceuticals",
+}
+
+# Key under which a trie node stores its company; not a string, so no label
+# (not even the empty one in a malformed "a@x..gsk.com") can collide with it.
+_COMPANY = object()
+
+
+class DomainIndex:
+    """
+    Resolves email addresses to canonical company names by domain.
+
+    Domains are stored in a trie keyed on their labels in reverse order
+    (``com`` -> ``gsk``), so a lookup walks one dict per label of the address
+    and costs the same however many domains are mapped. The longest mapped
+    suffix wins, which lets subdomains such as ``us.gsk.com`` resolve through
+    ``gsk.com`` while ``notgsk.com`` does not.
+    """
+
+    def __init__(self, mapping: Optional[Dict[str, str]] = None):
+        self._root = {}
+        self._len = 0
+        for domain, company in (COMPANY_DOMAINS if mapping is None else mapping).items():
+            self.add(domain, company)
+
+    @classmethod
+    def from_file(cls, path: str, extend: bool = True) -> "DomainIndex":
+        """
+        Loads a JSON object mapping domains to company names. With ``extend``
+        the built-in ``COMPANY_DOMAINS`` are kept and the file adds to them.
+        """
+        with open(path, encoding="utf-8") as f:
+            mapping = json.load(f)
+        return cls({**COMPANY_DOMAINS, **mapping} if extend else mapping)
+
+    def add(self, domain: str, company: str) -> None:
+        node = self._root
+        for label in reversed(_labels(domain)):
+            node = node.setdefault(label, {})
+        if _COMPANY not in node:
+            self._len += 1
+        node[_COMPANY] = company
+
+    def resolve(self, address: str) -> Optional[str]:
+        """Returns the company for an email address or bare domain, or None if it is not mapped."""
+        node, company = self._root, None
+        for label in reversed(_labels(address)):
+            node = node.get(label)
+            if node is None:
+                break
+            company = node.get(_COMPANY, company)
+        return company
+
+    def resolve_first(self, addresses: Iterable[str]) -> Optional[str]:
+        """Returns the company of the first address that resolves to one."""
+        for address in addresses:
+            company = self.resolve(address)
+            if company:
+                return company
+        return None
+
+    def __len__(self) -> int:
+        return self._len
+
+
+def _labels(address: str) -> list:
+    return address.rpartition("@")[2].strip().strip(".").lower().split(".")
+
+
+_domain_index = DomainIndex()
+
+
+def get_domain_index() -> DomainIndex:
+    """Returns the index used to resolve author emails to companies."""
+    return _domain_index
+
+
+def set_domain_index(index: DomainIndex) -> None:
+    """Replaces the index used to resolve author emails to companies."""
+    global _domain_index
+    _domain_index = index
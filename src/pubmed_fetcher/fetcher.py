@@ -51,67 +51,616 @@
 #     print(fetch_pubmed_papers("cancer research"))  # 🔍 Debugging print
 
 
+import http.client
+import os
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, Tuple
+
 import requests
 import logging
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from pubmed_fetcher.cache import ResponseCache, request_key
+from pubmed_fetcher.decoding import decode_summaries, loads
+from pubmed_fetcher.models import Paper
+from pubmed_fetcher.parser import iter_pubmed_articles
+from pubmed_fetcher.ratelimit import RateLimiter, get_rate_limiter, rate_for, set_rate_limiter
+from pubmed_fetcher.stats import get_stats
+
+EUTILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+BASE_URL = f"{EUTILS_URL}/esearch.fcgi"
+DETAILS_URL = f"{EUTILS_URL}/esummary.fcgi"
+
+# ESummary accepts up to 10,000 records per history page; smaller pages keep
+# each response reasonably sized while still needing very few round trips.
+HISTORY_BATCH_SIZE = 500
+
+# Largest ID page ESearch returns in one call.
+ESEARCH_PAGE_SIZE = 10000
+
+# ESearch will not list PMIDs past the 9,999th of a search; only the history
+# server can page beyond it.
+RETRIEVAL_CAP = 9999
+
+# ID-list ESummary requests are chunked to stay well below URL length limits
+# and fanned out over a small thread pool.
+DETAILS_BATCH_SIZE = 200
+DETAILS_MAX_WORKERS = 4
+
+# Where paper details come from: ESummary JSON is compact, EFetch XML is the
+# full record and the only source of per-author affiliations and emails.
+SOURCES = ("esummary", "efetch")
+
+# Responses that are retried after a rate-limiter backoff.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+
+# Keep-alive connections held per host; a few more than the detail workers so
+# a harvest's search and summary calls never wait for a free socket.
+POOL_SIZE = DETAILS_MAX_WORKERS + 4
+
+
+class PmidList(list):
+    """
+    PMIDs listed by ``search_pubmed_ids``, with how many the search matched.
+
+    ``count`` is ESearch's total for the query, or None if the search failed
+    outright. ``complete`` is False when paging stopped short of what was
+    asked for, on an error or at ``RETRIEVAL_CAP``, so callers can tell a
+    partial list from a small result set.
+    """
+
+    def __init__(self, pmids: Iterable[str] = (), count: Optional[int] = None, complete: bool = True):
+        super().__init__(pmids)
+        self.count = count
+        self.complete = complete
+
+
+class EutilsClient:
+    """
+    Pooled, rate-limited client for the NCBI E-utilities.
+
+    One ``requests.Session`` is kept for the lifetime of the client so every
+    call reuses a keep-alive connection instead of paying a new TCP+TLS
+    handshake. Connection and read errors are retried by the transport;
+    429/5xx responses are retried through the shared rate limiter.
+
+    With a ``cache``, search responses are reused by their normalized
+    parameters and summaries are stored per PMID, so only PMIDs that have not
+    been seen before are requested.
+    """
+
+    def __init__(
+        self,
+        eutils_url: str = EUTILS_URL,
+        api_key: Optional[str] = None,
+        max_retries: int = MAX_RETRIES,
+        pool_size: int = POOL_SIZE,
+        timeout: int = 10,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.eutils_url = eutils_url.rstrip("/")
+        self.cache = cache
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=0,
+            backoff_factor=0.5,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {"Accept-Encoding": "gzip, deflate", "User-Agent": "pubmed-fetcher/0.1.0"}
+        )
+
+    def __enter__(self) -> "EutilsClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the pooled connections."""
+        self.session.close()
+
+    def get(
+        self, endpoint: str, params: dict, timeout: Optional[int] = None, stream: bool = False
+    ) -> requests.Response:
+        """
+        Sends a GET to an E-utility (``"esearch"``, ``"esummary"``, ...).
+
+        429 and 5xx responses are retried up to ``max_retries`` times after a
+        jittered backoff; the last failure is raised as ``requests.HTTPError``.
+        With ``stream=True`` the body is left unread for incremental parsing,
+        and its bytes are counted once it has been read (see ``_count_received``).
+        """
+        url = f"{self.eutils_url}/{endpoint}.fcgi"
+        limiter = get_rate_limiter()
+        if self.api_key:
+            params = {**params, "api_key": self.api_key}
+
+        stats = get_stats()
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire()
+            with stats.span(f"http.{endpoint}"):
+                response = self.session.get(url, params=params, timeout=timeout or self.timeout, stream=stream)
+            stats.incr(f"requests.{endpoint}")
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                break
+            response.close()
+            stats.incr("retries")
+            logging.warning(f"Retrying after HTTP {response.status_code} from {endpoint}")
+            limiter.backoff(attempt, response.headers.get("Retry-After"), throttled=response.status_code == 429)
 
-BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-DETAILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
-
-logging.basicConfig(level=logging.INFO)
+        response.raise_for_status()
+        limiter.success()
+        if not stream:
+            _count_received(response)
+        return response
+
+    def get_json(self, endpoint: str, params: dict, timeout: Optional[int] = None) -> dict:
+        """Returns the decoded JSON response, served from the cache when possible."""
+        # History requests refer to a server-side WebEnv that expires, so
+        # their responses are never worth caching.
+        cacheable = self.cache is not None and "WebEnv" not in params and params.get("usehistory") != "y"
+        if cacheable:
+            key = request_key(endpoint, params)
+            cached = self.cache.get(endpoint, key)
+            if cached is not None:
+                return cached
+
+        response = self.get(endpoint, params, timeout)
+        data = _decode(endpoint, response, loads)
+        if cacheable:
+            self.cache.set(endpoint, key, data)
+        return data
+
+    def fetch_pubmed_papers(self, query: str, max_results: int = 10) -> list:
+        """Fetches research papers from PubMed based on the query."""
+        params = {
+            "db": "pubmed",
+            "term": query,
+            "retmode": "json",
+            "retmax": max_results,
+        }
 
+        try:
+            data = self.get_json("esearch", params)
+        except requests.RequestException as e:
+            logging.error(f"Failed to fetch data: {e}")
+            return []
+
+        paper_ids = data.get("esearchresult", {}).get("idlist", [])
+        return self.fetch_paper_details(paper_ids) if paper_ids else []
+
+    def search_pubmed_ids(self, query: str, max_results: Optional[int] = 10, **filters) -> PmidList:
+        """
+        Returns the PMIDs matching the query, paging ESearch as needed.
+
+        Extra keyword arguments are passed to ESearch unchanged (for example
+        ``datetype``, ``mindate`` and ``maxdate``). ESearch lists at most
+        ``RETRIEVAL_CAP`` PMIDs of a search; past that, or if a page fails,
+        a warning gives the shortfall and the list is marked incomplete (see
+        ``PmidList``). Larger searches can be split by date with
+        ``get-papers-list plan``.
+        """
+        limit = RETRIEVAL_CAP if max_results is None else min(max_results, RETRIEVAL_CAP)
+        paper_ids = PmidList()
+        retstart, total = 0, None
+        while total is None or retstart < total:
+            params = {
+                "db": "pubmed",
+                "term": query,
+                "retmode": "json",
+                "retstart": retstart,
+                "retmax": min(ESEARCH_PAGE_SIZE, limit - retstart),
+                **filters,
+            }
+
+            try:
+                result = self.get_json("esearch", params).get("esearchresult", {})
+            except requests.RequestException as e:
+                logging.error(f"Failed to fetch data at offset {retstart}: {e}")
+                paper_ids.complete = False
+                break
+
+            if paper_ids.count is None:
+                paper_ids.count = int(result.get("count", 0))
+                total = min(paper_ids.count, limit)
+                if paper_ids.count > RETRIEVAL_CAP and (max_results is None or max_results > RETRIEVAL_CAP):
+                    logging.warning(
+                        f"{paper_ids.count} papers match {query!r} but ESearch lists at most {RETRIEVAL_CAP}; "
+                        "split the search by date with `get-papers-list plan`"
+                    )
+                    paper_ids.complete = False
+            page = result.get("idlist", [])[:max(total - retstart, 0)]
+            if not page:
+                break
+            paper_ids.extend(page)
+            retstart += len(page)
+
+        if paper_ids.count is not None and len(paper_ids) < total:
+            paper_ids.complete = False
+            logging.warning(f"Listed only {len(paper_ids)} of {total} PMIDs for {query!r}")
+        return paper_ids
+
+    def count_pubmed_ids(self, query: str, **filters) -> int:
+        """Returns how many PMIDs match the query, using a ``rettype=count`` ESearch that lists none."""
+        params = {"db": "pubmed", "term": query, "retmode": "json", "rettype": "count", **filters}
+        return int(self.get_json("esearch", params).get("esearchresult", {}).get("count", 0))
+
+    def fetch_links(self, paper_ids: list, linkname: str = "pubmed_pubmed_citedin") -> dict:
+        """
+        Returns ``{paper_id: [linked PMIDs]}`` for one batch of PMIDs using ELink.
+
+        ``linkname`` picks the relation, e.g. ``pubmed_pubmed_citedin`` (papers
+        citing each PMID) or ``pubmed_pubmed_refs`` (papers it cites). Each
+        PMID is sent as its own ``id`` parameter so ELink answers with one link
+        set per PMID instead of merging them. Raises on failure.
+        """
+        params = {
+            "dbfrom": "pubmed",
+            "db": "pubmed",
+            "id": list(paper_ids),
+            "linkname": linkname,
+            "retmode": "json",
+        }
+        links = {}
+        for linkset in self.get_json("elink", params, timeout=30).get("linksets", []):
+            ids = linkset.get("ids") or []
+            if not ids:
+                continue
+            linked = links.setdefault(str(ids[0]), [])
+            for linksetdb in linkset.get("linksetdbs", []):
+                linked.extend(str(pmid) for pmid in linksetdb.get("links", []))
+        return links
+
+    def fetch_paper_details(
+        self,
+        paper_ids: list,
+        batch_size: int = DETAILS_BATCH_SIZE,
+        max_workers: int = DETAILS_MAX_WORKERS,
+    ) -> list:
+        """
+        Fetches details of papers using PubMed IDs.
+
+        The IDs are split into chunks of ``batch_size`` which are requested in
+        parallel on a pool of ``max_workers`` threads; the papers are returned
+        in the order of ``paper_ids`` regardless of which chunk finished first.
+        """
+        paper_ids = list(paper_ids)
+        if not paper_ids:
+            return []
+
+        return self._fetch_by_id("esummary", paper_ids, batch_size, max_workers)
+
+    def fetch_paper_records(
+        self,
+        paper_ids: list,
+        batch_size: int = DETAILS_BATCH_SIZE,
+        max_workers: int = DETAILS_MAX_WORKERS,
+    ) -> list:
+        """
+        Fetches full PubMed records using EFetch.
+
+        Works like ``fetch_paper_details`` but each author also carries an
+        ``affiliation`` and ``email`` parsed from the record's XML.
+        """
+        return self._fetch_by_id("efetch", paper_ids, batch_size, max_workers)
+
+    def _fetch_by_id(self, source: str, paper_ids: list, batch_size: int, max_workers: int) -> list:
+        paper_ids = list(paper_ids)
+        if not paper_ids:
+            return []
+
+        def fetch_chunk(chunk: list) -> dict:
+            return self.fetch_chunk_splitting(source, chunk)[0]
+
+        cached = self.cache.get_many(source, paper_ids) if self.cache is not None else {}
+        papers = {paper_id: Paper.from_dict(paper) for paper_id, paper in cached.items()}
+        missing = [paper_id for paper_id in paper_ids if paper_id not in papers]
+        chunks = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        if len(chunks) == 1:
+            papers.update(fetch_chunk(chunks[0]))
+        elif chunks:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+                for fetched in pool.map(fetch_chunk, chunks):
+                    papers.update(fetched)
+
+        return [papers[paper_id] for paper_id in paper_ids if paper_id in papers]
+
+    def harvest_pubmed_papers(
+        self,
+        query: str,
+        batch_size: int = HISTORY_BATCH_SIZE,
+        max_results: Optional[int] = None,
+        source: str = "esummary",
+    ) -> Iterator[Paper]:
+        """
+        Yields every paper matching the query using the ESearch history server.
+
+        The search is run once with ``usehistory=y`` and the matching records
+        are then paged out of the server-side result set (WebEnv + query_key)
+        with ``retstart``/``retmax``, so the PMID list never has to be sent back.
+        ``source`` picks ESummary or full EFetch records (see ``SOURCES``).
+
+        When the client has a cache and every match can be listed by ESearch
+        (at most ``RETRIEVAL_CAP``), ID pages are searched instead so cached
+        papers can be skipped and only unseen PMIDs are fetched. Larger
+        harvests always page through the history server, storing what they
+        fetch in the cache.
+        """
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source {source!r}; expected one of {SOURCES}")
+        if self.cache is not None:
+            try:
+                total = self.count_pubmed_ids(query)
+            except requests.RequestException as e:
+                logging.error(f"Failed to fetch data: {e}")
+                return
+            if min(total, max_results or total) <= RETRIEVAL_CAP:
+                yield from self._harvest_uncached_ids(query, batch_size, max_results, source)
+                return
+            logging.info(f"{total} papers match {query!r}; paging them through the history server")
+        yield from self._harvest_history(query, batch_size, max_results, source)
+
+    def _harvest_history(self, query: str, batch_size: int, max_results: Optional[int], source: str) -> Iterator[Paper]:
+        params = {
+            "db": "pubmed",
+            "term": query,
+            "retmode": "json",
+            "retmax": 0,
+            "usehistory": "y",
+        }
 
-def fetch_pubmed_papers(query: str, max_results: int = 10) -> list:
+        try:
+            result = _decode("esearch", self.get("esearch", params), loads).get("esearchresult", {})
+        except requests.RequestException as e:
+            logging.error(f"Failed to fetch data: {e}")
+            return
+
+        webenv, query_key = result.get("webenv"), result.get("querykey")
+        total = int(result.get("count", 0))
+        if max_results is not None:
+            total = min(total, max_results)
+        if not total or not webenv:
+            return
+
+        for retstart in range(0, total, batch_size):
+            params = {
+                "db": "pubmed",
+                "retmode": "xml" if source == "efetch" else "json",
+                "WebEnv": webenv,
+                "query_key": query_key,
+                "retstart": retstart,
+                "retmax": min(batch_size, total - retstart),
+            }
+
+            try:
+                response = self.get(source, params, timeout=30, stream=source == "efetch")
+                if source == "efetch":
+                    papers = []
+                    for paper in self._stream_records(response):
+                        papers.append(paper)
+                        yield paper
+                else:
+                    papers = _decode("esummary", response, decode_summaries)
+                    yield from papers
+            except (requests.RequestException, ET.ParseError) as e:
+                logging.error(f"Failed to fetch paper details at offset {retstart}: {e}")
+                return
+            self._cache_papers(source, papers)
+
+    def _harvest_uncached_ids(
+        self, query: str, batch_size: int, max_results: Optional[int], source: str
+    ) -> Iterator[Paper]:
+        retstart, total = 0, None
+        while total is None or retstart < total:
+            params = {
+                "db": "pubmed",
+                "term": query,
+                "retmode": "json",
+                "retstart": retstart,
+                "retmax": batch_size,
+            }
+
+            try:
+                result = self.get_json("esearch", params).get("esearchresult", {})
+            except requests.RequestException as e:
+                logging.error(f"Failed to fetch data at offset {retstart}: {e}")
+                return
+
+            total = int(result.get("count", 0))
+            if max_results is not None:
+                total = min(total, max_results)
+            paper_ids = result.get("idlist", [])[:max(total - retstart, 0)]
+            if not paper_ids:
+                return
+
+            yield from self._fetch_by_id(source, paper_ids, DETAILS_BATCH_SIZE, DETAILS_MAX_WORKERS)
+            retstart += len(paper_ids)
+
+    def fetch_chunk(self, source: str, paper_ids: list) -> dict:
+        """
+        Fetches one chunk of PMIDs as ``{paper_id: paper}``.
+
+        Unlike the batch methods this raises on failure, so callers can tell
+        a failed chunk from one whose PMIDs simply do not exist.
+        """
+        if source == "efetch":
+            params = {"db": "pubmed", "id": ",".join(paper_ids), "retmode": "xml"}
+            response = self.get("efetch", params, timeout=30, stream=True)
+            papers = {paper.uid: paper for paper in self._stream_records(response)}
+        else:
+            params = {"db": "pubmed", "id": ",".join(paper_ids), "retmode": "json"}
+            response = self.get("esummary", params)
+            papers = {paper.uid: paper for paper in _decode("esummary", response, decode_summaries)}
+
+        self._cache_papers(source, papers.values())
+        return papers
+
+    def _cache_papers(self, source: str, papers: Iterable[Paper]) -> None:
+        if self.cache is not None:
+            self.cache.set_many(source, {paper.uid: paper.to_dict() for paper in papers})
+
+    def fetch_chunk_splitting(self, source: str, paper_ids: list) -> Tuple[dict, list]:
+        """
+        Fetches a chunk, splitting it in half and retrying the halves if it fails.
+
+        A malformed record or a server error on one PMID then costs only that
+        PMID instead of the whole chunk. Connection failures and timeouts are
+        not split, since they say nothing about the PMIDs. Returns the papers
+        and the PMIDs that could not be fetched.
+        """
+        try:
+            return self.fetch_chunk(source, paper_ids), []
+        except (requests.ConnectionError, requests.Timeout) as e:
+            logging.error(f"Failed to fetch {len(paper_ids)} paper(s): {e}")
+            return {}, list(paper_ids)
+        except (requests.RequestException, ET.ParseError, ValueError) as e:
+            if len(paper_ids) == 1:
+                logging.error(f"Failed to fetch paper {paper_ids[0]}: {e}")
+                return {}, list(paper_ids)
+            logging.warning(f"Splitting a failed chunk of {len(paper_ids)} papers: {e}")
+            get_stats().incr("chunk_splits")
+
+        middle = len(paper_ids) // 2
+        papers, failed = self.fetch_chunk_splitting(source, paper_ids[:middle])
+        more_papers, more_failed = self.fetch_chunk_splitting(source, paper_ids[middle:])
+        papers.update(more_papers)
+        return papers, failed + more_failed
+
+    def _stream_records(self, response: requests.Response) -> Iterator[Paper]:
+        """
+        Parses an EFetch XML body straight off the socket.
+
+        Reading ``response.raw`` bypasses requests, so urllib3's errors for a
+        dropped, stalled or corrupt body are turned into the requests
+        exceptions callers already handle, as ``iter_content`` would.
+        """
+        with response:
+            response.raw.decode_content = True
+            try:
+                yield from iter_pubmed_articles(response.raw)
+            except ReadTimeoutError as e:
+                raise requests.Timeout(e) from e
+            except (ProtocolError, http.client.IncompleteRead) as e:
+                raise requests.ConnectionError(e) from e
+            except DecodeError as e:
+                raise requests.ContentDecodingError(e) from e
+            finally:
+                _count_received(response)
+
+
+_client: Optional[EutilsClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> EutilsClient:
+    """Returns the shared client used by the module-level functions."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = EutilsClient(api_key=os.environ.get("NCBI_API_KEY"))
+        return _client
+
+
+def set_client(client: EutilsClient) -> None:
+    """Replaces the shared client used by the module-level functions."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def set_api_key(api_key: Optional[str]) -> None:
+    """Sends ``api_key`` with every request and resizes the shared rate limit to match."""
+    get_client().api_key = api_key
+    set_rate_limiter(RateLimiter(rate_for(api_key)))
+
+
+def fetch_pubmed_papers(query: str, max_results: int = 10, client: Optional[EutilsClient] = None) -> list:
     """Fetches research papers from PubMed based on the query."""
-    params = {
-        "db": "pubmed",
-        "term": query,
-        "retmode": "json",
-        "retmax": max_results,
-    }
-
-    try:
-        response = requests.get(BASE_URL, params=params, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        logging.error(f"Failed to fetch data: {e}")
-        return []
+    return (client or get_client()).fetch_pubmed_papers(query, max_results)
+
+
+def search_pubmed_ids(
+    query: str, max_results: Optional[int] = 10, client: Optional[EutilsClient] = None, **filters
+) -> PmidList:
+    """Returns the PMIDs matching the query."""
+    return (client or get_client()).search_pubmed_ids(query, max_results, **filters)
 
-    paper_ids = response.json().get("esearchresult", {}).get("idlist", [])
-    return fetch_paper_details(paper_ids) if paper_ids else []
 
+def count_pubmed_ids(query: str, client: Optional[EutilsClient] = None, **filters) -> int:
+    """Returns how many PMIDs match the query."""
+    return (client or get_client()).count_pubmed_ids(query, **filters)
 
-def fetch_paper_details(paper_ids: list) -> list:
+
+def fetch_paper_details(
+    paper_ids: list,
+    batch_size: int = DETAILS_BATCH_SIZE,
+    max_workers: int = DETAILS_MAX_WORKERS,
+    client: Optional[EutilsClient] = None,
+) -> list:
     """Fetches details of papers using PubMed IDs."""
-    if not paper_ids:
-        return []
+    return (client or get_client()).fetch_paper_details(paper_ids, batch_size, max_workers)
+
+
+def fetch_paper_records(
+    paper_ids: list,
+    batch_size: int = DETAILS_BATCH_SIZE,
+    max_workers: int = DETAILS_MAX_WORKERS,
+    client: Optional[EutilsClient] = None,
+) -> list:
+    """Fetches full PubMed records, with per-author affiliations, using EFetch."""
+    return (client or get_client()).fetch_paper_records(paper_ids, batch_size, max_workers)
+
+
+def harvest_pubmed_papers(
+    query: str,
+    batch_size: int = HISTORY_BATCH_SIZE,
+    max_results: Optional[int] = None,
+    source: str = "esummary",
+    client: Optional[EutilsClient] = None,
+) -> Iterator[Paper]:
+    """Yields every paper matching the query using the ESearch history server."""
+    return (client or get_client()).harvest_pubmed_papers(query, batch_size, max_results, source)
+
+
+def _count_received(response: requests.Response) -> None:
+    """
+    Adds the bytes read off the wire, before any gzip decoding, to the
+    ``bytes_received`` counter. Responses that did not come from urllib3
+    (such as test doubles) are counted by their body length.
+    """
+    if isinstance(response.raw, urllib3.HTTPResponse):
+        received = response.raw.tell()
+    else:
+        received = len(response.content or b"")
+    get_stats().incr("bytes_received", received)
+
+
+def _decode(endpoint: str, response: requests.Response, decoder):
+    """Decodes a JSON body; a malformed one is raised like any other failed request."""
+    with get_stats().span(f"decode.{endpoint}"):
+        try:
+            return decoder(response.content)
+        except ValueError as e:
+            raise requests.RequestException(f"Invalid JSON from {endpoint}: {e}", response=response) from e
 
-    params = {
-        "db": "pubmed",
-        "id": ",".join(paper_ids),
-        "retmode": "json",
-    }
 
-    try:
-        response = requests.get(DETAILS_URL, params=params, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        logging.error(f"Failed to fetch paper details: {e}")
-        return []
-
-    data = response.json().get("result", {})
-    # return {paper_id: data[paper_id] for paper_id in paper_ids if paper_id in data}
-
-    return [
-        {
-            "uid": paper_id,
-            "title": data.get(paper_id, {}).get("title", "N/A"),
-            "pubdate": data.get(paper_id, {}).get("pubdate", "N/A"),
-            "authors": data.get(paper_id, {}).get("authors", []),
-            "affiliations": data.get(paper_id, {}).get("affiliations", ""),
-        }
-        for paper_id in paper_ids if paper_id in data
-    ]
-    
 if __name__ == "__main__":
     print(fetch_pubmed_papers("cancer research"))
 
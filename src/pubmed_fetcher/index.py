@@ -0,0 +1,133 @@
+import json
+import os
+import sqlite3
+from typing import Iterable, Optional
+
+from pubmed_fetcher.dates import date_key, upper_date_key
+from pubmed_fetcher.models import as_paper
+from pubmed_fetcher.parser import enrich_paper
+
+
+def _phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+class PaperIndex:
+    """
+    On-disk SQLite FTS5 index of harvested papers for offline re-querying.
+
+    Each paper's title, author names and company affiliations are indexed as
+    full-text columns, and its publication date as a ``YYYYMMDD`` integer with
+    a B-tree index, so boolean text queries and date ranges are answered
+    locally. The enriched output row is stored alongside, so results come
+    back in the same schema as a fetch.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                id INTEGER PRIMARY KEY,
+                pmid TEXT NOT NULL UNIQUE,
+                pubdate INTEGER NOT NULL,
+                row TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS papers_pubdate ON papers (pubdate);
+            CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(title, authors, companies);
+            """
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def add_papers(self, papers: Iterable[dict], batch_size: int = 1000) -> int:
+        """Indexes (or re-indexes) papers and returns how many were added."""
+        count = 0
+        batch = []
+        for paper in papers:
+            batch.append(paper)
+            if len(batch) >= batch_size:
+                count += self._add_batch(batch)
+                batch = []
+        if batch:
+            count += self._add_batch(batch)
+        return count
+
+    def _add_batch(self, papers: list) -> int:
+        with self._conn:
+            for paper in papers:
+                paper = as_paper(paper)
+                row = enrich_paper(paper)
+                pmid = str(row["PubmedID"])
+                existing = self._conn.execute("SELECT id FROM papers WHERE pmid = ?", (pmid,)).fetchone()
+                if existing:
+                    self._conn.execute("DELETE FROM papers_fts WHERE rowid = ?", existing)
+                    self._conn.execute("DELETE FROM papers WHERE id = ?", existing)
+                cursor = self._conn.execute(
+                    "INSERT INTO papers (pmid, pubdate, row) VALUES (?, ?, ?)",
+                    (pmid, row["Publication Date Key"], json.dumps(row, ensure_ascii=False)),
+                )
+                authors = [author.name for author in paper.authors]
+                self._conn.execute(
+                    "INSERT INTO papers_fts (rowid, title, authors, companies) VALUES (?, ?, ?, ?)",
+                    (cursor.lastrowid, row["Title"], "\n".join(authors), "\n".join(row["Company Affiliation(s)"])),
+                )
+        return len(papers)
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        title: Optional[str] = None,
+        author: Optional[str] = None,
+        company: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list:
+        """
+        Returns output rows for the papers matching every given filter, newest first.
+
+        ``text`` is an FTS5 query over all columns, so it may use ``AND``,
+        ``OR``, ``NOT``, phrases and prefixes (``pharma*``). ``title``,
+        ``author`` and ``company`` match a phrase in that column only.
+        ``since``/``until`` are inclusive PubMed-style dates; ``until=2023``
+        includes the whole of 2023.
+        """
+        terms = [f"({text})"] if text else []
+        for column, value in (("title", title), ("authors", author), ("companies", company)):
+            if value:
+                terms.append(f"{column} : {_phrase(value)}")
+
+        sql = "SELECT papers.row FROM papers"
+        where, params = [], []
+        if terms:
+            sql += " JOIN papers_fts ON papers_fts.rowid = papers.id"
+            where.append("papers_fts MATCH ?")
+            params.append(" AND ".join(terms))
+        if since:
+            where.append("papers.pubdate >= ?")
+            params.append(date_key(since))
+        if until:
+            where.append("papers.pubdate <= ?")
+            params.append(upper_date_key(until))
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY papers.pubdate DESC, papers.pmid"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [json.loads(row) for (row,) in self._conn.execute(sql, params)]
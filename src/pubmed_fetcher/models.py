@@ -0,0 +1,70 @@
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import List, Union
+
+
+@dataclass(slots=True)
+class Author:
+    """
+    One author of a paper.
+
+    ``affiliation`` joins several affiliations with ``"; "``; ESummary
+    records carry none. Affiliation strings are interned, since the same
+    institutions recur across millions of authors.
+    """
+
+    name: str = "Unknown Author"
+    affiliation: str = ""
+    email: str = ""
+
+    def __post_init__(self):
+        self.affiliation = sys.intern(self.affiliation)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Author":
+        """Builds an author from an ESummary/cached author dict, ignoring unknown keys."""
+        return cls(
+            name=data.get("name") or "Unknown Author",
+            affiliation=data.get("affiliation") or "",
+            email=data.get("email") or "",
+        )
+
+
+@dataclass(slots=True)
+class Paper:
+    """A PubMed record as passed between the fetcher, parser and writers."""
+
+    uid: str
+    title: str = "N/A"
+    pubdate: str = "N/A"
+    authors: List[Author] = field(default_factory=list)
+    affiliations: str = ""
+    # Set by multi-query runs to the queries that matched the paper.
+    queries: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Paper":
+        """Builds a paper from a plain dict such as a cached record."""
+        return cls(
+            uid=data.get("uid"),
+            title=data.get("title") or "N/A",
+            pubdate=data.get("pubdate") or "N/A",
+            authors=[_as_author(author) for author in data.get("authors") or []],
+            affiliations=data.get("affiliations") or "",
+            queries=list(data.get("queries") or []),
+        )
+
+    def to_dict(self) -> dict:
+        """Returns the paper as plain JSON-serializable data."""
+        return asdict(self)
+
+
+def _as_author(author: Union[Author, dict, str]) -> Author:
+    if isinstance(author, Author):
+        return author
+    return Author.from_dict(author) if isinstance(author, dict) else Author(name=str(author))
+
+
+def as_paper(paper: Union[Paper, dict]) -> Paper:
+    """Accepts either a ``Paper`` or the equivalent dict."""
+    return paper if isinstance(paper, Paper) else Paper.from_dict(paper)
@@ -26,30 +26,518 @@
 #     match = re.search(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", text)
 #     return match.group(0) if match else "N/A"
 
+import hashlib
+import json
+import os
 import re
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import IO, TYPE_CHECKING, Iterable, Iterator, Optional, Tuple, Union
 
+from pubmed_fetcher.dates import normalize_pubdate
+from pubmed_fetcher.domains import DomainIndex, get_domain_index
+from pubmed_fetcher.models import Author, Paper, as_paper
+from pubmed_fetcher.stats import get_stats
 
-def extract_company_authors(author_affiliations: list) -> list:
+if TYPE_CHECKING:
+    import pandas as pd
+
+# The domain is matched label by label, so a sentence-ending period after an
+# address is never taken as part of it.
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}")
+
+# Keywords match whole words, case-insensitively; a trailing "*" matches any
+# word starting with the keyword ("pharma*" also matches "Pharmaceuticals").
+COMPANY_KEYWORDS = [
+    "pharma*",
+    "biopharma*",
+    "biotech*",
+    "therapeutics",
+    "biosciences",
+    "inc",
+    "ltd",
+    "llc",
+    "plc",
+    "corp",
+    "corporation",
+    "gmbh",
+]
+ACADEMIC_KEYWORDS = ["universit*", "hospital", "institute", "college", "school of"]
+
+# Distinct affiliation strings remembered by each classifier.
+MEMO_SIZE = 100_000
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_affiliation(affiliation: str) -> str:
+    """Folds case, whitespace and punctuation so variants of an affiliation share a memo entry."""
+    return _NON_WORD.sub(" ", affiliation.lower()).strip()
+
+
+class AffiliationClassifier:
+    """
+    Classifies affiliation strings as company or academic.
+
+    Both keyword lists are compiled into a single regular expression, each
+    list factored into a character trie so matching cost does not grow with
+    the number of keywords, and every affiliation is scanned once. An
+    affiliation is a company affiliation when it matches a company keyword
+    and no academic keyword.
+
+    Results are memoized in a bounded LRU keyed on ``normalize_affiliation``,
+    since the same affiliations recur across thousands of papers; the memo
+    can be saved next to the response cache and loaded on the next run.
+    """
+
+    def __init__(
+        self,
+        company_keywords: Iterable[str] = COMPANY_KEYWORDS,
+        academic_keywords: Iterable[str] = ACADEMIC_KEYWORDS,
+        memo_size: int = MEMO_SIZE,
+    ):
+        self.company_keywords = list(company_keywords)
+        self.academic_keywords = list(academic_keywords)
+        self.memo_size = memo_size
+        self.hits = 0
+        self.misses = 0
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+        academic, company = _keyword_regex(self.academic_keywords), _keyword_regex(self.company_keywords)
+        self.pattern = re.compile(
+            rf"(?<!\w)(?:(?P<academic>{academic})|(?P<company>{company}))", re.IGNORECASE
+        )
+        # Separate, group-free patterns for vectorized matching in pandas.
+        self.academic_pattern = re.compile(rf"(?<!\w)(?:{academic})", re.IGNORECASE)
+        self.company_pattern = re.compile(rf"(?<!\w)(?:{company})", re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path: str) -> "AffiliationClassifier":
+        """Loads keyword lists from a JSON file with "company" and "academic" arrays."""
+        with open(path, encoding="utf-8") as f:
+            keywords = json.load(f)
+        return cls(keywords.get("company", COMPANY_KEYWORDS), keywords.get("academic", ACADEMIC_KEYWORDS))
+
+    def lookup(self, affiliation: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Returns ``(label, company)`` for one affiliation string.
+
+        ``label`` is "company", "academic" or None; ``company`` is the
+        comma-separated part of the affiliation naming the company, e.g.
+        "Acme Pharma Inc" for "Dept. of Oncology, Acme Pharma Inc., Boston".
+        """
+        key = normalize_affiliation(affiliation)
+        with self._memo_lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        result = self._scan(affiliation)
+        with self._memo_lock:
+            self.misses += 1
+            self._memo[key] = result
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return result
+
+    def classify(self, affiliation: str) -> Optional[str]:
+        """Returns "company", "academic" or None for one affiliation string."""
+        return self.lookup(affiliation)[0]
+
+    def is_company(self, affiliation: str) -> bool:
+        return self.classify(affiliation) == "company"
+
+    def _scan(self, affiliation: str) -> Tuple[Optional[str], Optional[str]]:
+        company = None
+        for match in self.pattern.finditer(affiliation):
+            if match.lastgroup == "academic":
+                return ("academic", None)
+            if company is None:
+                start = affiliation.rfind(",", 0, match.start()) + 1
+                end = affiliation.find(",", match.end())
+                company = affiliation[start:end if end != -1 else None].strip(" .;")
+        return ("company", company) if company is not None else (None, None)
+
+    def memo_stats(self) -> dict:
+        """Returns memo hit/miss counters and the current number of entries."""
+        with self._memo_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._memo),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def save_memo(self, path: str) -> None:
+        """Writes the memo to ``path`` as JSON."""
+        with self._memo_lock:
+            entries = list(self._memo.items())
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"keywords": self._fingerprint(), "entries": entries}, f)
+        os.replace(tmp_path, path)
+
+    def load_memo(self, path: str) -> int:
+        """
+        Loads a memo written by ``save_memo`` and returns the number of entries.
+
+        Memos built from different keyword lists are ignored, since their
+        classifications would no longer hold.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if saved.get("keywords") != self._fingerprint():
+            return 0
+
+        with self._memo_lock:
+            for key, (label, company) in saved.get("entries", [])[-self.memo_size:]:
+                self._memo[key] = (label, company)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+            return len(self._memo)
+
+    def _fingerprint(self) -> str:
+        keywords = json.dumps([self.company_keywords, self.academic_keywords])
+        return hashlib.sha1(keywords.encode()).hexdigest()
+
+
+def _keyword_regex(keywords: Iterable[str]) -> str:
+    """Compiles keywords into a trie-shaped alternation with word boundaries."""
+    trie = {}
+    for keyword in keywords:
+        keyword = keyword.strip().lower()
+        prefix = keyword.endswith("*")
+        keyword = keyword.rstrip("*")
+        if not keyword:
+            continue
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        # "" marks a whole-word keyword, "*" a prefix keyword.
+        node["*" if prefix else ""] = None
+
+    return _trie_regex(trie) if trie else "(?!)"
+
+
+def _trie_regex(node: dict) -> str:
+    alternatives = []
+    for char, child in sorted(node.items(), key=lambda item: item[0] in ("", "*")):
+        if char == "":
+            alternatives.append(r"(?!\w)")
+        elif char == "*":
+            alternatives.append(r"\w*")
+        else:
+            alternatives.append(re.escape(char) + _trie_regex(child))
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+_classifier = AffiliationClassifier()
+
+
+def get_classifier() -> AffiliationClassifier:
+    """Returns the classifier used by ``extract_company_authors``."""
+    return _classifier
+
+
+def set_classifier(classifier: AffiliationClassifier) -> None:
+    """Replaces the classifier used by ``extract_company_authors``."""
+    global _classifier
+    _classifier = classifier
+
+
+def extract_company_authors(
+    author_affiliations: list,
+    classifier: Optional[AffiliationClassifier] = None,
+    domains: Optional[DomainIndex] = None,
+) -> list:
     """
     Identifies authors affiliated with pharmaceutical or biotech companies.
     Returns a list of tuples (Author Name, Company Name).
+
+    The company name is the part of the affiliation naming the company (see
+    ``AffiliationClassifier.lookup``), lowercased. Authors whose affiliations name no company are still counted when one of
+    their email addresses is at a company domain (see ``DomainIndex``); the
+    company is then the canonical name the domain maps to.
     """
+    classifier = classifier or _classifier
+    domains = domains or get_domain_index()
     non_academic_authors = []
-    company_keywords = ["pharma", "biotech", "inc", "ltd", "corp", "gmbh"]
 
     for author in author_affiliations:
-        name = author.get("name", "Unknown Author")
-        affiliation = author.get("affiliation", "").lower()
+        if isinstance(author, dict):
+            author = Author.from_dict(author)
+        name, affiliation = author.name, author.affiliation
 
-        if any(keyword in affiliation for keyword in company_keywords):
-            non_academic_authors.append((name, affiliation))
+        # EFetch authors may list several affiliations; any one of them being
+        # a company (and not also academic) is enough.
+        companies = []
+        for part in affiliation.split(";"):
+            label, company = classifier.lookup(part) if part.strip() else (None, None)
+            if label == "company":
+                companies.append(company)
+        if companies:
+            non_academic_authors.append((name, "; ".join(companies).lower()))
+            continue
+        company = _email_company(affiliation, author.email, domains)
+        if company:
+            non_academic_authors.append((name, company.lower()))
 
     return non_academic_authors
 
 
+def extract_emails(text: str) -> list:
+    """Returns every distinct email address in the text, in order of appearance."""
+    return list(dict.fromkeys(EMAIL_PATTERN.findall(text))) if text else []
+
+
 def extract_corresponding_email(text: str) -> str:
     """
     Extracts a corresponding author’s email using regex.
     """
-    match = re.search(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", text)
+    match = EMAIL_PATTERN.search(text)
     return match.group(0) if match else "N/A"
+
+
+def _email_company(affiliation: str, email: str, domains: DomainIndex) -> Optional[str]:
+    """Returns the company that any of an author's email addresses belongs to."""
+    emails = extract_emails(affiliation)
+    if email and email not in emails:
+        emails.append(email)
+    return domains.resolve_first(emails)
+
+
+def enrich_paper(paper: Union[Paper, dict]) -> dict:
+    """
+    Builds an output row with the company authors and email for one paper.
+
+    Authors, affiliations and matched queries stay lists; writers decide how
+    to lay them out (CSV joins them, JSONL and Parquet keep them as arrays).
+    The publication date is also given as a sortable ``YYYYMMDD`` key with
+    its precision (see ``dates.normalize_pubdate``), so date filters need
+    not parse it again.
+    """
+    paper = as_paper(paper)
+    stats = get_stats()
+    with stats.span("enrich"):
+        non_academic_authors = extract_company_authors(paper.authors)
+        email = extract_corresponding_email(paper.affiliations)
+        date, precision = normalize_pubdate(paper.pubdate)
+    stats.incr("records")
+
+    row = {
+        "PubmedID": paper.uid,
+        "Title": paper.title,
+        "Publication Date": paper.pubdate,
+        "Publication Date Key": date,
+        "Date Precision": precision,
+        "Non-academic Author(s)": [a[0] for a in non_academic_authors],
+        "Company Affiliation(s)": [a[1] for a in non_academic_authors],
+        "Corresponding Author Email": email,
+    }
+    if paper.queries:
+        row["Matched Queries"] = list(paper.queries)
+    return row
+
+
+def enrich_papers(papers: Iterable[Union[Paper, dict]]) -> Iterator[dict]:
+    """Lazily turns a stream of papers into output rows."""
+    for paper in papers:
+        yield enrich_paper(paper)
+
+
+def iter_pubmed_articles(source: Union[str, IO[bytes]]) -> Iterator[Paper]:
+    """
+    Streams papers out of EFetch / baseline ``PubmedArticleSet`` XML.
+
+    Each ``PubmedArticle`` is turned into a ``Paper`` as soon as its end tag
+    is parsed and is then cleared from the tree, so memory stays bounded by a
+    single article however large the document is. Authors carry their own
+    ``affiliation`` and ``email``, which ESummary does not provide.
+    """
+    stats = get_stats()
+    root = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if root is None:
+            root = elem
+        if event != "end" or elem.tag not in ("PubmedArticle", "PubmedBookArticle"):
+            continue
+
+        if elem.tag == "PubmedArticle":
+            with stats.span("parse.article"):
+                paper = _parse_article(elem)
+            yield paper
+        # Drop the finished article (and anything before it) from the tree.
+        root.clear()
+
+
+def _parse_article(article: ET.Element) -> Paper:
+    citation = article.find("MedlineCitation")
+    authors = []
+    affiliation_texts = []
+
+    for author in citation.iterfind("Article/AuthorList/Author"):
+        affiliations = [_text(aff) for aff in author.iterfind("AffiliationInfo/Affiliation")]
+        email = _text(author.find("ElectronicAddress"))
+        if not email:
+            email = next((found for found in map(_find_email, affiliations) if found), "")
+
+        authors.append(Author(_author_name(author), "; ".join(a for a in affiliations if a), email))
+        affiliation_texts.extend(affiliations)
+        if email:
+            affiliation_texts.append(email)
+
+    return Paper(
+        uid=_text(citation.find("PMID")),
+        title=_text(citation.find("Article/ArticleTitle")) or "N/A",
+        pubdate=_pubdate(citation.find("Article/Journal/JournalIssue/PubDate")),
+        authors=authors,
+        affiliations=" ".join(a for a in affiliation_texts if a),
+    )
+
+
+def _text(elem) -> str:
+    return "".join(elem.itertext()).strip() if elem is not None else ""
+
+
+def _author_name(author: ET.Element) -> str:
+    collective = _text(author.find("CollectiveName"))
+    if collective:
+        return collective
+    name = f"{_text(author.find('ForeName'))} {_text(author.find('LastName'))}".strip()
+    return name or "Unknown Author"
+
+
+def _pubdate(pubdate) -> str:
+    if pubdate is None:
+        return "N/A"
+    medline_date = _text(pubdate.find("MedlineDate"))
+    if medline_date:
+        return medline_date
+    parts = [_text(pubdate.find(tag)) for tag in ("Year", "Month", "Day")]
+    return " ".join(p for p in parts if p) or "N/A"
+
+
+def _find_email(text: str) -> str:
+    match = EMAIL_PATTERN.search(text)
+    return match.group(0) if match else ""
+
+
+def enrich_frame(
+    papers: Union["pd.DataFrame", Iterable[Union[Paper, dict]]],
+    classifier: Optional[AffiliationClassifier] = None,
+    domains: Optional[DomainIndex] = None,
+) -> "pd.DataFrame":
+    """
+    Vectorized ``enrich_paper`` over a whole batch of papers.
+
+    Authors are exploded into one row per affiliation and re-aggregated per
+    PMID. Each distinct affiliation is classified once with pandas string
+    operations on the compiled patterns, and each distinct affiliation and
+    email is resolved through the domain index once, which is what makes a
+    batch faster than the per-paper loop (see ``benchmarks/bench_enrich.py``).
+    Returns one row per paper with the same columns and values as
+    ``enrich_paper``.
+    """
+    # pandas is imported here rather than at module level so the CLI, which
+    # never needs it, does not pay for loading it on every invocation.
+    import pandas as pd
+
+    classifier = classifier or _classifier
+    domains = domains or get_domain_index()
+    if isinstance(papers, pd.DataFrame):
+        frame = papers
+    else:
+        frame = pd.DataFrame([p.to_dict() if isinstance(p, Paper) else p for p in papers])
+    frame = frame.reindex(columns=["uid", "title", "pubdate", "authors", "affiliations"]).reset_index(drop=True)
+
+    rows = pd.DataFrame(
+        {
+            "PubmedID": frame["uid"],
+            "Title": frame["title"].fillna("N/A"),
+            "Publication Date": frame["pubdate"].fillna("N/A"),
+        }
+    )
+    dates = [normalize_pubdate(value) for value in rows["Publication Date"]]
+    rows["Publication Date Key"] = pd.Series([key for key, _ in dates], index=rows.index, dtype="int64")
+    rows["Date Precision"] = pd.Series([precision for _, precision in dates], index=rows.index, dtype=object)
+    affiliations = frame["affiliations"].fillna("").astype(str)
+    emails = affiliations.str.extract(f"({EMAIL_PATTERN.pattern})", expand=False)
+    rows["Corresponding Author Email"] = emails.fillna("N/A")
+
+    authors = frame["authors"].apply(lambda a: a if isinstance(a, list) else []).explode().dropna()
+    authors = pd.DataFrame(
+        {
+            "paper": authors.index,
+            "author": range(len(authors)),
+            "name": pd.Series([a.get("name", "Unknown Author") for a in authors], dtype=object),
+            "affiliation": pd.Series([a.get("affiliation") or "" for a in authors], dtype=object),
+            "email": pd.Series([a.get("email") or "" for a in authors], dtype=object),
+        }
+    )
+    segments = authors.assign(affiliation=authors["affiliation"].str.split(";")).explode("affiliation")
+    segments["affiliation"] = segments["affiliation"].fillna("").str.strip()
+    # Affiliations recur across papers, so each distinct one is scanned once.
+    # Only company matches can be vetoed, so the academic scan runs on those alone.
+    distinct = pd.Series(segments["affiliation"].unique(), dtype=object)
+    distinct = distinct[distinct.str.contains(classifier.company_pattern)]
+    distinct = distinct[~distinct.str.contains(classifier.academic_pattern)]
+    names = {affiliation: classifier.lookup(affiliation)[1] for affiliation in distinct}
+    companies = segments[segments["affiliation"].isin(distinct)]
+    companies = companies.assign(affiliation=companies["affiliation"].map(names))
+
+    # Joining with a prefixed separator and a grouped ``sum`` keeps string
+    # concatenation in pandas' Cython group kernels instead of a Python
+    # callback per group.
+    per_author = companies.groupby("author", sort=True)[["paper", "name"]].first()
+    joined = ("; " + companies["affiliation"]).groupby(companies["author"]).sum()
+    per_author["affiliation"] = joined.str[2:].str.lower()
+
+    # Authors no keyword placed at a company can still be by an email domain.
+    # Addresses in the affiliation come before the author's own, as in
+    # ``enrich_paper``, and each distinct string is resolved only once.
+    rest = authors[~authors["author"].isin(per_author.index)].set_index("author")
+    if len(rest):
+        by_affiliation = {a: domains.resolve_first(extract_emails(a)) for a in rest["affiliation"].unique()}
+        by_email = {e: domains.resolve(e) for e in rest["email"].unique() if e}
+        company = rest["affiliation"].map(by_affiliation).fillna(rest["email"].map(by_email))
+        rest = rest.assign(affiliation=company.str.lower()).dropna(subset=["affiliation"])
+        per_author = pd.concat([per_author, rest[["paper", "name", "affiliation"]]]).sort_index()
+
+    rows["Non-academic Author(s)"] = _group_lists(per_author["name"], per_author["paper"], rows.index)
+    rows["Company Affiliation(s)"] = _group_lists(per_author["affiliation"], per_author["paper"], rows.index)
+    return rows[
+        [
+            "PubmedID",
+            "Title",
+            "Publication Date",
+            "Publication Date Key",
+            "Date Precision",
+            "Non-academic Author(s)",
+            "Company Affiliation(s)",
+            "Corresponding Author Email",
+        ]
+    ]
+
+
+def _group_lists(values: "pd.Series", keys: "pd.Series", index: "pd.Index") -> "pd.Series":
+    """Collects ``values`` into one list per key (keys must be sorted), with [] for missing keys."""
+    import numpy as np
+    import pandas as pd
+
+    keys = keys.to_numpy()
+    bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.concatenate(([0], bounds)) if len(keys) else bounds
+    groups = dict(zip(keys[starts], (part.tolist() for part in np.split(values.to_numpy(), bounds))))
+    return pd.Series([groups.get(key, []) for key in index], index=index, dtype=object)
@@ -0,0 +1,131 @@
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+# NCBI allows 3 requests/second per client without an API key, 10 with one.
+RATE_WITHOUT_API_KEY = 3.0
+RATE_WITH_API_KEY = 10.0
+
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+
+def rate_for(api_key: Optional[str]) -> float:
+    """Returns the request rate NCBI permits for the given API key."""
+    return RATE_WITH_API_KEY if api_key else RATE_WITHOUT_API_KEY
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every E-utilities request.
+
+    ``acquire`` blocks until a token is available. ``backoff`` is called when
+    NCBI answers 429/5xx: it pauses every caller for an exponentially growing,
+    jittered delay and, for 429s, halves the fill rate until successful
+    responses (``success``) gradually restore it.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[int] = None,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_cap: float = BACKOFF_CAP,
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.backoffs = 0
+        self.backoff_time = 0.0
+
+    def acquire(self) -> float:
+        """Blocks until a request may be sent and returns the seconds spent waiting."""
+        start = time.monotonic()
+        slept = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                delay = self._paused_until - now
+                if delay <= 0 and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.requests += 1
+                    if not slept:
+                        return 0.0
+                    waited = now - start
+                    self.waits += 1
+                    self.wait_time += waited
+                    return waited
+                if delay <= 0:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            slept = True
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None, throttled: bool = False) -> float:
+        """Pauses all callers after a 429/5xx response and returns the pause length."""
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** attempt)
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if isinstance(retry_after, str) and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            if throttled:
+                self.rate = max(self.max_rate / 4, self.rate / 2)
+                self._tokens = 0.0
+            self.backoffs += 1
+            self.backoff_time += delay
+        return delay
+
+    def success(self) -> None:
+        """Records a successful response, nudging a throttled rate back up."""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def stats(self) -> dict:
+        """Returns the limiter counters, including total time spent waiting."""
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "requests": self.requests,
+                "waits": self.waits,
+                "wait_time": round(self.wait_time, 3),
+                "backoffs": self.backoffs,
+                "backoff_time": round(self.backoff_time, 3),
+            }
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Returns the process-wide limiter, sized from ``NCBI_API_KEY`` on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(rate_for(os.environ.get("NCBI_API_KEY")))
+        return _limiter
+
+
+def set_rate_limiter(limiter: RateLimiter) -> None:
+    """Replaces the process-wide limiter."""
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Hashable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from pubmed_fetcher.fetcher import SOURCES, EutilsClient, get_client
+from pubmed_fetcher.parser import enrich_paper, get_classifier
+from pubmed_fetcher.ratelimit import get_rate_limiter
+from pubmed_fetcher.stats import get_stats
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait and receive the same result (or exception) instead of
+    repeating the work. Once the call finishes the key is forgotten, so later
+    callers start a fresh call.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class PaperService:
+    """
+    Long-lived query service holding a warm client, cache and classifier memo.
+
+    Identical concurrent searches are coalesced into one upstream harvest.
+    """
+
+    def __init__(self, client: Optional[EutilsClient] = None):
+        self.client = client or get_client()
+        self.flight = SingleFlight()
+
+    def search(self, query: str, max_results: int = 10, source: str = "esummary") -> list:
+        """Returns the output rows for a query, sharing the work with identical in-flight searches."""
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source {source!r}; expected one of {SOURCES}")
+
+        def run() -> list:
+            papers = self.client.harvest_pubmed_papers(query, max_results=max_results, source=source)
+            return [enrich_paper(paper) for paper in papers]
+
+        return self.flight.do((query, max_results, source), run)
+
+    def stats(self) -> dict:
+        snapshot = get_stats().snapshot()
+        snapshot["coalesced"] = self.flight.coalesced
+        snapshot["ratelimit"] = get_rate_limiter().stats()
+        snapshot["memo"] = get_classifier().memo_stats()
+        if self.client.cache is not None:
+            snapshot["cache"] = self.client.cache.stats()
+        return snapshot
+
+
+def _handler(service: PaperService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                if url.path == "/search":
+                    if not params.get("query"):
+                        return self._send(400, {"error": "query is required"})
+                    rows = service.search(
+                        params["query"],
+                        max_results=int(params.get("max_results", 10)),
+                        source=params.get("source", "esummary"),
+                    )
+                    return self._send(200, {"count": len(rows), "rows": rows})
+                if url.path == "/stats":
+                    return self._send(200, service.stats())
+                if url.path == "/health":
+                    return self._send(200, {"status": "ok"})
+                return self._send(404, {"error": f"unknown path {url.path}"})
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            except Exception as e:
+                logging.error(f"Failed to serve {self.path}: {e}", exc_info=True)
+                return self._send(500, {"error": str(e)})
+
+        def _send(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logging.debug(f"{self.command} {self.path}")
+
+    return Handler
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address.
+        return request, ("local", 0)
+
+
+def make_server(
+    service: PaperService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: Optional[str] = None
+) -> socketserver.BaseServer:
+    """Builds the HTTP server for ``service`` on a TCP port, or on a Unix socket when ``socket_path`` is given."""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return _UnixHTTPServer(socket_path, _handler(service))
+    server = ThreadingHTTPServer((host, port), _handler(service))
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,312 @@
+import calendar
+import datetime
+import logging
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from pubmed_fetcher.dates import date_key
+from pubmed_fetcher.fetcher import DETAILS_BATCH_SIZE, RETRIEVAL_CAP, EutilsClient, get_client
+from pubmed_fetcher.parser import enrich_paper
+from pubmed_fetcher.writers import open_writer, read_rows, write_rows
+
+SHARD_TARGET = 5000
+# The oldest records in PubMed date from 1781.
+EARLIEST_DATE = datetime.date(1781, 1, 1)
+LEASE_SECONDS = 600
+MAX_SHARD_ATTEMPTS = 3
+
+
+@dataclass
+class Shard:
+    """A query restricted to an inclusive publication-date range."""
+
+    query: str
+    mindate: datetime.date
+    maxdate: datetime.date
+    count: int
+    id: Optional[int] = None
+
+    def filters(self) -> dict:
+        """Returns the ESearch parameters that restrict the query to this shard."""
+        return _date_filters(self.mindate, self.maxdate)
+
+
+def plan_shards(
+    query: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    target: int = SHARD_TARGET,
+    client: Optional[EutilsClient] = None,
+) -> List[Shard]:
+    """
+    Splits a query into publication-date shards of at most ``target`` papers.
+
+    Starting from the whole ``since``-``until`` range, any range holding more
+    than ``target`` papers (never more than ``RETRIEVAL_CAP``) is halved and
+    each half counted, until every shard fits. Both halves are counted, since
+    ``pdat`` matches a paper by its electronic and its print date, so a paper
+    can fall in both and the halves need not add up to their parent. Each
+    count is a ``rettype=count`` ESearch, so planning costs two requests per
+    split however many papers match. Empty ranges are dropped, and shards come
+    back oldest first; papers in two shards are dropped again on merge.
+    """
+    client = client or get_client()
+    target = min(target, RETRIEVAL_CAP)
+    start = parse_date(since) if since else EARLIEST_DATE
+    end = parse_date(until, last=True) if until else datetime.date.today()
+
+    shards = []
+    pending = [(start, end, client.count_pubmed_ids(query, **_date_filters(start, end)))]
+    while pending:
+        start, end, count = pending.pop()
+        if not count:
+            continue
+        if count <= target or start == end:
+            if count > RETRIEVAL_CAP:
+                logging.warning(
+                    f"{count} papers on {start:%Y/%m/%d} exceed the ESearch cap and a day cannot be split; "
+                    f"only the first {RETRIEVAL_CAP} will be harvested"
+                )
+            shards.append(Shard(query, start, end, count))
+            continue
+        middle = start + (end - start) // 2
+        after = middle + datetime.timedelta(days=1)
+        pending.append((after, end, client.count_pubmed_ids(query, **_date_filters(after, end))))
+        pending.append((start, middle, client.count_pubmed_ids(query, **_date_filters(start, middle))))
+    return shards
+
+
+def parse_date(value: str, last: bool = False) -> datetime.date:
+    """
+    Parses a date such as ``2023``, ``2023/06`` or ``2023/06/15``. A partial
+    date means its first day, or its last day with ``last``.
+    """
+    key = date_key(value)
+    if not key:
+        raise ValueError(f"Unparseable date {value!r}")
+    year, month, day = key // 10000, key // 100 % 100, key % 100
+    if not month:
+        month = 12 if last else 1
+    if not day:
+        day = calendar.monthrange(year, month)[1] if last else 1
+    return datetime.date(year, month, day)
+
+
+def _date_filters(start: datetime.date, end: datetime.date) -> dict:
+    return {"datetype": "pdat", "mindate": f"{start:%Y/%m/%d}", "maxdate": f"{end:%Y/%m/%d}"}
+
+
+class ShardQueue:
+    """
+    SQLite work queue of shards shared by worker processes.
+
+    A worker claims the oldest pending shard under a time-limited lease and
+    renews it as it goes; a shard whose lease runs out (its worker died or
+    hung) can be claimed by another worker. Shards that fail are put back
+    until they have been tried ``MAX_SHARD_ATTEMPTS`` times. For workers on
+    several nodes the file must be on storage with working SQLite locking.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS shards (
+                id INTEGER PRIMARY KEY,
+                query TEXT NOT NULL,
+                mindate TEXT NOT NULL,
+                maxdate TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                output TEXT
+            );
+            """
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def add(self, shards: List[Shard]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO shards (query, mindate, maxdate, count) VALUES (?, ?, ?, ?)",
+                [(s.query, s.mindate.isoformat(), s.maxdate.isoformat(), s.count) for s in shards],
+            )
+
+    def claim(self, worker: str, lease: float = LEASE_SECONDS) -> Optional[Shard]:
+        """Leases the next pending (or abandoned) shard to ``worker``; None when there is none."""
+        now = time.time()
+        with self._conn:
+            # Take the write lock before looking, so two workers cannot claim the same shard.
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                """
+                SELECT id, query, mindate, maxdate, count FROM shards
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY id LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE shards SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker, now + lease, row[0]),
+            )
+        shard_id, query, mindate, maxdate, count = row
+        return Shard(query, datetime.date.fromisoformat(mindate), datetime.date.fromisoformat(maxdate), count, shard_id)
+
+    def renew(self, shard_id: int, worker: str, lease: float = LEASE_SECONDS) -> bool:
+        """Extends the worker's lease; False if the shard has been taken over."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "UPDATE shards SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease, shard_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, shard_id: int, worker: str, output: Optional[str]) -> bool:
+        """Marks the shard done with its output file; False if the shard has been taken over."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "UPDATE shards SET status = 'done', output = ?, lease_expires = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (output, shard_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, shard_id: int, worker: str) -> None:
+        """Puts the shard back for another attempt, or marks it failed once attempts run out."""
+        with self._conn:
+            self._conn.execute(
+                "UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_expires = NULL WHERE id = ? AND worker = ? AND status = 'leased'",
+                (MAX_SHARD_ATTEMPTS, shard_id, worker),
+            )
+
+    def status(self) -> dict:
+        """Returns the number of shards and of papers in each status."""
+        rows = self._conn.execute("SELECT status, COUNT(*), SUM(count) FROM shards GROUP BY status")
+        return {status: {"shards": shards, "papers": papers} for status, shards, papers in rows}
+
+    def outputs(self) -> List[str]:
+        """Returns the output files of finished shards, oldest shard first."""
+        rows = self._conn.execute("SELECT output FROM shards WHERE status = 'done' AND output IS NOT NULL ORDER BY id")
+        return [output for (output,) in rows]
+
+
+def run_worker(
+    queue: ShardQueue,
+    output_dir: str,
+    format: str = "csv",
+    source: str = "esummary",
+    worker: Optional[str] = None,
+    lease: float = LEASE_SECONDS,
+    max_shards: Optional[int] = None,
+    client: Optional[EutilsClient] = None,
+) -> dict:
+    """
+    Claims shards from the queue until it is empty, writing each one's rows
+    to its own file in ``output_dir``. The lease is renewed after every
+    chunk; if it has been lost, the shard is abandoned to its new owner. A
+    shard fails if its search is cut short, or if it holds more than
+    ``RETRIEVAL_CAP`` papers over several days and should be planned again.
+    A single day over the cap cannot be split, so its first
+    ``RETRIEVAL_CAP`` papers are harvested with a warning.
+    Returns counts of shards finished and failed and of rows written.
+    """
+    client = client or get_client()
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    os.makedirs(output_dir, exist_ok=True)
+    totals = {"shards": 0, "failed": 0, "written": 0}
+
+    while max_shards is None or totals["shards"] + totals["failed"] < max_shards:
+        shard = queue.claim(worker, lease)
+        if shard is None:
+            break
+        output = os.path.join(output_dir, f"shard-{shard.id:05d}-{worker}.{format}")
+        logging.info(f"Shard {shard.id}: {shard.query!r} {shard.mindate} to {shard.maxdate} (~{shard.count} papers)")
+        try:
+            written = _harvest_shard(shard, queue, worker, lease, output, format, source, client)
+        except Exception as e:
+            logging.error(f"Shard {shard.id} failed: {e}")
+            queue.fail(shard.id, worker)
+            if os.path.exists(output):
+                os.remove(output)
+            totals["failed"] += 1
+            continue
+        if queue.complete(shard.id, worker, output if written else None):
+            totals["shards"] += 1
+            totals["written"] += written
+        elif os.path.exists(output):
+            os.remove(output)
+    return totals
+
+
+def _harvest_shard(
+    shard: Shard, queue: ShardQueue, worker: str, lease: float, output: str, format: str, source: str, client
+) -> int:
+    pmids = client.search_pubmed_ids(shard.query, None, **shard.filters())
+    if pmids.count is None:
+        raise RuntimeError("search failed")
+    if pmids.count > RETRIEVAL_CAP:
+        if shard.mindate != shard.maxdate:
+            raise RuntimeError(f"{pmids.count} papers exceed the ESearch cap of {RETRIEVAL_CAP}; plan smaller shards")
+        logging.warning(
+            f"Shard {shard.id}: {pmids.count} papers on {shard.mindate} exceed the ESearch cap; "
+            f"harvesting the first {RETRIEVAL_CAP}"
+        )
+    if len(pmids) < min(pmids.count, RETRIEVAL_CAP):
+        raise RuntimeError(f"listed only {len(pmids)} of {pmids.count} PMIDs")
+    failed = []
+    with open_writer(output, format) as writer:
+        for i in range(0, len(pmids), DETAILS_BATCH_SIZE):
+            chunk = pmids[i:i + DETAILS_BATCH_SIZE]
+            papers, failed_ids = client.fetch_chunk_splitting(source, chunk)
+            failed.extend(failed_ids)
+            for pmid in chunk:
+                if pmid in papers:
+                    writer.write(enrich_paper(papers[pmid]))
+            if not queue.renew(shard.id, worker, lease):
+                raise RuntimeError("lease lost to another worker")
+    if failed:
+        raise RuntimeError(f"{len(failed)} papers could not be fetched")
+    return writer.count
+
+
+def iter_merged_rows(queue: ShardQueue) -> Iterator[dict]:
+    """Yields the rows of every finished shard, dropping PMIDs already yielded."""
+    seen = set()
+    for output in queue.outputs():
+        for row in read_rows(output):
+            if row["PubmedID"] not in seen:
+                seen.add(row["PubmedID"])
+                yield row
+
+
+def merge_outputs(queue: ShardQueue, path: str, format: str = "csv", partitioned: bool = False) -> int:
+    """
+    Writes the deduplicated rows of every finished shard to one file (or a
+    date-partitioned directory) and returns the row count.
+    """
+    unfinished = sum(v["shards"] for status, v in queue.status().items() if status != "done")
+    if unfinished:
+        logging.warning(f"{unfinished} shards are not done; merging the finished ones only")
+    return write_rows(iter_merged_rows(queue), path, format, partitioned=partitioned)
@@ -0,0 +1,129 @@
+import datetime
+import logging
+import os
+import sqlite3
+from typing import Iterable, Iterator, Optional
+
+from pubmed_fetcher.fetcher import DETAILS_BATCH_SIZE, EutilsClient, get_client
+from pubmed_fetcher.models import Paper
+
+
+class HarvestState:
+    """
+    SQLite record of what each query has already harvested.
+
+    For every query it keeps the PMIDs written so far and the Entrez date
+    (``edat``) up to which the query is complete, so the next run only has to
+    search that date onward and fetch PMIDs it has not seen.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS queries (
+                query TEXT PRIMARY KEY,
+                last_date TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS seen (
+                query TEXT NOT NULL,
+                pmid TEXT NOT NULL,
+                PRIMARY KEY (query, pmid)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def last_date(self, query: str) -> Optional[str]:
+        """Returns the ``YYYY/MM/DD`` date the query was last harvested up to."""
+        row = self._conn.execute("SELECT last_date FROM queries WHERE query = ?", (query,)).fetchone()
+        return row[0] if row else None
+
+    def filter_new(self, query: str, pmids: Iterable[str]) -> list:
+        """Returns the PMIDs not yet recorded for the query, in their original order."""
+        pmids = list(dict.fromkeys(pmids))
+        seen = set()
+        for i in range(0, len(pmids), 500):
+            chunk = pmids[i:i + 500]
+            seen.update(
+                pmid
+                for (pmid,) in self._conn.execute(
+                    f"SELECT pmid FROM seen WHERE query = ? AND pmid IN ({','.join('?' * len(chunk))})",
+                    [query, *chunk],
+                )
+            )
+        return [pmid for pmid in pmids if pmid not in seen]
+
+    def record(self, query: str, pmids: Iterable[str]) -> None:
+        """Marks PMIDs as harvested for the query."""
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?)", [(query, pmid) for pmid in pmids])
+
+    def complete(self, query: str, last_date: str) -> None:
+        """Moves the query's high-water mark to ``last_date``."""
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO queries VALUES (?, ?)", (query, last_date))
+
+
+def harvest_new_papers(
+    query: str,
+    state: HarvestState,
+    max_results: Optional[int] = None,
+    source: str = "esummary",
+    client: Optional[EutilsClient] = None,
+    today: Optional[datetime.date] = None,
+) -> Iterator[Paper]:
+    """
+    Yields only the papers the query has gained since its last harvest.
+
+    The search is limited to papers added to PubMed (``datetype=edat``) from
+    the stored high-water date until today; that date is searched again
+    because it may not have been complete, and PMIDs already recorded are
+    filtered out before anything is fetched, so with ``max_results`` each run
+    takes the next new papers. A PMID is recorded once its paper has been
+    yielded and the consumer has come back for more. The high-water date only
+    moves when the generator is exhausted having yielded every match: if the
+    search was capped or cut short, ``max_results`` left new papers over, or
+    some papers could not be fetched, the old date is kept so the next run
+    picks them up. A search that fails outright raises ``RuntimeError``
+    rather than passing for a query with nothing new.
+    """
+    client = client or get_client()
+    maxdate = (today or datetime.date.today()).strftime("%Y/%m/%d")
+    mindate = state.last_date(query)
+    filters = {"datetype": "edat", "mindate": mindate, "maxdate": maxdate} if mindate else {}
+
+    pmids = client.search_pubmed_ids(query, None, **filters)
+    if pmids.count is None:
+        raise RuntimeError(f"Search for {query!r} failed; the last harvest date is unchanged")
+    paper_ids = state.filter_new(query, pmids)
+    logging.info(f"{len(paper_ids)} new papers for {query!r} since {mindate or 'the first run'}")
+    complete = pmids.complete and len(pmids) == pmids.count
+    if max_results is not None and len(paper_ids) > max_results:
+        paper_ids, complete = paper_ids[:max_results], False
+
+    fetch = client.fetch_paper_records if source == "efetch" else client.fetch_paper_details
+    missing = 0
+    for i in range(0, len(paper_ids), DETAILS_BATCH_SIZE):
+        chunk = paper_ids[i:i + DETAILS_BATCH_SIZE]
+        yielded = []
+        for paper in fetch(chunk):
+            yield paper
+            yielded.append(paper.uid)
+        state.record(query, yielded)
+        missing += len(chunk) - len(yielded)
+
+    if missing:
+        reason = f"{missing} papers could not be fetched"
+    elif not complete:
+        reason = "not every new paper was harvested"
+    else:
+        state.complete(query, maxdate)
+        return
+    logging.warning(f"Harvest of {query!r} is incomplete ({reason}); keeping its high-water date {mindate or '(none)'}")
@@ -0,0 +1,186 @@
+import cProfile
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+STATS_FORMATS = ("json", "openmetrics")
+
+
+class _Span:
+    """Times one ``with`` block into a named stage; cheap enough to wrap every record."""
+
+    __slots__ = ("_stats", "_name", "_start")
+
+    def __init__(self, stats: "Stats", name: str):
+        self._stats = stats
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stats.add_time(self._name, time.perf_counter() - self._start)
+
+
+class Stats:
+    """
+    Per-stage timings and counters for one run.
+
+    Stages (``span``) accumulate a call count and total seconds; counters
+    (``incr``) accumulate any number, such as requests sent or bytes received;
+    gauges (``gauge``) hold the last value set, for figures read from other
+    components at the end of a run. Stage names are dotted, e.g.
+    ``http.esummary`` or ``write.csv``. All methods are thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.perf_counter()
+            self.spans = {}
+            self.counters = {}
+            self.gauges = {}
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            span = self.spans.setdefault(name, [0, 0.0])
+            span[0] += 1
+            span[1] += seconds
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self.gauges[name] = value
+
+    def gauges_from(self, prefix: str, values: dict) -> None:
+        """Records every numeric entry of a component's ``stats()`` dict as a gauge."""
+        for key, value in values.items():
+            if isinstance(value, (int, float)):
+                self.gauge(f"{prefix}.{key}", value)
+
+    def snapshot(self) -> dict:
+        """Returns all figures, plus wall time and records/second, as plain data."""
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            records = self.counters.get("records", 0)
+            return {
+                "elapsed_seconds": round(elapsed, 6),
+                "records_per_second": round(records / elapsed, 3) if elapsed else 0.0,
+                "spans": {
+                    name: {"count": count, "seconds": round(seconds, 6)}
+                    for name, (count, seconds) in self.spans.items()
+                },
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+
+    def report(self) -> str:
+        """Formats the snapshot as a summary table for the terminal."""
+        snapshot = self.snapshot()
+        elapsed = snapshot["elapsed_seconds"]
+        lines = [f"{'stage':<24} {'calls':>9} {'seconds':>10} {'% wall':>7}"]
+        for name, span in sorted(snapshot["spans"].items(), key=lambda item: -item[1]["seconds"]):
+            share = 100 * span["seconds"] / elapsed if elapsed else 0.0
+            lines.append(f"{name:<24} {span['count']:>9} {span['seconds']:>10.3f} {share:>6.1f}%")
+        lines.append("")
+        for name, value in sorted({**snapshot["counters"], **snapshot["gauges"]}.items()):
+            lines.append(f"{name:<24} {_format_number(value):>20}")
+        lines.append(f"{'wall time (s)':<24} {elapsed:>20.3f}")
+        lines.append(f"{'records/s':<24} {snapshot['records_per_second']:>20.1f}")
+        return "\n".join(lines)
+
+    def to_openmetrics(self, namespace: str = "pubmed_fetcher") -> str:
+        """Formats the snapshot in the OpenMetrics text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            f"# TYPE {namespace}_stage_seconds counter",
+            *(
+                f'{namespace}_stage_seconds_total{{stage="{name}"}} {span["seconds"]}'
+                for name, span in sorted(snapshot["spans"].items())
+            ),
+            f"# TYPE {namespace}_stage_calls counter",
+            *(
+                f'{namespace}_stage_calls_total{{stage="{name}"}} {span["count"]}'
+                for name, span in sorted(snapshot["spans"].items())
+            ),
+        ]
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"{namespace}_{_metric_name(name)}"
+            lines += [f"# TYPE {metric} counter", f"{metric}_total {value}"]
+        for name, value in sorted(snapshot["gauges"].items()):
+            metric = f"{namespace}_{_metric_name(name)}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+        lines += [
+            f"# TYPE {namespace}_elapsed_seconds gauge",
+            f"{namespace}_elapsed_seconds {snapshot['elapsed_seconds']}",
+            "# EOF",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str, format: str = "json") -> None:
+        """Writes the snapshot to ``path`` as JSON or OpenMetrics text."""
+        with open(path, "w", encoding="utf-8") as f:
+            if format == "openmetrics":
+                f.write(self.to_openmetrics())
+            else:
+                json.dump(self.snapshot(), f, indent=2)
+
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+def _format_number(value: float) -> str:
+    return f"{value:,.3f}" if isinstance(value, float) else f"{value:,}"
+
+
+@contextmanager
+def profiled(path: Optional[str]) -> Iterator[None]:
+    """
+    Runs the block under cProfile and tracemalloc when ``path`` is given.
+
+    The CPU profile is written to ``path`` (readable with ``pstats`` or
+    snakeviz) and the peak traced memory plus the top allocation sites to
+    ``path + ".memory.txt"``.
+    """
+    if not path:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(path)
+        with open(path + ".memory.txt", "w", encoding="utf-8") as f:
+            f.write(f"current traced memory: {current:,} bytes\npeak traced memory: {peak:,} bytes\n\n")
+            for stat in snapshot.statistics("lineno")[:25]:
+                f.write(f"{stat}\n")
+
+
+_stats = Stats()
+
+
+def get_stats() -> Stats:
+    """Returns the process-wide stats collector."""
+    return _stats
@@ -1,23 +1,30 @@
-import csv
-import pandas as pd
+from typing import Iterable
 
+from pubmed_fetcher.writers import write_rows
 
-def save_to_csv(data: list[dict], filename: str) -> None:
-    """Saves the extracted paper data to a CSV file."""
-    if not data:
-        print("No data to save.")
-        return
 
-    df = pd.DataFrame(data)
-    df.to_csv(filename, index=False)
-    print(f"Data saved to {filename}")
+def save_to_csv(data: Iterable[dict], filename: str, flush_every: int = 500, append: bool = False) -> None:
+    """
+    Saves the extracted paper data to a CSV file.
+
+    Rows are written as they are produced and flushed every ``flush_every``
+    rows, so ``data`` can be a generator of any length. With ``append`` the
+    rows are added to an existing file under its current header.
+    """
+    count = write_rows(data, filename, "csv", append=append, batch_size=flush_every)
+    if count:
+        print(f"Data saved to {filename}")
+    else:
+        print("No data to save.")
 
 
-def print_results(data: list[dict]) -> None:
-    """Prints the results to the console."""
-    for paper in data:
-        print(f"Title: {paper.get('title', 'N/A')}")
-        print(f"Publication Date: {paper.get('pub_date', 'N/A')}")
-        print(f"Authors: {', '.join(paper.get('authors', []))}")
-        print(f"Corresponding Email: {paper.get('email', 'N/A')}")
+def print_results(data: Iterable[dict]) -> None:
+    """Prints the output rows to the console."""
+    for row in data:
+        print(f"PubMed ID: {row.get('PubmedID', 'N/A')}")
+        print(f"Title: {row.get('Title', 'N/A')}")
+        print(f"Publication Date: {row.get('Publication Date', 'N/A')}")
+        print(f"Non-academic Authors: {', '.join(row.get('Non-academic Author(s)', [])) or 'N/A'}")
+        print(f"Company Affiliations: {'; '.join(row.get('Company Affiliation(s)', [])) or 'N/A'}")
+        print(f"Corresponding Email: {row.get('Corresponding Author Email', 'N/A')}")
         print("-" * 50)
@@ -0,0 +1,392 @@
+import csv
+import json
+import os
+import re
+import uuid
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+
+from pubmed_fetcher.dates import date_key, upper_date_key
+from pubmed_fetcher.stats import get_stats
+
+FORMATS = ("csv", "jsonl", "parquet")
+ROW_GROUP_SIZE = 10_000
+
+# Partition directories kept open at once by ``PartitionedWriter``.
+MAX_OPEN_PARTITIONS = 64
+# Hive's name for the partition of rows with no value.
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# CSV has no list type, so list values are joined; queries may contain commas.
+CSV_LIST_SEPARATORS = {"Matched Queries": "; "}
+CSV_LIST_SEPARATOR = ", "
+
+
+class RowWriter:
+    """
+    Base class for streaming output writers.
+
+    Rows are passed to ``write`` one at a time as they are produced; the
+    writer opens its file on the first row, so the column layout can be taken
+    from it, and ``close`` finishes the file.
+    """
+
+    format = ""
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.append = append
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, row: dict) -> None:
+        with get_stats().span(f"write.{self.format}"):
+            if self.count == 0:
+                self._open(row)
+            self._write(row)
+        self.count += 1
+
+    def write_many(self, rows: Iterable[dict]) -> None:
+        for row in rows:
+            self.write(row)
+
+    def checkpoint(self) -> Optional[int]:
+        """
+        Makes everything written so far durable and returns the file offset it
+        ends at, or None if the format cannot be resumed from an offset.
+        """
+        return None
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def _open(self, first: dict) -> None:
+        raise NotImplementedError
+
+    def _write(self, row: dict) -> None:
+        raise NotImplementedError
+
+
+class _TextWriter(RowWriter):
+    """Base for writers backed by a single text file opened on the first row."""
+
+    def __init__(self, path: str, append: bool = False):
+        super().__init__(path, append)
+        self._file = None
+
+    def checkpoint(self) -> Optional[int]:
+        if self._file is None:
+            return None
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class CsvWriter(_TextWriter):
+    """Writes rows as CSV, joining list values and flushing every ``flush_every`` rows."""
+
+    format = "csv"
+
+    def __init__(self, path: str, append: bool = False, flush_every: int = 500):
+        super().__init__(path, append)
+        self.flush_every = flush_every
+        self._writer = None
+
+    def _open(self, first: dict) -> None:
+        fieldnames = _read_csv_header(self.path) if self.append else None
+        self._file = open(self.path, "a" if fieldnames else "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames or list(first), extrasaction="ignore")
+        if not fieldnames:
+            self._writer.writeheader()
+
+    def _write(self, row: dict) -> None:
+        self._writer.writerow(
+            {
+                key: CSV_LIST_SEPARATORS.get(key, CSV_LIST_SEPARATOR).join(value) if isinstance(value, list) else value
+                for key, value in row.items()
+            }
+        )
+        if (self.count + 1) % self.flush_every == 0:
+            self._file.flush()
+
+
+class JsonlWriter(_TextWriter):
+    """Writes one JSON object per line and flushes after every record."""
+
+    format = "jsonl"
+
+    def _open(self, first: dict) -> None:
+        self._file = open(self.path, "a" if self.append else "w", encoding="utf-8")
+
+    def _write(self, row: dict) -> None:
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+
+class ParquetWriter(RowWriter):
+    """
+    Writes rows to Parquet in fixed-size row groups.
+
+    Rows are buffered until ``row_group_size`` have arrived and then written
+    as one row group, so memory is bounded by a single group. List values
+    become ``list<string>`` columns, integers ``int64`` and everything else
+    is stored as strings. Requires ``pyarrow``.
+    """
+
+    format = "parquet"
+
+    def __init__(self, path: str, append: bool = False, row_group_size: int = ROW_GROUP_SIZE):
+        if append:
+            raise ValueError("Parquet files cannot be appended to; write a new file per run.")
+        super().__init__(path, append)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow") from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.row_group_size = row_group_size
+        self._schema = None
+        self._writer = None
+        self._buffer = []
+
+    def _open(self, first: dict) -> None:
+        pa = self._pa
+        self._schema = pa.schema([(key, _arrow_type(pa, value)) for key, value in first.items()])
+        self._writer = self._pq.ParquetWriter(self.path, self._schema)
+
+    def _write(self, row: dict) -> None:
+        self._buffer.append(row)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        columns = {}
+        for field in self._schema:
+            values = [row.get(field.name) for row in self._buffer]
+            if self._pa.types.is_string(field.type):
+                values = [None if value is None else str(value) for value in values]
+            columns[field.name] = values
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+        self._buffer = []
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+
+
+def _arrow_type(pa, value):
+    if isinstance(value, list):
+        return pa.list_(pa.string())
+    if isinstance(value, int) and not isinstance(value, bool):
+        return pa.int64()
+    return pa.string()
+
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+
+class PartitionedWriter(RowWriter):
+    """
+    Writes rows into a Hive-style directory partitioned by publication date.
+
+    Each row goes to ``<path>/year=YYYY/month=M/`` according to its
+    ``Publication Date Key``; rows whose year or month is unknown go to the
+    ``__HIVE_DEFAULT_PARTITION__`` directory at that level. Every partition
+    is written as ``part-*`` files in ``format`` by the ordinary writers, one
+    per partition still open, so rows stream straight through without
+    sorting. At most ``MAX_OPEN_PARTITIONS`` are open at a time; when another
+    is needed the least recently used one is finished, and a later row for
+    it starts a new part file. Appending adds part files beside the existing
+    ones. Engines that understand Hive partitioning (and
+    ``read_partitions``) can then skip partitions outside a date range.
+    """
+
+    def __init__(self, path: str, format: str = "csv", append: bool = False, **options):
+        if format not in WRITERS:
+            raise ValueError(f"Unknown output format {format!r}; expected one of {', '.join(FORMATS)}")
+        if not append and os.path.isdir(path) and os.listdir(path):
+            raise ValueError(f"{path} already exists and is not empty; append to it or choose a new directory.")
+        super().__init__(path, append)
+        self.format = format
+        self.options = options
+        self._run = uuid.uuid4().hex[:8]
+        self._parts = 0
+        self._writers = OrderedDict()
+
+    def write(self, row: dict) -> None:
+        # Timing is left to the partition writers, which record it under their own format.
+        partition = partition_path(int(row.get("Publication Date Key") or 0))
+        writer = self._writers.get(partition)
+        if writer is None:
+            if len(self._writers) >= MAX_OPEN_PARTITIONS:
+                self._writers.popitem(last=False)[1].close()
+            directory = os.path.join(self.path, partition)
+            os.makedirs(directory, exist_ok=True)
+            part = os.path.join(directory, f"part-{self._run}-{self._parts:05d}.{self.format}")
+            self._parts += 1
+            writer = self._writers[partition] = WRITERS[self.format](part, **self.options)
+        else:
+            self._writers.move_to_end(partition)
+        writer.write(row)
+        self.count += 1
+
+    def close(self) -> None:
+        while self._writers:
+            self._writers.popitem(last=False)[1].close()
+
+
+def partition_path(key: int) -> str:
+    """Returns the ``year=/month=`` directory for a ``YYYYMMDD`` date key."""
+    year, month = key // 10000, key // 100 % 100
+    if not year:
+        return os.path.join(f"year={DEFAULT_PARTITION}", f"month={DEFAULT_PARTITION}")
+    return os.path.join(f"year={year}", f"month={month or DEFAULT_PARTITION}")
+
+
+def open_writer(
+    path: str, format: str = "csv", append: bool = False, partitioned: bool = False, **options
+) -> RowWriter:
+    """
+    Returns the writer for ``format``; ``options`` go to its constructor.
+    With ``partitioned``, ``path`` is a directory partitioned by date (see
+    ``PartitionedWriter``).
+    """
+    if partitioned:
+        return PartitionedWriter(path, format, append=append, **options)
+    if format not in WRITERS:
+        raise ValueError(f"Unknown output format {format!r}; expected one of {', '.join(FORMATS)}")
+    return WRITERS[format](path, append=append, **options)
+
+
+def write_rows(
+    rows: Iterable[dict],
+    path: str,
+    format: str = "csv",
+    append: bool = False,
+    batch_size: Optional[int] = None,
+    partitioned: bool = False,
+) -> int:
+    """
+    Streams rows into ``path`` in the given format and returns how many were written.
+
+    ``batch_size`` sets how often CSV is flushed and the Parquet row group
+    size; JSONL is flushed after every row regardless. With ``partitioned``
+    the rows are spread over a ``year=/month=`` directory tree at ``path``.
+    """
+    options = {}
+    if batch_size and format == "csv":
+        options["flush_every"] = batch_size
+    elif batch_size and format == "parquet":
+        options["row_group_size"] = batch_size
+    with open_writer(path, format, append=append, partitioned=partitioned, **options) as writer:
+        writer.write_many(rows)
+    return writer.count
+
+
+def read_rows(path: str, format: Optional[str] = None) -> Iterator[dict]:
+    """
+    Yields the rows of a file written in one of ``FORMATS``; the format
+    defaults to the file's extension. CSV values come back as strings, with
+    list columns still joined.
+    """
+    format = format or os.path.splitext(path)[1].lstrip(".").lower()
+    if format == "csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    elif format == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif format == "parquet":
+        try:
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Parquet input requires pyarrow: pip install pyarrow") from e
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Unknown input format {format!r}; expected one of {', '.join(FORMATS)}")
+
+
+_PARTITION = re.compile(r"^(year|month)=(.*)$")
+
+
+def read_partitions(path: str, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[dict]:
+    """
+    Yields the rows of a ``PartitionedWriter`` directory published between
+    ``since`` and ``until`` (inclusive; e.g. ``2023`` or ``2023/06``).
+
+    Only the year and month directories that can overlap the range are
+    listed and opened; rows inside them are then checked against the range
+    by their ``Publication Date Key``. With a bound, rows in the
+    unknown-date partition are skipped.
+    """
+    low = date_key(since) if since else None
+    high = upper_date_key(until) if until else None
+
+    def overlaps(first: int, last: int) -> bool:
+        return (low is None or last >= low) and (high is None or first <= high)
+
+    for year in _partition_values(path, "year"):
+        if year is None:
+            if low is None and high is None:
+                yield from _read_partition_tree(os.path.join(path, f"year={DEFAULT_PARTITION}"))
+            continue
+        if not overlaps(year * 10000, year * 10000 + 1299):
+            continue
+        year_path = os.path.join(path, f"year={year}")
+        for month in _partition_values(year_path, "month"):
+            if month is None:
+                first, last, name = year * 10000, year * 10000 + 1299, DEFAULT_PARTITION
+            else:
+                first, last, name = year * 10000 + month * 100, year * 10000 + month * 100 + 99, month
+            if not overlaps(first, last):
+                continue
+            for row in _read_partition_tree(os.path.join(year_path, f"month={name}")):
+                key = int(row.get("Publication Date Key") or 0)
+                if (low is None or key >= low) and (high is None or key <= high):
+                    yield row
+
+
+def _partition_values(path: str, name: str) -> list:
+    """Returns the sorted values of ``name=`` subdirectories, with None for the default partition last."""
+    values = []
+    for entry in os.listdir(path):
+        match = _PARTITION.match(entry)
+        if match and match.group(1) == name and os.path.isdir(os.path.join(path, entry)):
+            values.append(None if match.group(2) == DEFAULT_PARTITION else int(match.group(2)))
+    return sorted(values, key=lambda value: (value is None, value or 0))
+
+
+def _read_partition_tree(path: str) -> Iterator[dict]:
+    for directory, subdirectories, files in os.walk(path):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.startswith("part-"):
+                yield from read_rows(os.path.join(directory, name))
+
+
+def _read_csv_header(path: str) -> list:
+    """Returns the header of an existing CSV file, or [] if there is none."""
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), [])
+    except FileNotFoundError:
+        return []
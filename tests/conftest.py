@@ -0,0 +1,30 @@
+import pytest
+
+from eutils_stub import EutilsStub
+from pubmed_fetcher.fetcher import EutilsClient, set_client
+from pubmed_fetcher.ratelimit import RateLimiter, set_rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def fast_rate_limiter():
+    """Keeps tests from being paced at NCBI's real request rate."""
+    limiter = RateLimiter(rate=10000, backoff_base=0.001)
+    set_rate_limiter(limiter)
+    yield limiter
+
+
+@pytest.fixture(autouse=True)
+def default_client():
+    """Gives every test a fresh, uncached default client."""
+    client = EutilsClient()
+    set_client(client)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def eutils_stub():
+    """Runs a local E-utilities stub for the duration of a test."""
+    stub = EutilsStub(size=1234).start()
+    yield stub
+    stub.stop()
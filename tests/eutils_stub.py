@@ -0,0 +1,228 @@
+"""A tiny in-process stand-in for the NCBI E-utilities used by the tests."""
+import gzip
+import json
+import random
+import threading
+import time
+from xml.sax.saxutils import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class EutilsStub:
+    """
+    Serves esearch/esummary/efetch over a synthetic corpus of ``size`` PMIDs.
+
+    ``latency`` delays every response by that many seconds, and a
+    ``throttle_rate`` fraction of requests is answered with a 429, so the
+    client's pacing and retry paths can be exercised (and benchmarked).
+    """
+
+    def __init__(
+        self,
+        size: int = 1000,
+        first_pmid: int = 30000000,
+        latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.pmids = [str(first_pmid + i) for i in range(size)]
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.throttled = 0
+        # Requests naming any of these PMIDs fail with a 500.
+        self.fail_pmids = set()
+        # Responses naming any of these PMIDs are cut off halfway through the body.
+        self.truncate_pmids = set()
+        # Gzip response bodies for clients that accept it.
+        self.gzip = False
+        # EFetch records for these PMIDs have only academic authors.
+        self.academic_pmids = set()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = []
+        self.connections = set()
+        # Optional per-term results; terms not listed here match every PMID.
+        self.queries = {}
+        # Optional "YYYY/MM/DD" publication date per PMID, used to answer
+        # mindate/maxdate searches; without it dates are not filtered. A tuple
+        # of dates (say electronic and print) matches a range holding any of them.
+        self.pubdates = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "EutilsStub":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def throttle(self) -> bool:
+        """Decides whether the current request gets a 429."""
+        if not self.throttle_rate:
+            return False
+        with self._lock:
+            throttled = self._random.random() < self.throttle_rate
+            self.throttled += throttled
+        return throttled
+
+    def summary(self, pmid: str) -> dict:
+        return {
+            "uid": pmid,
+            "title": f"Synthetic paper {pmid}",
+            "pubdate": "2024 Jan 1",
+            "authors": [{"name": f"Author {pmid}", "authtype": "Author"}],
+        }
+
+    def _dates(self, pmid: str) -> tuple:
+        dates = self.pubdates[pmid]
+        return (dates,) if isinstance(dates, str) else dates
+
+    def esearch(self, params: dict) -> dict:
+        retstart = int(params.get("retstart", 0))
+        retmax = int(params.get("retmax", 20))
+        pmids = self.queries.get(params.get("term"), self.pmids)
+        if self.pubdates and "mindate" in params:
+            pmids = [p for p in pmids if any(params["mindate"] <= d <= params["maxdate"] for d in self._dates(p))]
+        if params.get("rettype") == "count":
+            return {"esearchresult": {"count": str(len(pmids))}}
+        result = {
+            "count": str(len(pmids)),
+            "retmax": str(retmax),
+            "retstart": str(retstart),
+            "idlist": pmids[retstart:retstart + retmax],
+        }
+        if params.get("usehistory") == "y":
+            result.update({"webenv": "STUB_WEBENV", "querykey": "1"})
+        return {"esearchresult": result}
+
+    def esummary(self, params: dict) -> dict:
+        if "id" in params:
+            known = set(self.pmids)
+            ids = [pmid for pmid in params["id"].split(",") if pmid in known]
+        else:
+            retstart = int(params.get("retstart", 0))
+            retmax = int(params.get("retmax", 20))
+            ids = self.pmids[retstart:retstart + retmax]
+        result = {"uids": ids}
+        result.update({pmid: self.summary(pmid) for pmid in ids})
+        return {"result": result}
+
+    def efetch(self, params: dict) -> str:
+        if "id" in params:
+            known = set(self.pmids)
+            ids = [pmid for pmid in params["id"].split(",") if pmid in known]
+        else:
+            retstart = int(params.get("retstart", 0))
+            retmax = int(params.get("retmax", 20))
+            ids = self.pmids[retstart:retstart + retmax]
+        return "<PubmedArticleSet>" + "".join(self.article(pmid) for pmid in ids) + "</PubmedArticleSet>"
+
+    def elink(self, params: dict) -> dict:
+        """
+        Answers ELink over a synthetic citation graph in which the paper at
+        index i cites those at i - 1 and i - 10.
+        """
+        ids = params["id"] if isinstance(params["id"], list) else [params["id"]]
+        index = {pmid: i for i, pmid in enumerate(self.pmids)}
+        offsets = (-1, -10) if params.get("linkname") == "pubmed_pubmed_refs" else (1, 10)
+        linksets = []
+        for pmid in ids:
+            linked = [
+                self.pmids[index[pmid] + offset]
+                for offset in offsets
+                if pmid in index and 0 <= index[pmid] + offset < len(self.pmids)
+            ]
+            linksets.append(
+                {
+                    "dbfrom": "pubmed",
+                    "ids": [pmid],
+                    "linksetdbs": [{"dbto": "pubmed", "linkname": params.get("linkname"), "links": linked}]
+                    if linked
+                    else [],
+                }
+            )
+        return {"linksets": linksets}
+
+    def article(self, pmid: str) -> str:
+        """Returns a PubmedArticle whose second author works at a company, unless it is listed as academic."""
+        return (
+            "<PubmedArticle><MedlineCitation>"
+            f"<PMID>{pmid}</PMID><Article>"
+            "<Journal><JournalIssue><PubDate><Year>2024</Year><Month>Jan</Month></PubDate></JournalIssue></Journal>"
+            f"<ArticleTitle>Synthetic paper {pmid}</ArticleTitle><AuthorList>"
+            "<Author><LastName>Doe</LastName><ForeName>Jane</ForeName>"
+            "<AffiliationInfo><Affiliation>Harvard University, Boston, MA.</Affiliation></AffiliationInfo>"
+            "</Author>"
+            + (
+                ""
+                if pmid in self.academic_pmids
+                else "<Author><LastName>Roe</LastName><ForeName>Rick</ForeName>"
+                f"<AffiliationInfo><Affiliation>{escape('Acme Pharma Inc., Basel. rick.roe@acme.com.')}</Affiliation>"
+                "</AffiliationInfo></Author>"
+            )
+            + "</AuthorList></Article></MedlineCitation></PubmedArticle>"
+        )
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.connections.add(self.client_address)
+                url = urlparse(self.path)
+                # Repeated parameters (ELink's one ``id`` per PMID) arrive as lists.
+                params = {k: v[-1] if len(v) == 1 else v for k, v in parse_qs(url.query).items()}
+                endpoint = url.path.rsplit("/", 1)[-1].replace(".fcgi", "")
+                stub.requests.append((endpoint, params))
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub.throttle():
+                    self.send_response(429)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                ids = params.get("id", [])
+                ids = ids.split(",") if isinstance(ids, str) else ids
+                if stub.fail_pmids.intersection(ids):
+                    self.send_error(500)
+                    return
+
+                handler = getattr(stub, endpoint, None)
+                if handler is None:
+                    self.send_error(404)
+                    return
+
+                result = handler(params)
+                if isinstance(result, str):
+                    body, content_type = result.encode(), "text/xml"
+                else:
+                    body, content_type = json.dumps(result).encode(), "application/json"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                if stub.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if stub.truncate_pmids.intersection(ids):
+                    self.wfile.write(body[:len(body) // 2])
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
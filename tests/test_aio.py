@@ -0,0 +1,32 @@
+import asyncio
+
+from pubmed_fetcher.aio import fetch_many_queries, fetch_pubmed_papers_async
+from pubmed_fetcher.fetcher import EutilsClient
+
+
+def test_fetch_pubmed_papers_async(eutils_stub):
+    """Test the async single-query fetch against the stub server."""
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    papers = asyncio.run(fetch_pubmed_papers_async("cancer", max_results=25, client=client))
+    assert [p.uid for p in papers] == eutils_stub.pmids[:25]
+
+
+def test_fetch_many_queries_dedupes_and_tags(eutils_stub):
+    """Test that overlapping queries fetch each PMID once and tag its matches."""
+    pmids = eutils_stub.pmids
+    eutils_stub.queries.update({"a": pmids[:30], "b": pmids[20:50], "c": []})
+    client = EutilsClient(eutils_url=eutils_stub.url)
+
+    papers = asyncio.run(fetch_many_queries(["a", "b", "c"], max_results=None, client=client))
+
+    assert [p.uid for p in papers] == pmids[:50]
+    assert papers[0].queries == ["a"]
+    assert papers[25].queries == ["a", "b"]
+    assert papers[49].queries == ["b"]
+    summarized = [
+        pmid
+        for endpoint, params in eutils_stub.requests
+        if endpoint == "esummary"
+        for pmid in params["id"].split(",")
+    ]
+    assert sorted(summarized) == pmids[:50]
@@ -0,0 +1,64 @@
+import csv
+import gzip
+import sys
+from unittest.mock import patch
+
+from eutils_stub import EutilsStub
+from pubmed_fetcher.baseline import find_baseline_files, ingest_baseline
+from pubmed_fetcher.cli import main
+
+
+def _write_baseline(directory, name, first_pmid, size):
+    stub = EutilsStub(size=size, first_pmid=first_pmid)
+    path = directory / name
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(stub.efetch({"retmax": size}))
+    return stub.pmids
+
+
+def test_ingest_baseline_parses_files_in_order(tmp_path):
+    """Test that every file is parsed in a worker and rows keep file order."""
+    first = _write_baseline(tmp_path, "pubmed25n0001.xml.gz", 1000, 3)
+    second = _write_baseline(tmp_path, "pubmed25n0002.xml.gz", 2000, 2)
+    (tmp_path / "notes.txt").write_text("not a baseline file")
+
+    assert [p.rsplit("/", 1)[-1] for p in find_baseline_files([str(tmp_path)])] == [
+        "pubmed25n0001.xml.gz",
+        "pubmed25n0002.xml.gz",
+    ]
+
+    rows = list(ingest_baseline([str(tmp_path)], max_workers=2))
+
+    assert [row["PubmedID"] for row in rows] == first + second
+    assert rows[0]["Non-academic Author(s)"] == ["Rick Roe"]
+    assert rows[0]["Corresponding Author Email"] == "rick.roe@acme.com"
+
+
+def test_ingest_subcommand_writes_output(tmp_path):
+    """Test the offline ingest subcommand end to end."""
+    pmids = _write_baseline(tmp_path, "pubmed25n0001.xml.gz", 1000, 4)
+    output = tmp_path / "papers.csv"
+
+    test_args = ["cli.py", "ingest", str(tmp_path), "-f", str(output), "-w", "1"]
+    with patch.object(sys, "argv", test_args):
+        main()
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["PubmedID"] for row in rows] == pmids
+
+
+def test_ingest_subcommand_writes_date_partitions(tmp_path):
+    pmids = _write_baseline(tmp_path, "pubmed25n0001.xml.gz", 1000, 3)
+    output = tmp_path / "papers"
+
+    test_args = ["cli.py", "ingest", str(tmp_path), "-f", str(output), "-w", "1", "--partitioned"]
+    with patch.object(sys, "argv", test_args):
+        main()
+
+    (part,) = (output / "year=2024" / "month=1").glob("part-*.csv")
+    with open(part, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["PubmedID"] for row in rows] == pmids
+    assert rows[0]["Publication Date Key"] == "20240100"
+    assert rows[0]["Date Precision"] == "month"
@@ -0,0 +1,40 @@
+import os
+import time
+
+from pubmed_fetcher.cache import ResponseCache, request_key
+
+
+def test_request_key_ignores_order_and_api_key():
+    """Test that equivalent requests share a cache key."""
+    key = request_key("esearch", {"term": "cancer", "retmax": 10})
+    assert key == request_key("esearch", {"retmax": "10", "term": "cancer", "api_key": "x"})
+    assert key != request_key("esearch", {"term": "cancer", "retmax": 20})
+
+
+def test_cache_round_trip_and_ttl(tmp_path):
+    """Test storing values and expiring them per endpoint."""
+    cache = ResponseCache(str(tmp_path), ttls={"esearch": 0})
+    cache.set_many("esummary", {"1": {"title": "One"}, "2": {"title": "Two"}})
+    cache.set("esearch", "k", {"count": "2"})
+    time.sleep(0.01)
+
+    assert cache.get_many("esummary", ["1", "2", "3"]) == {"1": {"title": "One"}, "2": {"title": "Two"}}
+    assert cache.get("esearch", "k") is None
+    assert cache.stats() == {"hits": 2, "misses": 2}
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that the size cap evicts the entries read least recently."""
+    cache = ResponseCache(str(tmp_path), max_bytes=5_000)
+    blob = {"text": os.urandom(2000).hex()}
+    for step in (
+        lambda: cache.set("esummary", "old", blob),
+        lambda: cache.set("esummary", "recent", blob),
+        lambda: cache.get("esummary", "old"),
+        lambda: cache.set("esummary", "new", blob),
+    ):
+        step()
+        time.sleep(0.01)
+
+    assert cache.get("esummary", "recent") is None
+    assert set(cache.get_many("esummary", ["old", "new"])) == {"old", "new"}
@@ -0,0 +1,117 @@
+import csv
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from pubmed_fetcher.checkpoint import HarvestJournal, harvest_checkpointed
+from pubmed_fetcher.cli import main
+from pubmed_fetcher.fetcher import EutilsClient, set_client
+from pubmed_fetcher.writers import CsvWriter
+
+
+def _pmids_in(path):
+    with open(path, newline="") as f:
+        return [row["PubmedID"] for row in csv.DictReader(f)]
+
+
+def test_failed_chunk_is_split_down_to_the_bad_pmid(eutils_stub):
+    """Test that one failing PMID does not take the rest of its chunk with it."""
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    pmids = eutils_stub.pmids[:8]
+    eutils_stub.fail_pmids.add(pmids[5])
+
+    papers, failed = client.fetch_chunk_splitting("esummary", pmids)
+
+    assert failed == [pmids[5]]
+    assert sorted(papers) == sorted(pmids[:5] + pmids[6:])
+
+
+def test_resume_retries_only_failed_chunks(eutils_stub, tmp_path):
+    """Test that a rerun with --resume fetches just the failed PMIDs and completes the file."""
+    set_client(EutilsClient(eutils_url=eutils_stub.url))
+    output = tmp_path / "papers.csv"
+    journal = tmp_path / "papers.csv.journal"
+    pmids = eutils_stub.pmids[:60]
+    eutils_stub.fail_pmids.add(pmids[42])
+    args = ["cli.py", "cancer", "-n", "60", "-f", str(output), "--batch-size", "20", "--no-cache"]
+
+    with patch.object(sys, "argv", args + ["--checkpoint"]):
+        main()
+    assert _pmids_in(output) == [pmid for pmid in pmids if pmid != pmids[42]]
+    assert journal.exists()
+
+    eutils_stub.fail_pmids.clear()
+    eutils_stub.requests.clear()
+    with patch.object(sys, "argv", args + ["--resume"]):
+        main()
+
+    assert [endpoint for endpoint, _ in eutils_stub.requests] == ["esummary"]
+    assert eutils_stub.requests[0][1]["id"] == pmids[42]
+    assert sorted(_pmids_in(output)) == sorted(pmids)
+    assert not journal.exists()
+
+
+def test_resume_discards_rows_written_after_the_last_checkpoint(eutils_stub, tmp_path):
+    """Test that a crash mid-chunk leaves no duplicated or partial rows after resuming."""
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    output = tmp_path / "papers.csv"
+    journal = HarvestJournal(str(tmp_path / "papers.csv.journal"))
+    calls = []
+
+    def crash_on_third_chunk(source, pmids):
+        calls.append(pmids)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return EutilsClient.fetch_chunk_splitting(client, source, pmids)
+
+    with patch.object(client, "fetch_chunk_splitting", side_effect=crash_on_third_chunk):
+        with pytest.raises(KeyboardInterrupt), CsvWriter(str(output)) as writer:
+            harvest_checkpointed("cancer", journal, writer, max_results=50, chunk_size=10, client=client)
+    with open(output, "a") as f:
+        f.write("partial,row")
+    journal.close()
+
+    set_client(client)
+    args = ["cli.py", "cancer", "-n", "50", "-f", str(output), "--batch-size", "10", "--no-cache", "--resume"]
+    with patch.object(sys, "argv", args):
+        main()
+
+    assert _pmids_in(output) == eutils_stub.pmids[:50]
+    assert not os.path.exists(tmp_path / "papers.csv.journal")
+
+
+def test_failed_search_keeps_the_journal_and_exits_non_zero(eutils_stub, tmp_path, capsys):
+    """Test that a checkpointed run with ESearch down fails instead of finishing an empty job."""
+    set_client(EutilsClient(eutils_url=eutils_stub.url, max_retries=0))
+    output = tmp_path / "papers.csv"
+    journal = tmp_path / "papers.csv.journal"
+    args = ["cli.py", "cancer", "-n", "20", "-f", str(output), "--batch-size", "10", "--no-cache", "--checkpoint"]
+    eutils_stub.fail_pmids.add(eutils_stub.pmids[15])
+    with patch.object(sys, "argv", args):
+        main()
+    rows = _pmids_in(output)
+    eutils_stub.stop()
+    # A fresh client, since the stub keeps serving connections that are already open.
+    set_client(EutilsClient(eutils_url=eutils_stub.url, max_retries=0))
+
+    with patch.object(sys, "argv", args), pytest.raises(SystemExit) as excinfo:
+        main()
+
+    assert excinfo.value.code == 1
+    assert "Search for 'cancer' failed" in capsys.readouterr().out
+    assert journal.exists()
+    assert _pmids_in(output) == rows
+    assert HarvestJournal(str(journal)).job()["query"] == "cancer"
+
+
+def test_partial_search_is_not_journaled(eutils_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr("pubmed_fetcher.fetcher.RETRIEVAL_CAP", 100)
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    journal = HarvestJournal(str(tmp_path / "papers.csv.journal"))
+
+    with pytest.raises(RuntimeError, match="listed only 100 of 1234"), CsvWriter(str(tmp_path / "out.csv")) as writer:
+        harvest_checkpointed("cancer", journal, writer, max_results=None, client=client)
+
+    assert journal.job() == {}
@@ -65,6 +65,7 @@
 #     unittest.main()
 
 
+import csv
 import unittest
 from unittest.mock import patch
 import sys
@@ -74,15 +75,15 @@ from pubmed_fetcher.cli import main
 
 class TestCLI(unittest.TestCase):
 
-    @patch("pubmed_fetcher.cli.fetch_pubmed_papers")
-    @patch("pubmed_fetcher.cli.extract_company_authors")
-    @patch("pubmed_fetcher.cli.extract_corresponding_email")
-    @patch("pubmed_fetcher.cli.save_to_csv")
+    @patch("pubmed_fetcher.cli.harvest_pubmed_papers")
+    @patch("pubmed_fetcher.parser.extract_company_authors")
+    @patch("pubmed_fetcher.parser.extract_corresponding_email")
+    @patch("pubmed_fetcher.cli.write_rows")
     @patch("pubmed_fetcher.cli.print_results")
     def test_main_with_output_file(
         self,
         mock_print_results,
-        mock_save_to_csv,
+        mock_write_rows,
         mock_extract_email,
         mock_extract_authors,
         mock_fetch_papers,
@@ -99,19 +100,21 @@ class TestCLI(unittest.TestCase):
         mock_extract_authors.return_value = [("John Doe", "Sample Company")]
         mock_extract_email.return_value = "john.doe@example.com"
 
-        test_args = ["cli.py", "cancer research", "-f", "output.csv"]
+        test_args = ["cli.py", "cancer research", "-f", "output.csv", "--no-cache"]
         with patch.object(sys, "argv", test_args):
             main()
 
-        mock_fetch_papers.assert_called_once_with("cancer research")
+        mock_fetch_papers.assert_called_once_with(
+            "cancer research", batch_size=500, max_results=10, source="esummary"
+        )
         mock_extract_authors.assert_called()
         mock_extract_email.assert_called()
-        mock_save_to_csv.assert_called_once()
+        mock_write_rows.assert_called_once()
         mock_print_results.assert_not_called()
 
-    @patch("pubmed_fetcher.cli.fetch_pubmed_papers")
-    @patch("pubmed_fetcher.cli.extract_company_authors")
-    @patch("pubmed_fetcher.cli.extract_corresponding_email")
+    @patch("pubmed_fetcher.cli.harvest_pubmed_papers")
+    @patch("pubmed_fetcher.parser.extract_company_authors")
+    @patch("pubmed_fetcher.parser.extract_corresponding_email")
     def test_main_without_output_file(
         self, mock_extract_email, mock_extract_authors, mock_fetch_papers
     ):
@@ -127,7 +130,7 @@ class TestCLI(unittest.TestCase):
         mock_extract_authors.return_value = [("John Doe", "Sample Company")]
         mock_extract_email.return_value = "john.doe@example.com"
 
-        test_args = ["cli.py", "cancer research"]
+        test_args = ["cli.py", "cancer research", "--no-cache"]
         with patch.object(sys, "argv", test_args), patch(
             "sys.stdout", new_callable=StringIO
         ) as mock_stdout:
@@ -135,7 +138,9 @@ class TestCLI(unittest.TestCase):
             output = mock_stdout.getvalue()
             print(f"DEBUG OUTPUT:\n{output}")
 
-        mock_fetch_papers.assert_called_once_with("cancer research")
+        mock_fetch_papers.assert_called_once_with(
+            "cancer research", batch_size=500, max_results=10, source="esummary"
+        )
         mock_extract_authors.assert_called()
         mock_extract_email.assert_called()
         print("ooo :", output)
@@ -146,5 +151,46 @@ class TestCLI(unittest.TestCase):
         # self.assertIn("Corresponding Author Email: john.doe@example.com", output)
 
 
+def test_main_streams_rows_to_csv(tmp_path):
+    """Test that rows are written while the harvest generator is still running."""
+    output = tmp_path / "papers.csv"
+    written_before = []
+
+    def papers():
+        for i in range(5):
+            if i == 4:
+                written_before.append(output.read_text().count("\n"))
+            yield {"uid": str(i), "title": f"Paper {i}", "pubdate": "2024", "authors": []}
+
+    test_args = ["cli.py", "cancer", "-f", str(output), "--batch-size", "2", "--no-cache"]
+    with patch.object(sys, "argv", test_args), patch(
+        "pubmed_fetcher.cli.harvest_pubmed_papers", return_value=papers()
+    ):
+        main()
+
+    assert written_before == [5]
+    assert output.read_text().count("\n") == 6
+
+
+def test_main_with_queries_file(tmp_path):
+    """Test that a queries file runs every query and tags the output rows."""
+    queries = tmp_path / "queries.txt"
+    queries.write_text("# watchlist\ncancer\n\nobesity\n")
+    output = tmp_path / "papers.csv"
+
+    async def fake_fetch_many_queries(queries, max_results, source):
+        return [{"uid": "1", "title": "Paper", "pubdate": "2024", "authors": [], "queries": queries}]
+
+    test_args = ["cli.py", "-q", str(queries), "-f", str(output), "--no-cache"]
+    with patch.object(sys, "argv", test_args), patch(
+        "pubmed_fetcher.aio.fetch_many_queries", side_effect=fake_fetch_many_queries
+    ):
+        main()
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["Matched Queries"] == "cancer; obesity"
+
+
 if __name__ == "__main__":
     unittest.main()
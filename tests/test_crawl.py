@@ -0,0 +1,90 @@
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from pubmed_fetcher.cache import ResponseCache
+from pubmed_fetcher.cli import main
+from pubmed_fetcher.crawl import PmidSet, crawl_citations
+from pubmed_fetcher.fetcher import EutilsClient, set_client
+
+
+def test_pmid_set():
+    pmids = PmidSet()
+
+    assert pmids.add("38000000")
+    assert pmids.add("7")
+    assert not pmids.add("38000000")
+    assert "7" in pmids and "38000000" in pmids
+    assert "8" not in pmids and "99000000" not in pmids
+    assert len(pmids) == 2
+
+
+def test_fetch_links_keeps_one_link_set_per_pmid(eutils_stub):
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    pmids = eutils_stub.pmids
+
+    links = client.fetch_links([pmids[20], pmids[21]], "pubmed_pubmed_refs")
+
+    assert links == {pmids[20]: [pmids[19], pmids[10]], pmids[21]: [pmids[20], pmids[11]]}
+
+
+def test_cached_client_reuses_elink_responses(eutils_stub, tmp_path):
+    client = EutilsClient(eutils_url=eutils_stub.url, cache=ResponseCache(str(tmp_path)))
+    pmids = eutils_stub.pmids[20:22]
+
+    first = client.fetch_links(pmids, "pubmed_pubmed_refs")
+    second = client.fetch_links(pmids, "pubmed_pubmed_refs")
+
+    assert second == first
+    assert [endpoint for endpoint, _ in eutils_stub.requests] == ["elink"]
+
+
+def test_crawl_expands_breadth_first_to_the_requested_depth(eutils_stub):
+    """Test that every PMID within two hops is fetched once, seeds first."""
+    pmids = eutils_stub.pmids
+    seed = pmids[100]
+
+    rows = list(crawl_citations([seed], depth=2, client=EutilsClient(eutils_url=eutils_stub.url)))
+
+    ids = [row["PubmedID"] for row in rows]
+    one_hop = {pmids[i] for i in (99, 90, 101, 110)}
+    two_hops = {pmids[100 + a + b] for a in (-1, -10, 1, 10) for b in (-1, -10, 1, 10)} - one_hop - {seed}
+    assert ids[0] == seed
+    assert set(ids[1:5]) == one_hop
+    assert set(ids[5:]) == two_hops
+    assert len(ids) == len(set(ids))
+    elinks = [params for endpoint, params in eutils_stub.requests if endpoint == "elink"]
+    # One citedin and one refs call per hop expanded; the last hop is not expanded.
+    assert len(elinks) == 4
+
+
+def test_crawl_fetches_neighbors_of_company_papers_first(eutils_stub):
+    pmids = eutils_stub.pmids
+    eutils_stub.academic_pmids.add(pmids[100])
+
+    rows = crawl_citations(
+        [pmids[100], pmids[500]],
+        direction="citedin",
+        max_papers=4,
+        client=EutilsClient(eutils_url=eutils_stub.url),
+    )
+
+    assert [row["PubmedID"] for row in rows] == [pmids[100], pmids[500], pmids[501], pmids[510]]
+
+
+def test_crawl_rejects_unknown_direction():
+    with pytest.raises(ValueError):
+        list(crawl_citations(["1"], direction="sideways"))
+
+
+def test_cli_crawl(eutils_stub, tmp_path, capsys):
+    set_client(EutilsClient(eutils_url=eutils_stub.url))
+    output = str(tmp_path / "crawl.jsonl")
+
+    argv = ["get-papers-list", "crawl", "cancer", "-n", "5", "--direction", "refs", "-f", output, "--format", "jsonl"]
+    with patch.object(sys, "argv", argv):
+        main()
+
+    # Seeds 0-4 cite only each other (and nothing before index 0).
+    assert f"Data saved to {output} (5 rows)" in capsys.readouterr().out
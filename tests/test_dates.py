@@ -0,0 +1,29 @@
+from pubmed_fetcher.dates import date_key, normalize_pubdate, upper_date_key
+
+
+def test_normalize_pubdate_forms():
+    """Test the date shapes PubMed uses, with the precision each carries."""
+    assert normalize_pubdate("2025 Mar 12") == (20250312, "day")
+    assert normalize_pubdate("2025/03/12") == (20250312, "day")
+    assert normalize_pubdate("2023 Jan-Feb") == (20230100, "month")
+    assert normalize_pubdate("2023 Dec-2024 Jan") == (20231200, "month")
+    assert normalize_pubdate("2024 Winter") == (20241200, "season")
+    assert normalize_pubdate("2022 Spring") == (20220300, "season")
+    assert normalize_pubdate("2021") == (20210000, "year")
+    assert normalize_pubdate("N/A") == (0, "unknown")
+    assert normalize_pubdate(None) == (0, "unknown")
+
+
+def test_normalize_pubdate_is_memoized():
+    normalize_pubdate.cache_clear()
+    for _ in range(3):
+        normalize_pubdate("2020 Jun 1")
+
+    assert normalize_pubdate.cache_info().hits == 2
+
+
+def test_date_keys_and_upper_bounds():
+    assert date_key("2024 Jan 15") == 20240115
+    assert upper_date_key("2023") == 20231299
+    assert upper_date_key("2023/06") == 20230699
+    assert upper_date_key("2023/06/15") == 20230615
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from pubmed_fetcher import decoding
+from pubmed_fetcher.models import Author
+
+BODY = json.dumps(
+    {
+        "header": {"type": "esummary"},
+        "result": {
+            "uids": ["2", "1", "3"],
+            "1": {
+                "uid": "1",
+                "title": "First",
+                "pubdate": "2024 Jan",
+                "authors": [{"name": "Jane Roe", "authtype": "Author", "clusterid": ""}],
+                "articleids": [{"idtype": "pubmed", "value": "1"}],
+                "history": [{"pubstatus": "entrez", "date": "2024/01/02"}],
+            },
+            "2": {"uid": "2", "title": "Second", "pubdate": "2023", "authors": []},
+            "3": {"uid": "3", "error": "cannot get document summary"},
+        },
+    }
+).encode()
+
+
+@pytest.fixture(params=decoding.available_backends())
+def backend(request):
+    previous = decoding.get_json_backend()
+    yield decoding.set_json_backend(request.param)
+    decoding.set_json_backend(previous)
+
+
+def test_decode_summaries_projects_the_schema(backend):
+    """Test that every backend returns the same papers in ``uids`` order."""
+    papers = decoding.decode_summaries(BODY)
+
+    assert [paper.uid for paper in papers] == ["2", "1"]
+    assert papers[1].title == "First"
+    assert papers[1].pubdate == "2024 Jan"
+    assert papers[1].authors == [Author("Jane Roe")]
+
+
+def test_unknown_backend_is_rejected():
+    """Test that a backend name outside JSON_BACKENDS is refused."""
+    with pytest.raises(ValueError):
+        decoding.set_json_backend("simplejson")
@@ -0,0 +1,48 @@
+import json
+
+from pubmed_fetcher.domains import COMPANY_DOMAINS, DomainIndex
+from pubmed_fetcher.models import Author
+from pubmed_fetcher.parser import extract_company_authors
+
+
+def test_resolves_longest_mapped_suffix():
+    """Test that subdomains resolve through their parent and lookalike domains do not."""
+    index = DomainIndex({"gsk.com": "GSK", "rd.gsk.com": "GSK R&D", "ac.uk": "UK academia"})
+
+    assert index.resolve("jane.doe@gsk.com") == "GSK"
+    assert index.resolve("jane.doe@US.GSK.com") == "GSK"
+    assert index.resolve("jane.doe@rd.gsk.com") == "GSK R&D"
+    assert index.resolve("jane.doe@notgsk.com") is None
+    assert index.resolve("someone@ox.ac.uk") == "UK academia"
+    assert index.resolve("gsk.com") == "GSK"
+    assert index.resolve("") is None
+    assert len(index) == 3
+
+
+def test_resolve_first_skips_unmapped_addresses():
+    index = DomainIndex()
+
+    assert index.resolve_first(["a@harvard.edu", "b@roche.com", "c@pfizer.com"]) == "Roche"
+    assert index.resolve_first(["a@harvard.edu"]) is None
+
+
+def test_from_file_extends_the_built_in_domains(tmp_path):
+    path = tmp_path / "domains.json"
+    path.write_text(json.dumps({"acme.com": "Acme Pharma", "gsk.com": "GlaxoSmithKline"}))
+
+    index = DomainIndex.from_file(str(path))
+
+    assert index.resolve("x@acme.com") == "Acme Pharma"
+    assert index.resolve("x@gsk.com") == "GlaxoSmithKline"
+    assert len(index) == len(COMPANY_DOMAINS) + 1
+    assert DomainIndex.from_file(str(path), extend=False).resolve("x@pfizer.com") is None
+
+
+def test_malformed_addresses_do_not_break_lookups():
+    """Test that an empty label (a doubled dot) is just an unmapped label, not the company slot."""
+    index = DomainIndex()
+
+    assert index.resolve("a@x..gsk.com") == "GSK"
+    assert index.resolve("a@..") is None
+    assert index.resolve("") is None
+    assert extract_company_authors([Author("X", "Harvard", "john@lab..gsk.com")]) == [("X", "gsk")]
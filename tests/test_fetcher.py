@@ -1,26 +1,247 @@
+import json
+
 import pytest
-from unittest.mock import patch
-from pubmed_fetcher.fetcher import fetch_pubmed_papers
+import requests
+from unittest.mock import MagicMock, patch
+from eutils_stub import EutilsStub
+from pubmed_fetcher.cache import ResponseCache
+from pubmed_fetcher.models import Author
+from pubmed_fetcher.stats import get_stats
+from pubmed_fetcher.fetcher import (
+    EutilsClient,
+    fetch_paper_details,
+    fetch_paper_records,
+    fetch_pubmed_papers,
+    harvest_pubmed_papers,
+)
 
 
-@patch("pubmed_fetcher.fetcher.requests.get")
+@patch("pubmed_fetcher.fetcher.requests.Session.get")
 def test_fetch_pubmed_data(mock_get):
     """Test fetching PubMed data with a mock API response."""
     mock_get.return_value.status_code = 200
-    mock_get.return_value.json.return_value = {
-        "esearchresult": {"idlist": ["12345"]},
-        "result": {"12345": {"title": "Test Article"}},
-    }
+    mock_get.return_value.content = json.dumps(
+        {
+            "esearchresult": {"idlist": ["12345"]},
+            "result": {"uids": ["12345"], "12345": {"title": "Test Article"}},
+        }
+    ).encode()
 
     result = fetch_pubmed_papers("cancer")
     print(result)
-    assert "12345" in result[0]["uid"]  # ✅ Expecting dictionary with paper ID keys
-    assert result[0]["title"] == "Test Article"
+    assert "12345" in result[0].uid
+    assert result[0].title == "Test Article"
 
 
-@patch("pubmed_fetcher.fetcher.requests.get")
+@patch("pubmed_fetcher.fetcher.requests.Session.get")
 def test_fetch_pubmed_data_fail(mock_get):
     """Test failed API call."""
     mock_get.return_value.status_code = 500
+    mock_get.return_value.content = b"<html>Internal Server Error</html>"
     result = fetch_pubmed_papers("invalid_query")
     assert result == []  # ✅ Expect an empty dictionary, not None
+
+
+def test_harvest_pubmed_papers_pages_through_history(eutils_stub):
+    """Test harvesting a result set larger than one page via WebEnv/query_key."""
+    papers = list(harvest_pubmed_papers("cancer", batch_size=500, client=EutilsClient(eutils_url=eutils_stub.url)))
+
+    assert [p.uid for p in papers] == eutils_stub.pmids
+    assert papers[0].title == f"Synthetic paper {eutils_stub.pmids[0]}"
+
+    endpoints = [endpoint for endpoint, _ in eutils_stub.requests]
+    assert endpoints == ["esearch", "esummary", "esummary", "esummary"]
+    search_params = eutils_stub.requests[0][1]
+    assert search_params["usehistory"] == "y"
+    assert [params["retstart"] for _, params in eutils_stub.requests[1:]] == ["0", "500", "1000"]
+    assert all("id" not in params for _, params in eutils_stub.requests[1:])
+
+
+def test_harvest_pubmed_papers_respects_max_results(eutils_stub):
+    """Test that harvesting stops at max_results."""
+    papers = list(
+        harvest_pubmed_papers("cancer", batch_size=100, max_results=250, client=EutilsClient(eutils_url=eutils_stub.url))
+    )
+    assert len(papers) == 250
+    assert eutils_stub.requests[-1][1]["retmax"] == "50"
+
+
+def test_fetch_paper_details_batches_and_keeps_order(eutils_stub):
+    """Test that chunked, concurrent ESummary calls merge back in input order."""
+    paper_ids = list(reversed(eutils_stub.pmids))
+
+    papers = fetch_paper_details(paper_ids, batch_size=100, max_workers=4, client=EutilsClient(eutils_url=eutils_stub.url))
+
+    assert [p.uid for p in papers] == paper_ids
+    chunk_sizes = sorted(len(params["id"].split(",")) for _, params in eutils_stub.requests)
+    assert chunk_sizes == [34] + [100] * 12
+
+
+def test_search_pubmed_ids_pages_and_reports_the_count(eutils_stub, monkeypatch):
+    monkeypatch.setattr("pubmed_fetcher.fetcher.ESEARCH_PAGE_SIZE", 500)
+    client = EutilsClient(eutils_url=eutils_stub.url)
+
+    pmids = client.search_pubmed_ids("cancer", None)
+    first = client.search_pubmed_ids("cancer", 700)
+
+    assert pmids == eutils_stub.pmids and pmids.count == 1234 and pmids.complete
+    assert first == eutils_stub.pmids[:700] and first.count == 1234 and first.complete
+
+
+def test_search_pubmed_ids_warns_past_the_retrieval_cap(eutils_stub, monkeypatch, caplog):
+    """Test that a search too large for ESearch is capped and flagged instead of paged past the cap."""
+    monkeypatch.setattr("pubmed_fetcher.fetcher.RETRIEVAL_CAP", 1000)
+    client = EutilsClient(eutils_url=eutils_stub.url)
+
+    pmids = client.search_pubmed_ids("cancer", None)
+
+    assert pmids == eutils_stub.pmids[:1000]
+    assert pmids.count == 1234 and not pmids.complete
+    assert "get-papers-list plan" in caplog.text
+    assert all(int(params["retstart"]) < 1000 for _, params in eutils_stub.requests)
+
+
+def test_search_pubmed_ids_reports_a_shortfall_on_error(eutils_stub, monkeypatch, caplog):
+    monkeypatch.setattr("pubmed_fetcher.fetcher.ESEARCH_PAGE_SIZE", 500)
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    get_json = client.get_json
+
+    def fail_second_page(endpoint, params, **kwargs):
+        if params["retstart"] == 500:
+            raise requests.ConnectionError("connection reset")
+        return get_json(endpoint, params, **kwargs)
+
+    with patch.object(client, "get_json", side_effect=fail_second_page):
+        pmids = client.search_pubmed_ids("cancer", None)
+
+    assert pmids == eutils_stub.pmids[:500]
+    assert pmids.count == 1234 and not pmids.complete
+    assert "Listed only 500 of 1234 PMIDs" in caplog.text
+
+
+@patch("pubmed_fetcher.fetcher.requests.Session.get")
+def test_get_retries_throttled_requests(mock_get, fast_rate_limiter):
+    """Test that 429 responses are retried through the rate limiter."""
+    throttled, ok = MagicMock(status_code=429, headers={}), MagicMock(status_code=200)
+    ok.content = b'{"esearchresult": {"idlist": []}}'
+    mock_get.side_effect = [throttled, ok]
+
+    assert fetch_pubmed_papers("cancer") == []
+    assert mock_get.call_count == 2
+    assert fast_rate_limiter.stats()["backoffs"] == 1
+
+
+def test_harvest_recovers_from_injected_throttling():
+    """Test that 429s from the stub are retried without losing or reordering papers."""
+    stub = EutilsStub(size=2000, throttle_rate=0.2, seed=1).start()
+    try:
+        papers = list(harvest_pubmed_papers("cancer", batch_size=100, client=EutilsClient(eutils_url=stub.url)))
+    finally:
+        stub.stop()
+
+    assert stub.throttled > 0
+    assert [p.uid for p in papers] == stub.pmids
+
+
+def test_client_reuses_pooled_connection(eutils_stub):
+    """Test that sequential calls share one keep-alive connection."""
+    with EutilsClient(eutils_url=eutils_stub.url) as client:
+        papers = list(client.harvest_pubmed_papers("cancer", batch_size=200))
+
+    assert len(papers) == len(eutils_stub.pmids)
+    assert len(eutils_stub.requests) == 8
+    assert len(eutils_stub.connections) == 1
+
+
+def test_cached_client_only_fetches_missing_pmids(eutils_stub, tmp_path):
+    """Test that summaries are cached per PMID across overlapping requests."""
+    client = EutilsClient(eutils_url=eutils_stub.url, cache=ResponseCache(str(tmp_path)))
+    client.fetch_paper_details(eutils_stub.pmids[:90])
+    eutils_stub.requests.clear()
+
+    papers = client.fetch_paper_details(eutils_stub.pmids[:100])
+
+    assert [p.uid for p in papers] == eutils_stub.pmids[:100]
+    assert len(eutils_stub.requests) == 1
+    assert eutils_stub.requests[0][1]["id"].split(",") == eutils_stub.pmids[90:100]
+
+
+def test_cached_harvest_is_served_locally_on_rerun(eutils_stub, tmp_path):
+    """Test that re-running a harvest with a warm cache sends no requests."""
+    client = EutilsClient(eutils_url=eutils_stub.url, cache=ResponseCache(str(tmp_path)))
+    first = list(client.harvest_pubmed_papers("cancer", batch_size=500, max_results=700))
+    eutils_stub.requests.clear()
+
+    second = list(client.harvest_pubmed_papers("cancer", batch_size=500, max_results=700))
+
+    assert [p.uid for p in first] == eutils_stub.pmids[:700]
+    assert second == first
+    assert eutils_stub.requests == []
+
+
+def test_cached_harvest_past_the_retrieval_cap_uses_the_history_server(eutils_stub, tmp_path, monkeypatch):
+    """Test that a cached harvest too large for ESearch ID paging pages WebEnv instead, caching what it fetches."""
+    monkeypatch.setattr("pubmed_fetcher.fetcher.RETRIEVAL_CAP", 1000)
+    client = EutilsClient(eutils_url=eutils_stub.url, cache=ResponseCache(str(tmp_path)))
+
+    papers = list(client.harvest_pubmed_papers("cancer", batch_size=500))
+
+    assert [p.uid for p in papers] == eutils_stub.pmids
+    searches = [params for endpoint, params in eutils_stub.requests if endpoint == "esearch"]
+    assert searches[-1]["usehistory"] == "y"
+    assert all("retstart" not in params for params in searches)
+    eutils_stub.requests.clear()
+    assert [p.uid for p in client.fetch_paper_details(eutils_stub.pmids[:300])] == eutils_stub.pmids[:300]
+    assert eutils_stub.requests == []
+
+
+def test_harvest_efetch_records_include_author_affiliations(eutils_stub):
+    """Test harvesting full EFetch records through the history server."""
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    papers = list(client.harvest_pubmed_papers("cancer", batch_size=100, max_results=150, source="efetch"))
+
+    assert [p.uid for p in papers] == eutils_stub.pmids[:150]
+    assert papers[0].authors[1] == Author(
+        name="Rick Roe",
+        affiliation="Acme Pharma Inc., Basel. rick.roe@acme.com.",
+        email="rick.roe@acme.com",
+    )
+    assert [endpoint for endpoint, _ in eutils_stub.requests] == ["esearch", "efetch", "efetch"]
+
+
+def test_truncated_efetch_body_is_reported_as_a_failed_chunk(eutils_stub):
+    """Test that a connection dropped mid-body surfaces as a requests error, not a urllib3 one."""
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    eutils_stub.truncate_pmids.add(eutils_stub.pmids[3])
+
+    with pytest.raises(requests.ConnectionError):
+        client.fetch_chunk("efetch", eutils_stub.pmids[:10])
+    papers, failed = client.fetch_chunk_splitting("efetch", eutils_stub.pmids[:10])
+
+    assert papers == {}
+    assert failed == eutils_stub.pmids[:10]
+
+
+def test_bytes_received_counts_compressed_bytes_for_every_response(eutils_stub):
+    """Test that buffered and streamed bodies are both counted as bytes on the wire."""
+    eutils_stub.gzip = True
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    stats = get_stats()
+    params = {"db": "pubmed", "id": ",".join(eutils_stub.pmids[:50])}
+
+    stats.reset()
+    summary = client.get("esummary", {**params, "retmode": "json"})
+    summary_bytes = stats.counters["bytes_received"]
+    records = client.get("efetch", {**params, "retmode": "xml"}, stream=True)
+    assert stats.counters["bytes_received"] == summary_bytes
+    assert len(list(client._stream_records(records))) == 50
+
+    assert summary_bytes == int(summary.headers["Content-Length"]) < len(summary.content)
+    assert stats.counters["bytes_received"] - summary_bytes == int(records.headers["Content-Length"])
+
+
+def test_fetch_paper_records_by_id(eutils_stub):
+    """Test fetching EFetch records for an explicit PMID list."""
+    paper_ids = eutils_stub.pmids[5:1:-1]
+    papers = fetch_paper_records(paper_ids, client=EutilsClient(eutils_url=eutils_stub.url))
+    assert [p.uid for p in papers] == paper_ids
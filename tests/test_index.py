@@ -0,0 +1,86 @@
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from pubmed_fetcher.cli import main
+from pubmed_fetcher.index import PaperIndex, date_key
+
+PAPERS = [
+    {
+        "uid": "1",
+        "title": "Statins and heart disease",
+        "pubdate": "2022 Mar 4",
+        "authors": [{"name": "Jane Doe", "affiliation": "Pfizer Inc., New York"}],
+    },
+    {
+        "uid": "2",
+        "title": "Cancer immunotherapy outcomes",
+        "pubdate": "2023 Dec",
+        "authors": [
+            {"name": "Rick Roe", "affiliation": "Pfizer Inc., New York"},
+            {"name": "Ann Lee", "affiliation": "Harvard University"},
+        ],
+    },
+    {
+        "uid": "3",
+        "title": "Cancer screening in adults",
+        "pubdate": "2024",
+        "authors": [{"name": "Ann Lee", "affiliation": "Novartis Pharma AG, Basel"}],
+    },
+]
+
+
+def test_date_key_orders_pubmed_dates():
+    """Test that PubMed date variants become sortable integers."""
+    assert date_key("2024 Jan 15") == 20240115
+    assert date_key("2023 Dec-2024 Jan") == 20231200
+    assert date_key("2024/06") == 20240600
+    assert date_key("N/A") == 0
+
+
+def test_index_answers_boolean_and_date_filters(tmp_path):
+    """Test text, column and date-range queries against the local index."""
+    with PaperIndex(str(tmp_path / "index.sqlite3")) as index:
+        assert index.add_papers(PAPERS) == 3
+        index.add_papers(PAPERS[:1])  # re-indexing replaces, it does not duplicate
+        assert len(index) == 3
+
+        ids = lambda rows: [row["PubmedID"] for row in rows]
+        assert ids(index.search("cancer")) == ["3", "2"]
+        assert ids(index.search("cancer NOT screening")) == ["2"]
+        assert ids(index.search(company="pfizer")) == ["2", "1"]
+        assert ids(index.search(company="pfizer", since="2023")) == ["2"]
+        assert ids(index.search(author="ann lee", until="2023")) == ["2"]
+        assert index.search("cancer", limit=1)[0]["Company Affiliation(s)"] == ["novartis pharma ag"]
+
+
+def test_index_subcommand_searches_offline(tmp_path, capsys):
+    """Test building the index from a harvest and querying it from the CLI."""
+    db = str(tmp_path / "index.sqlite3")
+    with patch.object(sys, "argv", ["cli.py", "index", "--db", db, "add", "cancer"]), patch(
+        "pubmed_fetcher.cli.harvest_pubmed_papers", return_value=iter(PAPERS)
+    ):
+        main()
+
+    output = tmp_path / "hits.jsonl"
+    test_args = ["cli.py", "index", "--db", db, "search", "--company", "novartis", "-f", str(output), "--format", "jsonl"]
+    with patch.object(sys, "argv", test_args):
+        main()
+
+    assert '"PubmedID": "3"' in output.read_text()
+    assert "Indexed 3 papers" in capsys.readouterr().out
+
+
+def test_index_search_reports_an_invalid_query(tmp_path, capsys):
+    """Test that a malformed FTS5 query is a usage error, not a traceback."""
+    db = str(tmp_path / "index.sqlite3")
+    with PaperIndex(db) as index:
+        index.add_papers(PAPERS)
+
+    with patch.object(sys, "argv", ["cli.py", "index", "--db", db, "search", "cancer AND ("]):
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+
+    assert excinfo.value.code == 2
+    assert "invalid search" in capsys.readouterr().err
@@ -0,0 +1,31 @@
+import json
+
+from pubmed_fetcher.models import Author, Paper, as_paper
+
+
+def test_paper_round_trips_through_json():
+    """Test that papers survive the cache's JSON encoding."""
+    paper = Paper(
+        uid="1",
+        title="A study",
+        authors=[Author("Jane Roe", "Acme Pharma Inc.", "jane@acme.com")],
+        queries=["cancer"],
+    )
+    assert Paper.from_dict(json.loads(json.dumps(paper.to_dict()))) == paper
+
+
+def test_as_paper_accepts_esummary_style_dicts():
+    """Test that ESummary author dicts and bare names become Author records."""
+    paper = as_paper({"uid": "2", "authors": [{"name": "Ann Lee", "authtype": "Author"}, "Bob Ray"]})
+    assert paper.authors == [Author("Ann Lee"), Author("Bob Ray")]
+    assert paper.title == "N/A"
+    assert as_paper(paper) is paper
+
+
+def test_records_are_slotted_and_affiliations_interned():
+    """Test the memory-saving layout of the record model."""
+    first = Author("A", "".join(["Acme ", "Pharma"]))
+    second = Author("B", "".join(["Acme ", "Pharma"]))
+    assert first.affiliation is second.affiliation
+    assert not hasattr(first, "__dict__")
+    assert not hasattr(Paper(uid="1"), "__dict__")
@@ -1,5 +1,17 @@
+import io
+import json
+
 import pytest
-from pubmed_fetcher.parser import extract_company_authors  
+from pubmed_fetcher.models import Author
+from pubmed_fetcher.parser import (
+    AffiliationClassifier,
+    enrich_frame,
+    enrich_paper,
+    extract_company_authors,
+    extract_corresponding_email,
+    extract_emails,
+    iter_pubmed_articles,
+)
 
 def test_extract_company_authors():
     """Test parsing author affiliations."""
@@ -11,4 +23,128 @@ def test_extract_company_authors_with_company():
     """Test identifying company-affiliated authors."""
     data = {"authors": [{"name": "Alice Smith", "affiliation": "XYZ Pharma Inc."}]}
     parsed = extract_company_authors(data["authors"])
-    assert parsed == [("Alice Smith", "xyz pharma inc.")]
+    assert parsed == [("Alice Smith", "xyz pharma inc")]
+
+def test_extract_emails_returns_every_address():
+    """Test finding all addresses in one pass without swallowing trailing periods."""
+    text = "Acme Inc. jane@acme.com; Oxford, UK. j.doe@ox.ac.uk. Contact jane@acme.com."
+    assert extract_emails(text) == ["jane@acme.com", "j.doe@ox.ac.uk"]
+    assert extract_emails("") == []
+    assert extract_corresponding_email(text) == "jane@acme.com"
+
+def test_extract_company_authors_uses_email_domains():
+    """Test that a company email domain marks an author whose affiliation names no company."""
+    authors = [
+        {"name": "A", "affiliation": "Stevenage, UK. a.b@gsk.com"},
+        {"name": "B", "affiliation": "Basel", "email": "b@roche.com"},
+        {"name": "C", "affiliation": "Harvard University. c@harvard.edu"},
+        {"name": "D", "affiliation": "XYZ Pharma Inc. d@gsk.com"},
+    ]
+    assert extract_company_authors(authors) == [
+        ("A", "gsk"),
+        ("B", "roche"),
+        ("D", "xyz pharma inc. d@gsk.com"),
+    ]
+
+def test_iter_pubmed_articles_reads_author_affiliations():
+    """Test streaming per-author affiliations and emails out of EFetch XML."""
+    xml = b"""<PubmedArticleSet>
+      <PubmedArticle><MedlineCitation><PMID>1</PMID><Article>
+        <Journal><JournalIssue><PubDate><MedlineDate>2023 Jan-Feb</MedlineDate></PubDate></JournalIssue></Journal>
+        <ArticleTitle>A <i>BRCA1</i> study</ArticleTitle>
+        <AuthorList>
+          <Author><LastName>Smith</LastName><ForeName>Alice</ForeName>
+            <AffiliationInfo><Affiliation>XYZ Pharma Inc., Basel.</Affiliation></AffiliationInfo>
+            <AffiliationInfo><Affiliation>Oxford University, UK. alice@xyz.com.</Affiliation></AffiliationInfo>
+          </Author>
+          <Author><CollectiveName>The Study Group</CollectiveName></Author>
+        </AuthorList>
+      </Article></MedlineCitation></PubmedArticle>
+      <PubmedArticle><MedlineCitation><PMID>2</PMID><Article><ArticleTitle>Second</ArticleTitle></Article>
+      </MedlineCitation></PubmedArticle>
+    </PubmedArticleSet>"""
+
+    papers = list(iter_pubmed_articles(io.BytesIO(xml)))
+
+    assert [p.uid for p in papers] == ["1", "2"]
+    assert papers[0].title == "A BRCA1 study"
+    assert papers[0].pubdate == "2023 Jan-Feb"
+    assert papers[0].authors[0] == Author(
+        name="Alice Smith",
+        affiliation="XYZ Pharma Inc., Basel.; Oxford University, UK. alice@xyz.com.",
+        email="alice@xyz.com",
+    )
+    assert papers[0].authors[1].name == "The Study Group"
+    assert papers[1].authors == []
+
+def test_classifier_matches_whole_words_and_excludes_academia():
+    """Test that legal suffixes need word boundaries and academic matches win."""
+    classifier = AffiliationClassifier()
+    assert classifier.classify("Acme Pharmaceuticals Inc., NJ") == "company"
+    assert classifier.classify("Department of Physics, Princeton, NJ") is None
+    assert classifier.classify("Incorporated Society of Surgeons") is None
+    assert classifier.classify("Pharma Research Unit, University of Basel") == "academic"
+
+
+def test_extract_company_authors_with_keyword_file(tmp_path):
+    """Test loading company and academic keywords from a dictionary file."""
+    keywords = tmp_path / "keywords.json"
+    keywords.write_text(json.dumps({"company": ["Genentech", "roche*"], "academic": ["clinic"]}))
+    classifier = AffiliationClassifier.from_file(str(keywords))
+
+    authors = [
+        {"name": "A", "affiliation": "Genentech, South San Francisco"},
+        {"name": "B", "affiliation": "Roche Diagnostics; Mayo Clinic"},
+        {"name": "C", "affiliation": "Pfizer Inc."},
+    ]
+    assert extract_company_authors(authors, classifier) == [
+        ("A", "genentech"),
+        ("B", "roche diagnostics"),
+    ]
+
+def test_enrich_frame_matches_enrich_paper():
+    """Test that the vectorized batch API agrees with the per-paper loop."""
+    papers = [
+        {
+            "uid": "1",
+            "title": "One",
+            "pubdate": "2024",
+            "authors": [
+                {"name": "Alice", "affiliation": "XYZ Pharma Inc.; Oxford University"},
+                {"name": "Bob", "affiliation": "Harvard University"},
+                {"name": "Carol", "affiliation": "Acme Biotech Ltd."},
+                {"name": "Erin", "affiliation": "Basel", "email": "erin@roche.com"},
+            ],
+            "affiliations": "XYZ Pharma Inc. alice@xyz.com",
+        },
+        {"uid": "2", "title": "Two", "pubdate": "2023", "authors": [{"name": "Dan"}]},
+        {"uid": "3", "title": "Three", "pubdate": "2022", "authors": [], "affiliations": ""},
+        {
+            "uid": "4",
+            "title": "Four",
+            "pubdate": "2021",
+            "authors": [{"name": "Fay", "email": "fay@pfizer.com"}, {"name": "Gus", "affiliation": "Acme Pharma Inc."}],
+        },
+    ]
+
+    frame = enrich_frame(papers)
+
+    assert frame.to_dict("records") == [enrich_paper(paper) for paper in papers]
+    assert frame.loc[0, "Non-academic Author(s)"] == ["Alice", "Carol", "Erin"]
+
+def test_classifier_memo_normalizes_and_persists(tmp_path):
+    """Test memoized lookups across spelling variants and across runs."""
+    classifier = AffiliationClassifier()
+    assert classifier.lookup("Dept. of Oncology, Acme Pharma Inc., Boston, MA.") == ("company", "Acme Pharma Inc")
+    assert classifier.lookup("dept of oncology  acme pharma inc boston ma") == ("company", "Acme Pharma Inc")
+    assert classifier.classify("Harvard University") == "academic"
+    assert classifier.memo_stats() == {"hits": 1, "misses": 2, "size": 2, "hit_rate": 0.333}
+
+    memo_path = str(tmp_path / "affiliations.json")
+    classifier.save_memo(memo_path)
+
+    warm = AffiliationClassifier()
+    assert warm.load_memo(memo_path) == 2
+    assert warm.classify("Harvard University") == "academic"
+    assert warm.memo_stats()["hits"] == 1
+    assert AffiliationClassifier(company_keywords=["acme"]).load_memo(memo_path) == 0
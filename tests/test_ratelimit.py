@@ -0,0 +1,40 @@
+import time
+
+from pubmed_fetcher.ratelimit import RATE_WITH_API_KEY, RATE_WITHOUT_API_KEY, RateLimiter, rate_for
+
+
+def test_rate_for_api_key():
+    """Test that the NCBI rate depends on whether an API key is configured."""
+    assert rate_for(None) == RATE_WITHOUT_API_KEY
+    assert rate_for("secret") == RATE_WITH_API_KEY
+
+
+def test_acquire_paces_requests_after_burst():
+    """Test that requests beyond the burst are delayed and the wait is counted."""
+    limiter = RateLimiter(rate=50, burst=5)
+
+    start = time.monotonic()
+    for _ in range(10):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+
+    stats = limiter.stats()
+    assert elapsed >= 0.09
+    assert stats["requests"] == 10
+    # Only the requests past the burst had to sleep.
+    assert 1 <= stats["waits"] <= 5
+    assert stats["wait_time"] > 0
+
+
+def test_backoff_throttles_and_recovers():
+    """Test that a 429 halves the rate and successes restore it."""
+    limiter = RateLimiter(rate=10, backoff_base=0.01)
+
+    delay = limiter.backoff(0, throttled=True)
+    assert 0.005 <= delay <= 0.01
+    assert limiter.rate == 5
+    assert limiter.backoff(0, retry_after="2") == 2.0
+
+    for _ in range(20):
+        limiter.success()
+    assert limiter.rate == 10
@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+import pytest
+
+from eutils_stub import EutilsStub
+from pubmed_fetcher.fetcher import EutilsClient
+from pubmed_fetcher.service import PaperService, SingleFlight, make_server
+
+
+@pytest.fixture
+def served():
+    """Runs a service on a free local port, backed by a slow E-utilities stub."""
+    stub = EutilsStub(size=50, latency=0.2).start()
+    service = PaperService(EutilsClient(eutils_url=stub.url))
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield stub, service, f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+    stub.stop()
+
+
+def _get(url):
+    with urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Test that concurrent calls with one key run the function once and share its result."""
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return ["row"]
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(lambda _: flight.do("key", work), range(5)))
+
+    assert calls == [1]
+    assert results == [["row"]] * 5
+    assert flight.coalesced == 4
+    assert flight.do("key", lambda: "fresh") == "fresh"
+
+
+def test_single_flight_shares_errors():
+    """Test that an exception raised by the leader reaches every waiting caller."""
+    flight = SingleFlight()
+
+    def fail():
+        time.sleep(0.1)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flight.do, "key", fail) for _ in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result()
+
+
+def test_search_endpoint_returns_rows(served):
+    stub, _, url = served
+
+    result = _get(f"{url}/search?query=cancer&max_results=5")
+
+    assert result["count"] == 5
+    assert [row["PubmedID"] for row in result["rows"]] == stub.pmids[:5]
+    assert _get(f"{url}/health") == {"status": "ok"}
+
+
+def test_identical_concurrent_queries_hit_upstream_once(served):
+    """Test that simultaneous identical searches share a single esearch/esummary round trip."""
+    stub, service, url = served
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(_get, [f"{url}/search?query=cancer&max_results=10"] * 4))
+
+    assert all(result == results[0] for result in results)
+    assert [endpoint for endpoint, _ in stub.requests] == ["esearch", "esummary"]
+    assert _get(f"{url}/stats")["coalesced"] == 3
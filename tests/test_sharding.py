@@ -0,0 +1,183 @@
+import csv
+import datetime
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from pubmed_fetcher.cli import main
+from pubmed_fetcher.fetcher import EutilsClient, set_client
+from pubmed_fetcher.sharding import (
+    MAX_SHARD_ATTEMPTS,
+    Shard,
+    ShardQueue,
+    merge_outputs,
+    parse_date,
+    plan_shards,
+    run_worker,
+)
+
+
+@pytest.fixture
+def dated_stub(eutils_stub):
+    """Spreads the stub's papers over 2020-2023, a few per day."""
+    first = datetime.date(2020, 1, 1)
+    for i, pmid in enumerate(eutils_stub.pmids):
+        eutils_stub.pubdates[pmid] = f"{first + datetime.timedelta(days=i):%Y/%m/%d}"
+    return eutils_stub
+
+
+def test_parse_date():
+    assert parse_date("2023") == datetime.date(2023, 1, 1)
+    assert parse_date("2023", last=True) == datetime.date(2023, 12, 31)
+    assert parse_date("2024/02", last=True) == datetime.date(2024, 2, 29)
+    assert parse_date("2023/06/15", last=True) == datetime.date(2023, 6, 15)
+    with pytest.raises(ValueError):
+        parse_date("soon")
+
+
+def test_plan_shards_bisects_until_every_shard_fits(dated_stub):
+    """Test that shards are contiguous, within the target, and cover every paper."""
+    client = EutilsClient(eutils_url=dated_stub.url)
+
+    shards = plan_shards("cancer", since="2019", until="2024", target=100, client=client)
+
+    assert all(0 < shard.count <= 100 for shard in shards)
+    assert sum(shard.count for shard in shards) == len(dated_stub.pmids)
+    for earlier, later in zip(shards, shards[1:]):
+        assert earlier.maxdate < later.mindate
+    assert all(params.get("rettype") == "count" for _, params in dated_stub.requests)
+    # Each shard's count matches what a search returns.
+    for shard in shards:
+        assert len(client.search_pubmed_ids("cancer", None, **shard.filters())) == shard.count
+
+
+def test_plan_shards_counts_papers_matching_two_dates_in_both_halves(dated_stub):
+    """Test that a paper whose print date falls in a later shard is counted there too."""
+    for i, pmid in enumerate(dated_stub.pmids[:100]):
+        printed = datetime.date(2023, 1, 1) + datetime.timedelta(days=i)
+        dated_stub.pubdates[pmid] = (dated_stub.pubdates[pmid], f"{printed:%Y/%m/%d}")
+    client = EutilsClient(eutils_url=dated_stub.url)
+
+    shards = plan_shards("cancer", since="2019", until="2024", target=100, client=client)
+
+    for shard in shards:
+        assert len(client.search_pubmed_ids("cancer", None, **shard.filters())) == shard.count
+    assert sum(shard.count for shard in shards) == len(dated_stub.pmids) + 100
+
+
+def test_worker_fails_a_shard_it_cannot_list_in_full(dated_stub, tmp_path, monkeypatch):
+    """Test that a shard holding more papers than ESearch can list is failed, not written short."""
+    monkeypatch.setattr("pubmed_fetcher.fetcher.RETRIEVAL_CAP", 50)
+    monkeypatch.setattr("pubmed_fetcher.sharding.RETRIEVAL_CAP", 50)
+    client = EutilsClient(eutils_url=dated_stub.url)
+    with ShardQueue(str(tmp_path / "shards.sqlite3")) as queue:
+        queue.add([Shard("cancer", datetime.date(2020, 1, 1), datetime.date(2020, 3, 31), 91)])
+
+        totals = run_worker(queue, str(tmp_path / "out"), worker="a", max_shards=1, client=client)
+
+        assert totals == {"shards": 0, "failed": 1, "written": 0}
+        assert queue.status()["pending"]["shards"] == 1
+
+
+def test_single_day_over_the_cap_is_planned_and_harvested_capped(eutils_stub, tmp_path, monkeypatch, caplog):
+    """Test that a day too large to list in full is harvested up to the cap rather than failed forever."""
+    monkeypatch.setattr("pubmed_fetcher.fetcher.RETRIEVAL_CAP", 50)
+    monkeypatch.setattr("pubmed_fetcher.sharding.RETRIEVAL_CAP", 50)
+    for pmid in eutils_stub.pmids[:80]:
+        eutils_stub.pubdates[pmid] = "2020/01/01"
+    for pmid in eutils_stub.pmids[80:]:
+        eutils_stub.pubdates[pmid] = "2021/01/01"
+    client = EutilsClient(eutils_url=eutils_stub.url)
+
+    shards = plan_shards("cancer", since="2020/01/01", until="2020/01/01", client=client)
+    assert [shard.count for shard in shards] == [80]
+    assert "only the first 50 will be harvested" in caplog.text
+
+    with ShardQueue(str(tmp_path / "shards.sqlite3")) as queue:
+        queue.add(shards)
+        totals = run_worker(queue, str(tmp_path / "out"), worker="a", client=client)
+
+    assert totals == {"shards": 1, "failed": 0, "written": 50}
+
+
+def test_queue_leases_shards_to_one_worker_at_a_time(tmp_path):
+    with ShardQueue(str(tmp_path / "shards.sqlite3")) as queue:
+        day = datetime.date(2024, 1, 1)
+        queue.add([Shard("q", day, day, 5), Shard("q", day, day, 7)])
+
+        first = queue.claim("a")
+        second = queue.claim("b")
+        assert (first.id, second.id) == (1, 2)
+        assert queue.claim("c") is None
+
+        assert queue.complete(first.id, "a", "a.csv")
+        assert queue.status()["done"] == {"shards": 1, "papers": 5}
+        assert queue.outputs() == ["a.csv"]
+
+
+def test_queue_reclaims_expired_leases_and_retires_failing_shards(tmp_path):
+    with ShardQueue(str(tmp_path / "shards.sqlite3")) as queue:
+        day = datetime.date(2024, 1, 1)
+        queue.add([Shard("q", day, day, 5)])
+
+        stale = queue.claim("a", lease=-1)
+        taken = queue.claim("b")
+        assert taken.id == stale.id
+        assert not queue.renew(stale.id, "a")
+        assert not queue.complete(stale.id, "a", "a.csv")
+
+        queue.fail(taken.id, "b")
+        for attempt in range(MAX_SHARD_ATTEMPTS - 2):
+            queue.fail(queue.claim("b").id, "b")
+        assert queue.claim("b") is None
+        assert queue.status() == {"failed": {"shards": 1, "papers": 5}}
+
+
+def test_workers_and_merge_produce_one_deduplicated_dataset(dated_stub, tmp_path):
+    client = EutilsClient(eutils_url=dated_stub.url)
+    with ShardQueue(str(tmp_path / "shards.sqlite3")) as queue:
+        shards = plan_shards("cancer", since="2020", until="2023", target=300, client=client)
+        # Queue the first shard twice so the merge has duplicates to drop.
+        queue.add(shards + shards[:1])
+
+        first = run_worker(queue, str(tmp_path / "out"), format="jsonl", worker="a", max_shards=2, client=client)
+        second = run_worker(queue, str(tmp_path / "out"), format="jsonl", worker="b", client=client)
+        count = merge_outputs(queue, str(tmp_path / "merged.csv"))
+
+    assert first["shards"] == 2
+    assert first["written"] + second["written"] == len(dated_stub.pmids) + shards[0].count
+    assert count == len(dated_stub.pmids)
+    with open(tmp_path / "merged.csv", newline="") as f:
+        assert sorted(row["PubmedID"] for row in csv.DictReader(f)) == dated_stub.pmids
+
+
+def test_failed_shard_is_requeued(dated_stub, tmp_path):
+    client = EutilsClient(eutils_url=dated_stub.url, max_retries=0)
+    dated_stub.fail_pmids.add(dated_stub.pmids[0])
+    with ShardQueue(str(tmp_path / "shards.sqlite3")) as queue:
+        queue.add(plan_shards("cancer", since="2020", until="2023", target=300, client=client))
+
+        totals = run_worker(queue, str(tmp_path / "out"), worker="a", client=client)
+
+        assert totals["failed"] == MAX_SHARD_ATTEMPTS
+        assert queue.status()["failed"]["shards"] == 1
+        assert not (tmp_path / "out" / "shard-00001-a.csv").exists()
+
+
+def test_cli_plan_worker_merge(dated_stub, tmp_path, capsys):
+    set_client(EutilsClient(eutils_url=dated_stub.url))
+    queue = str(tmp_path / "shards.sqlite3")
+    merged = str(tmp_path / "merged.csv")
+
+    for argv in (
+        ["plan", "cancer", "--queue", queue, "--since", "2020", "--until", "2023", "--target", "250"],
+        ["worker", "--queue", queue, "-o", str(tmp_path / "out")],
+        ["merge", "--queue", queue, "-f", merged],
+    ):
+        with patch.object(sys, "argv", ["get-papers-list", *argv]):
+            main()
+
+    output = capsys.readouterr().out
+    assert f"({len(dated_stub.pmids)} papers)" in output
+    assert f"Data saved to {merged} ({len(dated_stub.pmids)} rows)" in output
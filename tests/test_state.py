@@ -0,0 +1,100 @@
+import datetime
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from pubmed_fetcher.cli import main
+from pubmed_fetcher.fetcher import EutilsClient, set_client
+from pubmed_fetcher.state import HarvestState, harvest_new_papers
+
+
+def test_harvest_new_papers_fetches_only_the_delta(eutils_stub, tmp_path):
+    """Test that a second run searches from the high-water date and skips seen PMIDs."""
+    pmids = eutils_stub.pmids
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    state = HarvestState(str(tmp_path / "state.sqlite3"))
+
+    eutils_stub.queries["q"] = pmids[:30]
+    first = list(harvest_new_papers("q", state, client=client, today=datetime.date(2025, 3, 1)))
+    assert [p.uid for p in first] == pmids[:30]
+    assert "mindate" not in eutils_stub.requests[0][1]
+    assert state.last_date("q") == "2025/03/01"
+
+    eutils_stub.requests.clear()
+    eutils_stub.queries["q"] = pmids[25:40]
+    second = list(harvest_new_papers("q", state, client=client, today=datetime.date(2025, 3, 2)))
+
+    assert [p.uid for p in second] == pmids[30:40]
+    search = eutils_stub.requests[0][1]
+    assert (search["datetype"], search["mindate"], search["maxdate"]) == ("edat", "2025/03/01", "2025/03/02")
+    assert eutils_stub.requests[1][1]["id"].split(",") == pmids[30:40]
+    assert state.last_date("q") == "2025/03/02"
+
+
+def test_interrupted_harvest_keeps_high_water_mark(eutils_stub, tmp_path):
+    """Test that an unfinished run does not advance the query's date."""
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    state = HarvestState(str(tmp_path / "state.sqlite3"))
+
+    papers = harvest_new_papers("q", state, max_results=10, client=client)
+    next(papers)
+    papers.close()
+
+    assert state.last_date("q") is None
+    assert len(state.filter_new("q", eutils_stub.pmids[:10])) == 10
+
+
+def test_capped_harvest_keeps_high_water_mark_and_continues(eutils_stub, tmp_path):
+    """Test that max_results leaves the date alone and the next run takes the following papers."""
+    pmids = eutils_stub.pmids
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    state = HarvestState(str(tmp_path / "state.sqlite3"))
+    eutils_stub.queries["q"] = pmids[:30]
+
+    first = list(harvest_new_papers("q", state, max_results=20, client=client))
+    assert [p.uid for p in first] == pmids[:20]
+    assert state.last_date("q") is None
+
+    second = list(harvest_new_papers("q", state, max_results=20, client=client, today=datetime.date(2025, 3, 1)))
+    assert [p.uid for p in second] == pmids[20:30]
+    assert state.last_date("q") == "2025/03/01"
+
+
+def test_failed_papers_are_not_recorded(eutils_stub, tmp_path):
+    """Test that only yielded PMIDs are recorded and a failure keeps the date."""
+    pmids = eutils_stub.pmids
+    client = EutilsClient(eutils_url=eutils_stub.url)
+    state = HarvestState(str(tmp_path / "state.sqlite3"))
+    eutils_stub.queries["q"] = pmids[:30]
+    eutils_stub.fail_pmids.add(pmids[5])
+
+    papers = list(harvest_new_papers("q", state, client=client))
+
+    assert pmids[5] not in [p.uid for p in papers]
+    assert state.last_date("q") is None
+    assert pmids[5] in state.filter_new("q", pmids[:30])
+
+
+def test_failed_search_raises_instead_of_finding_nothing(eutils_stub, tmp_path):
+    client = EutilsClient(eutils_url=eutils_stub.url, max_retries=0)
+    state = HarvestState(str(tmp_path / "state.sqlite3"))
+    state.complete("q", "2025/03/01")
+    eutils_stub.stop()
+
+    with pytest.raises(RuntimeError):
+        list(harvest_new_papers("q", state, client=client))
+    assert state.last_date("q") == "2025/03/01"
+
+
+def test_cli_incremental_exits_non_zero_when_the_search_fails(eutils_stub, tmp_path, capsys):
+    set_client(EutilsClient(eutils_url=eutils_stub.url, max_retries=0))
+    eutils_stub.stop()
+    state = str(tmp_path / "state.sqlite3")
+    argv = ["cli.py", "q", "--incremental", "--state-db", state, "-f", str(tmp_path / "out.csv"), "--no-cache"]
+
+    with patch.object(sys, "argv", argv), pytest.raises(SystemExit) as excinfo:
+        main()
+
+    assert excinfo.value.code == 1
+    assert "No new papers" not in capsys.readouterr().out
@@ -0,0 +1,55 @@
+import json
+import os
+import sys
+from unittest.mock import patch
+
+from pubmed_fetcher.cli import main
+from pubmed_fetcher.fetcher import EutilsClient, set_client
+from pubmed_fetcher.stats import Stats
+
+
+def test_stats_spans_counters_and_openmetrics():
+    """Test that spans and counters accumulate and export."""
+    stats = Stats()
+    for _ in range(3):
+        with stats.span("parse.article"):
+            pass
+    stats.incr("records", 3)
+    stats.incr("bytes_received", 1024)
+    stats.gauges_from("cache", {"hits": 5, "misses": 1, "path": "ignored"})
+
+    snapshot = stats.snapshot()
+    assert snapshot["spans"]["parse.article"]["count"] == 3
+    assert snapshot["counters"] == {"records": 3, "bytes_received": 1024}
+    assert snapshot["gauges"] == {"cache.hits": 5, "cache.misses": 1}
+
+    text = stats.to_openmetrics()
+    assert 'pubmed_fetcher_stage_calls_total{stage="parse.article"} 3' in text
+    assert "pubmed_fetcher_bytes_received_total 1024" in text
+    assert "pubmed_fetcher_cache_hits 5" in text
+    assert text.endswith("# EOF\n")
+    assert "parse.article" in stats.report()
+
+
+def test_cli_writes_stats_and_profile(eutils_stub, tmp_path, capsys):
+    """Test the --stats, --stats-file and --profile options on a real run."""
+    output = tmp_path / "papers.csv"
+    stats_file = tmp_path / "stats.json"
+    profile = tmp_path / "run.prof"
+    test_args = [
+        "cli.py", "cancer", "-n", "50", "-f", str(output), "--no-cache",
+        "--stats", "--stats-file", str(stats_file), "--profile", str(profile),
+    ]
+    set_client(EutilsClient(eutils_url=eutils_stub.url))
+    with patch.object(sys, "argv", test_args):
+        main()
+
+    snapshot = json.loads(stats_file.read_text())
+    assert snapshot["counters"]["records"] == 50
+    assert snapshot["counters"]["requests.esearch"] == 1
+    assert snapshot["counters"]["bytes_received"] > 0
+    assert {"http.esummary", "enrich", "write.csv"} <= set(snapshot["spans"])
+    assert "ratelimit.requests" in snapshot["gauges"]
+    assert "write.csv" in capsys.readouterr().err
+    assert os.path.getsize(profile) > 0
+    assert "peak traced memory" in (tmp_path / "run.prof.memory.txt").read_text()
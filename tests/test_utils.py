@@ -1,7 +1,7 @@
 import pytest
 import csv
 import os
-from pubmed_fetcher.utils import save_to_csv
+from pubmed_fetcher.utils import print_results, save_to_csv
 
 def test_save_to_csv():
     """Test saving data to CSV."""
@@ -19,3 +19,36 @@ def test_save_to_csv():
     assert rows[0]["title"] == "Test Article"
 
     os.remove(file_path)
+
+
+def test_save_to_csv_append(tmp_path):
+    """Test appending rows under an existing file's header."""
+    file_path = tmp_path / "papers.csv"
+    save_to_csv([{"id": "1", "title": "First"}], str(file_path))
+    save_to_csv([{"title": "Second", "id": "2"}], str(file_path), append=True)
+
+    with open(file_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    assert rows == [{"id": "1", "title": "First"}, {"id": "2", "title": "Second"}]
+
+
+def test_print_results_reads_output_rows(capsys):
+    """Test that printed results use the same keys as the output rows."""
+    print_results(
+        [
+            {
+                "PubmedID": "1",
+                "Title": "Test Article",
+                "Publication Date": "2024 Jan",
+                "Non-academic Author(s)": ["Jane Roe"],
+                "Company Affiliation(s)": ["acme pharma inc."],
+                "Corresponding Author Email": "jane@acme.com",
+            }
+        ]
+    )
+    output = capsys.readouterr().out
+    assert "Title: Test Article" in output
+    assert "Publication Date: 2024 Jan" in output
+    assert "Non-academic Authors: Jane Roe" in output
+    assert "Corresponding Email: jane@acme.com" in output
@@ -0,0 +1,106 @@
+import csv
+import json
+
+import pytest
+
+from pubmed_fetcher import writers
+from pubmed_fetcher.writers import JsonlWriter, open_writer, read_partitions, read_rows, write_rows
+
+ROWS = [
+    {
+        "PubmedID": "1",
+        "Title": "First",
+        "Non-academic Author(s)": ["Jane Roe", "Rick Roe"],
+        "Company Affiliation(s)": ["acme pharma inc.", "beta biotech, ltd"],
+    },
+    {"PubmedID": "2", "Title": "Second", "Non-academic Author(s)": [], "Company Affiliation(s)": []},
+]
+
+
+def test_csv_joins_list_columns(tmp_path):
+    """Test that CSV output joins list values into one cell."""
+    path = tmp_path / "papers.csv"
+    assert write_rows(iter(ROWS), str(path), "csv") == 2
+
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["Non-academic Author(s)"] == "Jane Roe, Rick Roe"
+    assert rows[1]["Company Affiliation(s)"] == ""
+
+
+def test_jsonl_keeps_lists_and_flushes_each_record(tmp_path):
+    """Test that each JSONL record is on disk as soon as it is written."""
+    path = tmp_path / "papers.jsonl"
+    with JsonlWriter(str(path)) as writer:
+        writer.write(ROWS[0])
+        assert json.loads(path.read_text()) == ROWS[0]
+        writer.write(ROWS[1])
+
+    assert [json.loads(line) for line in path.read_text().splitlines()] == ROWS
+
+
+def test_parquet_writes_row_groups_with_list_columns(tmp_path):
+    """Test that Parquet output has fixed-size row groups and list columns."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "papers.parquet"
+    rows = [dict(ROWS[i % 2], PubmedID=str(i)) for i in range(5)]
+    write_rows(iter(rows), str(path), "parquet", batch_size=2)
+
+    parquet = pq.ParquetFile(str(path))
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.read().to_pylist() == rows
+
+
+def test_open_writer_rejects_unknown_format(tmp_path):
+    """Test that an unsupported format is reported."""
+    with pytest.raises(ValueError):
+        open_writer(str(tmp_path / "papers.xml"), "xml")
+
+
+DATED_ROWS = [
+    {"PubmedID": "1", "Publication Date Key": 20230115, "Company Affiliation(s)": ["acme"]},
+    {"PubmedID": "2", "Publication Date Key": 20240300, "Company Affiliation(s)": []},
+    {"PubmedID": "3", "Publication Date Key": 20230100, "Company Affiliation(s)": []},
+    {"PubmedID": "4", "Publication Date Key": 20220000, "Company Affiliation(s)": []},
+    {"PubmedID": "5", "Publication Date Key": 0, "Company Affiliation(s)": []},
+]
+
+
+def test_partitioned_output_uses_hive_directories(tmp_path):
+    """Test that rows land in year=/month= directories as they stream in."""
+    path = tmp_path / "papers"
+    assert write_rows(iter(DATED_ROWS), str(path), "jsonl", partitioned=True) == 5
+
+    def pmids(directory):
+        return [row["PubmedID"] for part in sorted(directory.glob("part-*")) for row in read_rows(str(part))]
+
+    assert pmids(path / "year=2023" / "month=1") == ["1", "3"]
+    assert pmids(path / "year=2024" / "month=3") == ["2"]
+    assert pmids(path / "year=2022" / "month=__HIVE_DEFAULT_PARTITION__") == ["4"]
+    assert pmids(path / "year=__HIVE_DEFAULT_PARTITION__" / "month=__HIVE_DEFAULT_PARTITION__") == ["5"]
+    with pytest.raises(ValueError):
+        write_rows(iter(DATED_ROWS), str(path), "jsonl", partitioned=True)
+
+
+def test_partitioned_writer_bounds_open_files(tmp_path, monkeypatch):
+    """Test that evicted partitions are reopened as new part files, not overwritten."""
+    monkeypatch.setattr(writers, "MAX_OPEN_PARTITIONS", 1)
+    path = tmp_path / "papers"
+
+    write_rows(iter(DATED_ROWS), str(path), "csv", partitioned=True)
+
+    parts = sorted((path / "year=2023" / "month=1").glob("part-*.csv"))
+    assert len(parts) == 2
+    assert [row["PubmedID"] for part in parts for row in read_rows(str(part))] == ["1", "3"]
+
+
+def test_read_partitions_only_opens_overlapping_partitions(tmp_path):
+    path = tmp_path / "papers"
+    write_rows(iter(DATED_ROWS), str(path), "csv", partitioned=True)
+    # A partition outside the range is never read, so its contents do not matter.
+    (path / "year=2022" / "month=__HIVE_DEFAULT_PARTITION__" / "part-broken.csv").write_bytes(b"\xff\xfe")
+
+    assert [row["PubmedID"] for row in read_partitions(str(path), since="2023/01/10", until="2023")] == ["1"]
+    assert [row["PubmedID"] for row in read_partitions(str(path), since="2024")] == ["2"]
+    with pytest.raises(UnicodeDecodeError):
+        list(read_partitions(str(path)))